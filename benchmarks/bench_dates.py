@@ -0,0 +1,57 @@
+"""
+Compares the ways a post's date can be built: strptime, as Post used to,
+the fixed-format fast path of types.parse_date, and deriving it from the
+numeric timestamp, which Post falls back to when a post has no date string
+
+    python benchmarks/bench_dates.py --number 100000
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pytumblr import types  # noqa: E402
+from pytumblr.fakeserver import date_string, post  # noqa: E402
+
+
+def per_call(fn, values, number):
+    """
+    :returns: the mean microseconds per call of `fn` over `values`
+    """
+    count = len(values)
+    loops = max(1, number // count)
+    seconds = min(timeit.repeat(lambda: [fn(value) for value in values], number=loops, repeat=3))
+    return seconds / (loops * count) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    timestamps = [random.randint(1167609600, 1767225600) for _ in range(1000)]
+    dates = [date_string(timestamp) for timestamp in timestamps]
+    assert all(types.parse_date(date) == datetime.strptime(date, types.DATE_FORMAT) ==
+               types.date_from_timestamp(timestamp) for date, timestamp in zip(dates, timestamps))
+
+    strptime = per_call(lambda date: datetime.strptime(date, types.DATE_FORMAT), dates, args.number)
+    print('{:24} {:>8}'.format('', 'us/call'))
+    print('{:24} {:8.2f}'.format('strptime', strptime))
+    for name, fn, values in (('parse_date', types.parse_date, dates),
+                             ('date_from_timestamp', types.date_from_timestamp, timestamps)):
+        us = per_call(fn, values, args.number)
+        print('{:24} {:8.2f}  ({:.1f}x faster)'.format(name, us, strptime / us))
+
+    page = {'posts': [post(id, 'text') for id in range(1, 21)]}
+    us = per_call(lambda page: types.Posts(**page), [page], args.number // 20) / 20
+    print('{:24} {:8.2f}'.format('text Post, built', us))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Compares building pages of posts with the dataclass constructors in
+pytumblr.types and with the compiled decoders in pytumblr.decode
+
+    python benchmarks/bench_decode.py --pages 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pytumblr import decode, types  # noqa: E402
+from pytumblr.fakeserver import post  # noqa: E402
+
+
+def per_post(build, pages, count):
+    """
+    :returns: the best microseconds per post of three runs
+    """
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for page in pages:
+            build(page)
+        best = min(best, time.perf_counter() - start)
+    return best / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    print('{:8} {:>10} {:>10}'.format('type', 'types', 'decode'))
+    for type in ('text', 'quote', 'photo', 'link', None):
+        pages = [{'posts': [post(id, type) for id in range(start, start + 20)]}
+                 for start in range(1, args.pages * 20, 20)]
+        count = sum(len(page['posts']) for page in pages)
+        assert decode.decode(types.Posts, pages[0]) == types.Posts(**pages[0])
+
+        eager = per_post(lambda page: types.Posts(**page), pages, count)
+        compiled = per_post(decode.decoder(types.Posts), pages, count)
+        print('{:8} {:8.2f}us {:8.2f}us  ({:.1f}x faster)'.format(type or 'mixed', eager, compiled, eager / compiled))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Compares the memory held per post by the eager dataclasses in
+pytumblr.types and their slotted mirrors in pytumblr.compact
+
+    python benchmarks/bench_memory.py --posts 20000
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pytumblr import compact, types  # noqa: E402
+from pytumblr.fakeserver import post  # noqa: E402
+
+
+def bytes_per_post(build, pages, count):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = [build(page) for page in pages]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del built
+    return (after - before) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    print('bytes held per post, not counting the JSON it was built from')
+    print('{:8} {:>10} {:>10}'.format('type', 'types', 'compact'))
+    for type in ('text', 'quote', 'photo', 'link'):
+        pages = [{'posts': [post(id, type) for id in range(start, start + 20)]}
+                 for start in range(1, args.posts + 1, 20)]
+        count = sum(len(page['posts']) for page in pages)
+
+        eager = bytes_per_post(lambda page: types.Posts(**page), pages, count)
+        slotted = bytes_per_post(lambda page: compact.build(types.Posts, page), pages, count)
+        print('{:8} {:10.0f} {:10.0f}  ({:.0%})'.format(type, eager, slotted, slotted / eager))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Measures what authorizing a request costs: requests_oauthlib's OAuth1, as
+TumblrRequest used to sign every request with, and the cached
+OAuth1Signer. With api_key_only, endpoints taking an api_key skip signing
+altogether.
+
+    python benchmarks/bench_signing.py --number 20000
+"""
+import argparse
+import os
+import sys
+import timeit
+import urllib.parse
+
+import requests
+from requests_oauthlib import OAuth1
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pytumblr.oauth import OAuth1Signer  # noqa: E402
+
+CREDENTIALS = ('consumer_key_0123456789', 'consumer_secret_0123456789', 'oauth_token_0123456789',
+               'oauth_secret_0123456789')
+
+
+def requests_to_sign():
+    """
+    :returns: prepared requests like the client sends: a page of posts,
+              the dashboard, a like and a text post
+    """
+    host = 'https://api.tumblr.com/v2'
+    query = urllib.parse.urlencode({'limit': 20, 'offset': 40, 'reblog_info': True, 'api_key': CREDENTIALS[0]})
+    form = urllib.parse.urlencode({'type': 'text', 'title': 'Hello', 'body': 'A body ' * 40, 'tags': 'a,b,c'})
+    return [
+        requests.Request('GET', host + '/blog/staff.tumblr.com/posts?' + query).prepare(),
+        requests.Request('GET', host + '/user/dashboard?limit=20&notes_info=True').prepare(),
+        requests.Request('POST', host + '/user/like', data='id=123456789&reblog_key=abcdef').prepare(),
+        requests.Request('POST', host + '/blog/staff.tumblr.com/post', data=form).prepare(),
+    ]
+
+
+def per_request(auth, prepared, number):
+    """
+    :returns: the mean microseconds `auth` takes per request
+    """
+    def sign():
+        for request in prepared:
+            # signing changes the headers, so sign a fresh copy each time,
+            # as the session does
+            auth(request.copy()) if auth is not None else request.copy()
+
+    loops = max(1, number // len(prepared))
+    seconds = min(timeit.repeat(sign, number=loops, repeat=3))
+    return seconds / (loops * len(prepared)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    prepared = requests_to_sign()
+    consumer_key, consumer_secret, token, token_secret = CREDENTIALS
+    oauthlib = OAuth1(consumer_key, client_secret=consumer_secret, resource_owner_key=token,
+                      resource_owner_secret=token_secret)
+    signer = OAuth1Signer(consumer_key, consumer_secret, token, token_secret)
+
+    copying = per_request(None, prepared, args.number)
+    baseline = per_request(oauthlib, prepared, args.number) - copying
+    print('{:28} {:>8}'.format('', 'us/req'))
+    print('{:28} {:8.2f}'.format('requests_oauthlib.OAuth1', baseline))
+    cached = per_request(signer, prepared, args.number) - copying
+    print('{:28} {:8.2f}  ({:.1f}x faster)'.format('OAuth1Signer', cached, baseline / cached))
+
+
+if __name__ == '__main__':
+    main()
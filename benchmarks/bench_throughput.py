@@ -0,0 +1,78 @@
+"""
+Measures the client's throughput and latency end to end, over HTTP, against
+a local FakeTumblrServer: pages of posts fetched by a number of threads
+sharing one client and its connection pool. The server runs in the same
+process, so compare runs with each other rather than with the real API.
+
+    python benchmarks/bench_throughput.py --requests 2000 --threads 8 --latency 0.01
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pytumblr  # noqa: E402
+from pytumblr.fakeserver import FakeTumblrServer  # noqa: E402
+
+
+def run(client, requests, threads, limit):
+    """
+    :returns: (seconds taken, a sorted list of each request's seconds)
+    """
+    latencies = []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def work():
+        while True:
+            with lock:
+                number = next(counter, None)
+            if number is None:
+                return
+            start = time.perf_counter()
+            response = client.posts('blog{}'.format(number % 50), limit=limit, offset=number % 10 * limit)
+            elapsed = time.perf_counter() - start
+            assert not isinstance(response, pytumblr.TumblrError), response
+            with lock:
+                latencies.append(elapsed)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds the server adds to each response')
+    parser.add_argument('--keep-alive', type=int, default=1, choices=(0, 1))
+    args = parser.parse_args()
+
+    with FakeTumblrServer(latency=args.latency) as server:
+        client = pytumblr.TumblrRestClient('key', host=server.url, keep_alive=bool(args.keep_alive),
+                                           pool_maxsize=args.threads, coalesce=False)
+        # warm up the decoders and the connection pool
+        run(client, args.threads * 2, args.threads, args.limit)
+        seconds, latencies = run(client, args.requests, args.threads, args.limit)
+        client.close()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1e3
+
+    print('{} requests, {} threads, {} posts each'.format(args.requests, args.threads, args.limit))
+    print('{:12} {:10.1f}'.format('req/s', args.requests / seconds))
+    for p in (0.5, 0.9, 0.99):
+        print('{:12} {:8.2f}ms'.format('p{:g}'.format(p * 100), percentile(p)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""
+Benchmarks each stage a response goes through, on recorded payloads, and
+compares the results with a saved baseline
+
+Stages:
+    json_parse      TumblrRequest.json_parse, the body to a dict
+    wrap            pytumblr._wrap, the dict to typed objects
+    post_dispatch   types.Post(**post), which picks the subclass in __new__
+    neue_post       npf.NeuePost(**post), building blocks, layouts and
+                    trails in __post_init__
+    validate        validate_params against an endpoint's ParamSchema
+
+For each case it reports operations per second, the memory blocks an
+operation's result holds on to, and the peak memory it used.
+
+    python benchmarks/suite.py --save before
+    # ... change something ...
+    python benchmarks/suite.py --compare before
+
+Comparing exits with status 1 if a case got slower, or allocates or
+peaks higher, by more than --threshold percent. The payloads in
+benchmarks/data are recorded from a FakeTumblrServer with `record`, and
+only need recording again when their shape should change.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+import pytumblr  # noqa: E402
+from pytumblr import npf, types  # noqa: E402
+from pytumblr.endpoints import ENDPOINTS  # noqa: E402
+from pytumblr.fakeserver import FakeTumblrServer, neue_post  # noqa: E402
+from pytumblr.helpers import validate_params  # noqa: E402
+from pytumblr.request import TumblrRequest  # noqa: E402
+
+DATA = os.path.join(HERE, 'data')
+BASELINES = os.path.join(HERE, 'baselines')
+
+# the depths of the reblog trails of the recorded NPF posts
+TRAIL_DEPTHS = (0, 0, 1, 2, 3, 5, 8, 12, 16, 24)
+
+
+@dataclass
+class Case:
+    # "stage/payload"
+    name: str
+    op: Callable[[], object]
+
+
+@dataclass
+class Result:
+    ops: float
+    # memory blocks still allocated after one operation, which its result
+    # holds on to
+    blocks: int
+    # the most memory, in bytes, one operation had allocated at once
+    peak: int
+
+
+class _Response:
+    """
+    The parts of a requests.Response that json_parse reads
+    """
+    status_code = 200
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+
+def load(name: str) -> bytes:
+    with open(os.path.join(DATA, name + '.json'), 'rb') as f:
+        return f.read()
+
+
+def record():
+    """
+    Records the payloads from a FakeTumblrServer, as the client receives
+    them
+    """
+    os.makedirs(DATA, exist_ok=True)
+    with FakeTumblrServer(posts_per_blog=500, seed=2013) as server:
+        client = pytumblr.TumblrRestClient('key', 'secret', 'token', 'token_secret', host=server.url)
+        bodies = {'dashboard': client.send_api_request('get', '/user/dashboard', {'limit': 50},
+                                                       ENDPOINTS['dashboard'].params, raw=True)}
+        for type in ('photo', 'link', 'chat'):
+            bodies['posts_' + type] = client.send_api_request('get', '/blog/staff.tumblr.com/posts/' + type,
+                                                              {'limit': 20}, ENDPOINTS['posts'].params, raw=True)
+        client.close()
+    bodies = {name: response.content for name, response in bodies.items()}
+
+    rng = random.Random(2013)
+    posts = [neue_post(10 ** 9 + number * 100, depth, rng) for number, depth in enumerate(TRAIL_DEPTHS)]
+    bodies['posts_npf'] = json.dumps({'meta': {'status': 200, 'msg': 'OK'}, 'response': {'posts': posts}},
+                                     separators=(',', ':')).encode('utf-8')
+
+    for name, body in bodies.items():
+        with open(os.path.join(DATA, name + '.json'), 'wb') as f:
+            f.write(body)
+        print('{:16} {:8} bytes'.format(name, len(body)))
+
+
+def cases() -> List[Case]:
+    request = TumblrRequest('key')
+    bodies = {name: load(name) for name in ('dashboard', 'posts_photo', 'posts_link', 'posts_chat', 'posts_npf')}
+    parsed = {name: request.json_parse(_Response(body)) for name, body in bodies.items()}
+    npf_posts = parsed['posts_npf']['posts']
+    deepest = max(npf_posts, key=lambda post: len(post['trail']))
+
+    found = [
+        Case('json_parse/dashboard', lambda: request.json_parse(_Response(bodies['dashboard']))),
+        Case('json_parse/npf', lambda: request.json_parse(_Response(bodies['posts_npf']))),
+        Case('wrap/dashboard', lambda: pytumblr._wrap(types.Dashboard, parsed['dashboard'])),
+    ]
+    for type in ('photo', 'link', 'chat'):
+        page = parsed['posts_' + type]
+        found.append(Case('wrap/posts_' + type, lambda page=page: pytumblr._wrap(types.BlogPosts, page)))
+    for type in ('photo', 'link', 'chat'):
+        posts = parsed['posts_' + type]['posts']
+        found.append(Case('post_dispatch/' + type, lambda posts=posts: [types.Post(**post) for post in posts]))
+    found += [
+        Case('neue_post/page', lambda: [npf.NeuePost(**post) for post in npf_posts]),
+        Case('neue_post/deep_trail', lambda: npf.NeuePost(**deepest)),
+    ]
+
+    posts_schema = ENDPOINTS['posts'].params
+    photo_schema = ENDPOINTS['create_post'].params['photo']
+    page_params = {'limit': 20, 'offset': 40, 'reblog_info': True, 'tag': 'art', 'api_key': 'key'}
+    photo_params = {'type': 'photo', 'caption': 'hi', 'tags': ['a', 'b'], 'source': 'https://example.com/a.png',
+                    'state': 'queue'}
+    names = sorted(posts_schema.names)
+    found += [
+        Case('validate/posts', lambda: validate_params(posts_schema, page_params)),
+        Case('validate/create_photo', lambda: validate_params(photo_schema, photo_params)),
+        Case('validate/list', lambda: validate_params(names, page_params)),
+    ]
+    return found
+
+
+def measure(op: Callable[[], object], repeat: int, min_time: float) -> Result:
+    """
+    :returns: the best of `repeat` timings of at least `min_time` seconds,
+              and the memory of one more operation
+    """
+    op()
+    timer = timeit.Timer(op)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    seconds = min(timer.repeat(repeat, number)) / number
+
+    gc.collect()
+    gc.disable()
+    try:
+        before = sys.getallocatedblocks()
+        result = op()
+        blocks = sys.getallocatedblocks() - before
+        del result
+
+        tracemalloc.start()
+        result = op()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del result
+    finally:
+        gc.enable()
+    return Result(1 / seconds, blocks, peak)
+
+
+def changes(result: Result, baseline: Dict) -> Dict[str, float]:
+    """
+    :returns: metric -> the percentage it got worse by, which is negative
+              if it got better
+    """
+    return {
+        'ops': (baseline['ops'] / result.ops - 1) * 100,
+        'blocks': (result.blocks / baseline['blocks'] - 1) * 100 if baseline['blocks'] else 0.0,
+        'peak': (result.peak / baseline['peak'] - 1) * 100 if baseline['peak'] else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', nargs='?', default='run', choices=('run', 'record'))
+    parser.add_argument('-k', '--filter', default='', help='only run cases whose name contains this')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.1, help='seconds each timing runs for at least')
+    parser.add_argument('--save', metavar='NAME', help='save the results as a baseline')
+    parser.add_argument('--compare', metavar='NAME', help='compare the results with a saved baseline')
+    parser.add_argument('--threshold', type=float, default=10.0, help='percent worse that counts as a regression')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record()
+        return
+
+    baseline = {}
+    if args.compare:
+        with open(os.path.join(BASELINES, args.compare + '.json')) as f:
+            baseline = json.load(f)['results']
+
+    print('{:28} {:>12} {:>8} {:>10}'.format('case', 'ops/s', 'blocks', 'peak KiB'))
+    results = {}
+    regressions = []
+    for case in cases():
+        if args.filter not in case.name:
+            continue
+        result = results[case.name] = measure(case.op, args.repeat, args.min_time)
+        line = '{:28} {:12,.0f} {:8} {:10.1f}'.format(case.name, result.ops, result.blocks, result.peak / 1024)
+        if case.name in baseline:
+            worse = changes(result, baseline[case.name])
+            line += '   ' + '  '.join('{} {:+.1f}%'.format(metric, change) for metric, change in worse.items())
+            if any(change > args.threshold for change in worse.values()):
+                regressions.append(case.name)
+                line += '  !'
+        print(line)
+
+    if args.save:
+        os.makedirs(BASELINES, exist_ok=True)
+        with open(os.path.join(BASELINES, args.save + '.json'), 'w') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'results': {name: vars(result) for name, result in results.items()}}, f, indent=2)
+    if regressions:
+        print('{} worse than {} by more than {:g}%: {}'.format(
+            len(regressions), args.compare, args.threshold, ', '.join(regressions)))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
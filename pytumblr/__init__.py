@@ -1,27 +1,49 @@
-from typing import List, ClassVar, TypeVar, Union, Type, Tuple
+from typing import List, ClassVar, TypeVar, Union, Type, Tuple, Iterator
 
 from pytumblr.request import TumblrResponse, TumblrError, ok, created, Status
 from . import npf
 from . import types
-from .helpers import validate_params, validate_blogname
-from .request import TumblrRequest
+from . import lazy as lazy_views
+from . import compact as compact_types
+from . import decode
+from .helpers import ParamSchema, validate_params, validate_blogname
+from .endpoints import Endpoint, ENDPOINTS, OFFSET, lookup
+from .pagination import paginate, by_offset, before, fetch_offset_pages
+from .streaming import stream_items
+from .bulk import BulkWriter, BulkResult, Journal
+from .multipart import Photoset
+from .ratelimit import RateLimiter, Rate
+from .retry import RetryPolicy, DEFAULT_RETRY_POLICY
+from .cache import ANONYMOUS, ResponseCache, MemoryCache, SqliteCache, ValidatorStore, identity
+from .request import TumblrRequest, TumblrRequestError
+from . import instrument
+from .instrument import BUILD, VALIDATE
 
 T: ClassVar[TypeVar] = TypeVar('T')
 Result = Union[T, TumblrError]
 
+_NO_PARAMS = ParamSchema.of()
+
 
 def _wrap(return_type: Type[T], response: TumblrResponse) -> Result[T]:
     if isinstance(response, TumblrError):
         return response
     else:
-        return return_type(**response)
+        return decode.decoder(return_type)(response)
 
 
 def _maybe_unwrap_posts(response: TumblrResponse) -> Result[List[types.Post]]:
-    if isinstance(response, types.Posts):
-        return response.posts
+    if isinstance(response, TumblrError):
+        return response
     else:
+        return response.posts
+
+
+def _page_of(attribute: str, response):
+    if isinstance(response, TumblrError):
         return response
+    else:
+        return getattr(response, attribute)
 
 
 class TumblrRestClient:
@@ -30,7 +52,11 @@ class TumblrRestClient:
     """
 
     def __init__(self, consumer_key, consumer_secret="", oauth_token="", oauth_secret="",
-                 host="https://api.tumblr.com"):
+                 host="https://api.tumblr.com", pool_connections=10, pool_maxsize=10,
+                 pool_block=False, keep_alive=True, rate_limiter=None,
+                 retry_policy=DEFAULT_RETRY_POLICY, write_retry_policy=None, retry_policies=None,
+                 cache=None, validators=None, coalesce=True, lazy=False, compact=False, json_loads=None,
+                 validate=True, api_key_only=None, hooks=None):
         """
         Initializes the TumblrRestClient object, creating the TumblrRequest
         object which deals with all request formatting.
@@ -45,18 +71,96 @@ class TumblrRestClient:
                              from the /access_token endpoint
         :param host: the host that are you trying to send information to,
                      defaults to https://api.tumblr.com
+        :param pool_connections: an int, the number of hosts to keep
+                                 connection pools for
+        :param pool_maxsize: an int, the maximum number of connections kept
+                             open per host; raise this if you share the
+                             client between many threads
+        :param pool_block: a boolean, whether to wait for a free pooled
+                           connection instead of opening an extra one
+        :param keep_alive: a boolean, whether to reuse connections between calls
+        :param rate_limiter: a pytumblr.ratelimit.RateLimiter to throttle
+                             requests with, see its documentation
+        :param retry_policy: a pytumblr.retry.RetryPolicy for reads, which
+                             are retried by default; None disables retries
+        :param write_retry_policy: a RetryPolicy for idempotent writes, e.g.
+                                   likes and follows, which are not
+                                   retried unless you pass one
+        :param retry_policies: a dict of per-endpoint policies, keyed by
+                               path, e.g. {'/user/like': RetryPolicy()}
+        :param cache: a pytumblr.cache.ResponseCache for GET responses
+        :param validators: a pytumblr.cache.ValidatorStore, to poll with
+                           conditional (ETag / If-Modified-Since) requests
+        :param coalesce: a boolean, whether threads making the same GET
+                         request at the same time share a single one
+        :param lazy: a boolean, whether typed responses are lazy views that
+                     only build nested objects and dates when read
+        :param compact: a boolean, whether typed responses are built from
+                        the slotted classes in pytumblr.compact, which take
+                        far less memory per object
+        :param json_loads: a function decoding response bodies from bytes,
+                           defaults to orjson or ujson if either is installed
+        :param validate: a boolean, whether to check the names and types of
+                         request parameters; turn it off (or set
+                         `client.validate = False`) in hot loops whose
+                         parameters are known to be good
+        :param api_key_only: a boolean, whether endpoints that accept an
+                             api_key, e.g. posts() and blog_info(), are
+                             called with just that and not signed with
+                             OAuth, which saves the signing work; responses
+                             are then those an anonymous client gets.
+                             Defaults to True when there's no oauth_token
+        :param hooks: a list of functions, each called with a
+                      pytumblr.instrument.RequestEvent after every call,
+                      e.g. a MetricsRegistry or a LogSink from
+                      pytumblr.instrument
+
+        :returns: None
+        """
+        self.request = TumblrRequest(consumer_key, consumer_secret, oauth_token, oauth_secret, host,
+                                     pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                     pool_block=pool_block, keep_alive=keep_alive,
+                                     rate_limiter=rate_limiter, retry_policy=retry_policy,
+                                     write_retry_policy=write_retry_policy, retry_policies=retry_policies,
+                                     validators=validators, coalesce=coalesce, json_loads=json_loads,
+                                     hooks=hooks)
+        self.cache = cache
+        self._signed_as = identity(oauth_token)
+        self.validate = validate
+        self.api_key_only = not oauth_token if api_key_only is None else api_key_only
+        if lazy and compact:
+            raise ValueError("`lazy` and `compact` can't be used together")
+        if lazy:
+            self._wrap = lazy_views.wrap
+        elif compact:
+            self._wrap = compact_types.wrap
+        else:
+            self._wrap = _wrap
+
+    def close(self):
+        """
+        Shuts down the connection pool used by this client
+
+            with pytumblr.TumblrRestClient(...) as client:
+                client.dashboard()
 
         :returns: None
         """
-        self.request = TumblrRequest(consumer_key, consumer_secret, oauth_token, oauth_secret, host)
+        self.request.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
-    def info(self) -> Result[types.BlogInfo]:
+    def info(self) -> Result[types.UserInfoResponse]:
         """
         Gets the information about the current given user
 
         :returns: A dict created from the JSON response
         """
-        return self.send_typed_request(types.BlogInfo, "get", "/user/info")
+        return self._call('info')
 
     @validate_blogname
     def avatar(self, blogname, size=64) -> Result[types.Avatar]:
@@ -67,8 +171,7 @@ class TumblrRestClient:
 
         :returns: A dict created from the JSON response
         """
-        url = "/blog/{0}/avatar/{1}".format(blogname, size)
-        return self.send_typed_request(types.Avatar, "get", url)
+        return self._call('avatar', blogname=blogname, size=size)
 
     def likes(self, **kwargs) -> Result[types.Likes]:
         """
@@ -83,8 +186,7 @@ class TumblrRestClient:
 
         :returns: A dict created from the JSON response
         """
-        return self.send_typed_request(types.Likes,
-                                       "get", "/user/likes", kwargs, ["limit", "offset", "before", "after"])
+        return self._call('likes', kwargs)
 
     def following(self, **kwargs):
         """
@@ -97,7 +199,7 @@ class TumblrRestClient:
 
         :returns: A dict created from the JSON response
         """
-        return self.send_typed_request(types.Following, "get", "/user/following", kwargs, ["limit", "offset"])
+        return self._call('following', kwargs)
 
     def dashboard(self, **kwargs) -> Result[types.Dashboard]:
         """
@@ -112,13 +214,7 @@ class TumblrRestClient:
 
         :returns: A dict created from the JSON response
         """
-        response = self.send_typed_request(types.Dashboard,
-                                       "get", "/user/dashboard", kwargs,
-                                       ["limit", "offset", "type", "since_id", "reblog_info", "notes_info"])
-        if isinstance(response, types.Dashboard):
-            return response.posts
-        else:
-            return response
+        return _page_of('posts', self._call('dashboard', kwargs))
 
     def tagged(self, tag, **kwargs) -> Result[List[types.Post]]:
         """
@@ -135,8 +231,7 @@ class TumblrRestClient:
         :returns: a dict created from the JSON response
         """
         kwargs.update({'tag': tag})
-        return _maybe_unwrap_posts(self.send_typed_request(types.Posts, "get", '/tagged', kwargs,
-                                       ['before', 'limit', 'filter', 'tag', 'api_key'], True))
+        return _maybe_unwrap_posts(self._call('tagged', kwargs))
 
     @validate_blogname
     def posts(self, blogname, type=None, **kwargs) -> Result[types.BlogPosts]:
@@ -154,17 +249,10 @@ class TumblrRestClient:
 
         :returns: a dict created from the JSON response
         """
-        if type is None:
-            url = '/blog/{0}/posts'.format(blogname)
-        else:
-            url = '/blog/{0}/posts/{1}'.format(blogname, type)
-        return self.send_typed_request(types.BlogPosts, "get", url, kwargs,
-                                       ['id', 'tag', 'limit', 'offset', 'reblog_info', 'notes_info', 'filter',
-                                        'api_key'],
-                                       True)
+        return self._call('posts', kwargs, blogname=blogname, type=type)
 
     @validate_blogname
-    def blog_info(self, blogname) -> Result[types.BlogInfo]:
+    def blog_info(self, blogname) -> Result[types.BlogInfoResponse]:
         """
         Gets the information of the given blog
 
@@ -173,8 +261,7 @@ class TumblrRestClient:
 
         :returns: a dict created from the JSON response of information
         """
-        url = "/blog/{0}/info".format(blogname)
-        return self.send_typed_request(types.BlogInfo, "get", url, {}, ['api_key'], True)
+        return self._call('blog_info', blogname=blogname)
 
     @validate_blogname
     def blog_following(self, blogname, **kwargs) -> Result[types.Following]:
@@ -192,8 +279,7 @@ class TumblrRestClient:
 
         :returns: a dict created from the JSON response
         """
-        url = "/blog/{0}/following".format(blogname)
-        return self.send_typed_request(types.Following, "get", url, kwargs, ['limit', 'offset'])
+        return self._call('blog_following', kwargs, blogname=blogname)
 
     @validate_blogname
     def followers(self, blogname, **kwargs) -> Result[types.Followers]:
@@ -207,8 +293,7 @@ class TumblrRestClient:
 
         :returns: A dict created from the JSON response
         """
-        url = "/blog/{0}/followers".format(blogname)
-        return self.send_typed_request(types.Followers, "get", url, kwargs, ['limit', 'offset'])
+        return self._call('followers', kwargs, blogname=blogname)
 
     @validate_blogname
     def blog_likes(self, blogname, **kwargs) -> Result[types.Likes]:
@@ -224,8 +309,7 @@ class TumblrRestClient:
 
         :returns: A dict created from the JSON response
         """
-        url = "/blog/{0}/likes".format(blogname)
-        return self.send_typed_request(types.Likes, "get", url, kwargs, ['limit', 'offset', 'before', 'after'], True)
+        return self._call('blog_likes', kwargs, blogname=blogname)
 
     @validate_blogname
     def queue(self, blogname, **kwargs) -> Result[List[types.Post]]:
@@ -238,9 +322,7 @@ class TumblrRestClient:
 
         :returns: a dict created from the JSON response
         """
-        url = "/blog/{0}/posts/queue".format(blogname)
-        return _maybe_unwrap_posts(
-            self.send_typed_request(types.Posts, "get", url, kwargs, ['limit', 'offset', 'filter']))
+        return _maybe_unwrap_posts(self._call('queue', kwargs, blogname=blogname))
 
     @validate_blogname
     def drafts(self, blogname, **kwargs) -> Result[List[types.Post]]:
@@ -250,13 +332,7 @@ class TumblrRestClient:
 
         :returns: a dict created from the JSON response
         """
-        url = "/blog/{0}/posts/draft".format(blogname)
-        response = self.send_typed_request(types.Posts, "get", url, kwargs, ['filter'])
-        if isinstance(response, types.Posts):
-            return response.posts
-        else:
-            # err
-            return response
+        return _maybe_unwrap_posts(self._call('drafts', kwargs, blogname=blogname))
 
     @validate_blogname
     def submission(self, blogname, **kwargs) -> Result[types.Submission]:
@@ -268,8 +344,178 @@ class TumblrRestClient:
 
         :returns: a dict created from the JSON response
         """
-        url = "/blog/{0}/posts/submission".format(blogname)
-        return self.send_typed_request(types.Submission, "get", url, kwargs, ["offset", "filter"])
+        return self._call('submission', kwargs, blogname=blogname)
+
+    @validate_blogname
+    def iter_posts(self, blogname, prefetch=False, **kwargs) -> Iterator[types.Post]:
+        """
+        Iterates over every post of a blog, newest first, paging by offset
+
+        :param blogname: a string, the blog you want the posts of
+        :param prefetch: a boolean, fetch the next page in the background
+                         while the current one is being consumed
+        :param kwargs: any parameter accepted by posts(), e.g. type or tag
+
+            for post in client.iter_posts('staff', type='photo', limit=50):
+                ...
+
+        :returns: an iterator of posts; raises TumblrRequestError if a page fails
+        """
+        type = kwargs.pop('type', None)
+        return self._iterate('posts', kwargs, prefetch, blogname=blogname, type=type)
+
+    @validate_blogname
+    def stream_posts(self, blogname, type=None, raw=False, chunk_size=65536, **kwargs) -> Iterator[types.Post]:
+        """
+        Gets a page of posts from a blog like posts(), but yields each post
+        as soon as it has been read off the connection
+
+        Only one post is held in memory at a time, which helps with large
+        pages, e.g. with reblog_info and notes_info turned on.
+
+        :param blogname: a string, the blog you want the posts of
+        :param type: the type of posts you want returned, e.g. video
+        :param raw: a boolean, yield each post's dict instead of a types.Post
+        :param chunk_size: an int, the number of bytes read at a time
+        :param kwargs: any other parameter accepted by posts(), e.g. limit
+
+            for post in client.stream_posts('staff', limit=50, notes_info=True):
+                ...
+
+        :returns: an iterator of posts; raises TumblrRequestError if the request fails
+        """
+        endpoint = ENDPOINTS['posts']
+        if self.validate:
+            endpoint.schema().validate(kwargs)
+        params = dict(kwargs, api_key=self.request.consumer_key)
+        return self._stream(endpoint.url(blogname=blogname, type=type), params, types.Post, raw, chunk_size,
+                            signed=not self.api_key_only)
+
+    def stream_dashboard(self, raw=False, chunk_size=65536, **kwargs) -> Iterator[types.DashboardPost]:
+        """
+        Gets a page of the dashboard like dashboard(), but yields each post
+        as soon as it has been read off the connection
+
+        :param raw: a boolean, yield each post's dict instead of a types.Post
+        :param chunk_size: an int, the number of bytes read at a time
+        :param kwargs: any parameter accepted by dashboard(), e.g. limit
+
+        :returns: an iterator of posts; raises TumblrRequestError if the request fails
+        """
+        if self.validate:
+            ENDPOINTS['dashboard'].schema().validate(kwargs)
+        return self._stream('/user/dashboard', kwargs, types.DashboardPost, raw, chunk_size)
+
+    def _stream(self, url, params, post_type, raw, chunk_size, signed=True) -> Iterator[types.Post]:
+        response = self.request.get_stream(url, params, signed=signed)
+        if isinstance(response, TumblrError):
+            raise TumblrRequestError(response)
+        try:
+            posts = stream_items(response.iter_content(chunk_size), ('response', 'posts'), self.request.json_loads)
+            for post in posts:
+                yield post if raw else self._wrap(post_type, post)
+        finally:
+            response.close()
+
+    @validate_blogname
+    def fetch_all_posts(self, blogname, workers=4, limit=20, **kwargs) -> Result[List[types.Post]]:
+        """
+        Fetches a blog's whole archive with several pages requested at once
+
+        Reads the post count from the first page, splits the rest of the
+        archive into offset windows of `limit` posts and fetches them on
+        `workers` threads.
+
+        :param blogname: a string, the blog you want the posts of
+        :param workers: an int, the number of pages fetched at the same time
+        :param limit: an int, the number of posts per page (at most 20)
+        :param kwargs: any other parameter accepted by posts(), e.g. filter
+
+            posts = client.fetch_all_posts('staff', workers=8)
+
+        :returns: a list of posts, newest first, or the first TumblrError met
+        """
+        first = self.posts(blogname, **dict(kwargs, offset=0, limit=limit))
+        if isinstance(first, TumblrError):
+            return first
+        total = first.total_posts if first.total_posts is not None else first.blog.posts
+
+        rest = fetch_offset_pages(lambda params: _page_of('posts', self.posts(blogname, **params)),
+                                  kwargs, total, limit, workers, start=limit)
+        if isinstance(rest, TumblrError):
+            return rest
+        # posts published mid-fetch shift the offsets and repeat a few posts
+        # across page boundaries
+        unique = {}
+        for post in first.posts + rest:
+            unique.setdefault(post.id, post)
+        return list(unique.values())
+
+    @validate_blogname
+    def iter_blog_likes(self, blogname, prefetch=False, **kwargs) -> Iterator[types.Post]:
+        """
+        Iterates over every post a blog has liked, paging by like timestamp
+
+        :param blogname: a string, the blog you want the likes of
+        :param prefetch: a boolean, fetch the next page in the background
+
+        :returns: an iterator of posts; raises TumblrRequestError if a page fails
+        """
+        return self._iterate('blog_likes', kwargs, prefetch, blogname=blogname)
+
+    def iter_likes(self, prefetch=False, **kwargs) -> Iterator[types.Post]:
+        """
+        Iterates over every post the current user has liked, paging by like timestamp
+
+        :param prefetch: a boolean, fetch the next page in the background
+
+        :returns: an iterator of posts; raises TumblrRequestError if a page fails
+        """
+        return self._iterate('likes', kwargs, prefetch)
+
+    @validate_blogname
+    def iter_followers(self, blogname, prefetch=False, **kwargs) -> Iterator[types.Follower]:
+        """
+        Iterates over every follower of a blog, paging by offset
+
+        :param blogname: a string, the blog you want the followers of
+        :param prefetch: a boolean, fetch the next page in the background
+
+        :returns: an iterator of followers; raises TumblrRequestError if a page fails
+        """
+        return self._iterate('followers', kwargs, prefetch, blogname=blogname)
+
+    def iter_following(self, prefetch=False, **kwargs) -> Iterator[types.BlogInfo]:
+        """
+        Iterates over every blog the current user follows, paging by offset
+
+        :param prefetch: a boolean, fetch the next page in the background
+
+        :returns: an iterator of blogs; raises TumblrRequestError if a page fails
+        """
+        return self._iterate('following', kwargs, prefetch)
+
+    def iter_dashboard(self, prefetch=False, **kwargs) -> Iterator[types.DashboardPost]:
+        """
+        Iterates over the current user's dashboard, newest first, paging by offset
+
+        :param prefetch: a boolean, fetch the next page in the background
+        :param kwargs: any parameter accepted by dashboard(), e.g. type
+
+        :returns: an iterator of posts; raises TumblrRequestError if a page fails
+        """
+        return self._iterate('dashboard', kwargs, prefetch)
+
+    def iter_tagged(self, tag, prefetch=False, **kwargs) -> Iterator[types.Post]:
+        """
+        Iterates over every post with the given tag, paging by post timestamp
+
+        :param tag: a string, the tag you want to look for
+        :param prefetch: a boolean, fetch the next page in the background
+
+        :returns: an iterator of posts; raises TumblrRequestError if a page fails
+        """
+        return self._iterate('tagged', dict(kwargs, tag=tag), prefetch)
 
     @validate_blogname
     def follow(self, blogname) -> Status:
@@ -280,8 +526,7 @@ class TumblrRestClient:
 
         :returns: True if the blog was followed and False otherwise
         """
-        url = "/user/follow"
-        return ok(self.send_api_request("post", url, {'url': blogname}, ['url']))
+        return self._call('follow', {'url': blogname})
 
     @validate_blogname
     def unfollow(self, blogname) -> Status:
@@ -292,8 +537,7 @@ class TumblrRestClient:
 
         :returns: True if the blog was unfollowed and False otherwise
         """
-        url = "/user/unfollow"
-        return ok(self.send_api_request("post", url, {'url': blogname}, ['url']))
+        return self._call('unfollow', {'url': blogname})
 
     def like(self, id, reblog_key) -> Status:
         """
@@ -304,9 +548,7 @@ class TumblrRestClient:
 
         :returns: True if the post was liked and False otherwise
         """
-        url = "/user/like"
-        params = {'id': id, 'reblog_key': reblog_key}
-        return ok(self.send_api_request("post", url, params, ['id', 'reblog_key']))
+        return self._call('like', {'id': id, 'reblog_key': reblog_key})
 
     def unlike(self, id, reblog_key) -> Status:
         """
@@ -317,9 +559,7 @@ class TumblrRestClient:
 
         :returns: True if the post was unliked and False otherwise
         """
-        url = "/user/unlike"
-        params = {'id': id, 'reblog_key': reblog_key}
-        return ok(self.send_api_request("post", url, params, ['id', 'reblog_key']))
+        return self._call('unlike', {'id': id, 'reblog_key': reblog_key})
 
     @validate_blogname
     def create_photo(self, blogname, **kwargs) -> Status:
@@ -336,11 +576,18 @@ class TumblrRestClient:
         :param caption: a string, the caption that you want applied to the photo
         :param link: a string, the 'click-through' url you want on the photo
         :param source: a string, the photo source url
-        :param data: a string or a list of the path of photo(s)
+        :param data: a string or a list of the path of photo(s); bytes,
+                     memoryviews and open binary files work as well. A
+                     list is checked as a pytumblr.multipart.Photoset
+                     before anything is sent
+        :param progress: a function called with (bytes sent, total bytes)
+                         while the photos upload
 
         :returns: a dict created from the JSON response
         """
         kwargs.update({"type": "photo"})
+        if isinstance(kwargs.get('data'), list):
+            kwargs['data'] = Photoset(kwargs['data'])
         return self._send_post(blogname, kwargs)
 
     @validate_blogname
@@ -438,7 +685,10 @@ class TumblrRestClient:
         :param slug: a string, a short text summary to the end of the post url
         :param caption: a string, the caption for the post
         :param external_url: a string, the url of the audio you are uploading
-        :param data: a string, the local filename path of the audio you are uploading
+        :param data: a string, the local filename path of the audio you are uploading,
+                     or its bytes or open binary file
+        :param progress: a function called with (bytes sent, total bytes)
+                         while the audio uploads
 
         :returns: a dict created from the JSON response
         """
@@ -459,7 +709,10 @@ class TumblrRestClient:
         :param slug: a string, a short text summary to the end of the post url
         :param caption: a string, the caption for the post
         :param embed: a string, the emebed code that you'd like to upload
-        :param data: a string, the local filename path of the video you are uploading
+        :param data: a string, the local filename path of the video you are uploading,
+                     or its bytes or open binary file
+        :param progress: a function called with (bytes sent, total bytes)
+                         while the video uploads
 
         :returns: a dict created from the JSON response
         """
@@ -478,13 +731,10 @@ class TumblrRestClient:
 
         :returns: a dict created from the JSON response
         """
-        url = "/blog/{0}/post/reblog".format(blogname)
-
-        valid_options = ['id', 'reblog_key', 'comment'] + self._post_valid_options(kwargs.get('type', None))
         if 'tags' in kwargs and kwargs['tags']:
             # Take a list of tags and make them acceptable for upload
             kwargs['tags'] = ",".join(kwargs['tags'])
-        return created(self.send_api_request('post', url, kwargs, valid_options))
+        return self._call('reblog', kwargs, blogname=blogname)
 
     @validate_blogname
     def delete_post(self, blogname, id) -> Status:
@@ -496,8 +746,21 @@ class TumblrRestClient:
 
         :returns: a dict created from the JSON response
         """
-        url = "/blog/{0}/post/delete".format(blogname)
-        return ok(self.send_api_request('post', url, {'id': id}, ['id']))
+        return self._call('delete_post', {'id': id}, blogname=blogname)
+
+    def bulk(self, journal=None) -> BulkWriter:
+        """
+        Starts a batch of writes to run concurrently
+
+        :param journal: a string or pytumblr.bulk.Journal, a file recording
+                        finished writes, so that running the same batch
+                        again skips the ones that already succeeded
+
+            results = client.bulk('curation.jsonl').like(id, key).follow('staff').execute(workers=8)
+
+        :returns: a BulkWriter
+        """
+        return BulkWriter(self, journal)
 
     @validate_blogname
     def edit_post(self, blogname, **kwargs) -> Status:
@@ -515,37 +778,10 @@ class TumblrRestClient:
 
         :returns: True if the post was created successfully and False otherwise
         """
-        url = "/blog/{0}/post/edit".format(blogname)
-
         if 'tags' in kwargs and kwargs['tags']:
             # Take a list of tags and make them acceptable for upload
             kwargs['tags'] = ",".join(kwargs['tags'])
-
-        valid_options = ['id'] + self._post_valid_options(kwargs.get('type', None))
-        return ok(self.send_api_request('post', url, kwargs, valid_options))
-
-    # Parameters valid for /post, /post/edit, and /post/reblog.
-    def _post_valid_options(self, post_type=None) -> List[str]:
-        # These options are always valid
-        valid = ['type', 'state', 'tags', 'tweet', 'date', 'format', 'slug']
-
-        # Other options are valid on a per-post-type basis
-        if post_type == 'text':
-            valid += ['title', 'body']
-        elif post_type == 'photo':
-            valid += ['caption', 'link', 'source', 'data', 'photoset_layout']
-        elif post_type == 'quote':
-            valid += ['quote', 'source']
-        elif post_type == 'link':
-            valid += ['title', 'url', 'description', 'thumbnail']
-        elif post_type == 'chat':
-            valid += ['title', 'conversation']
-        elif post_type == 'audio':
-            valid += ['caption', 'external_url', 'data']
-        elif post_type == 'video':
-            valid += ['caption', 'embed', 'data']
-
-        return valid
+        return self._call('edit_post', kwargs, blogname=blogname)
 
     def _send_post(self, blogname, params) -> Tuple[bool, TumblrError]:
         """
@@ -554,57 +790,128 @@ class TumblrRestClient:
 
         :param blogname: a string, the blogname of the blog you are posting to
         :param params: a dict, the key-value of the parameters for the api request
-        :param valid_options: a list of valid options that the request allows
 
         :returns: if the post succeeded and any additional information given in the response
         """
-        url = "/blog/{0}/post".format(blogname)
-        valid_options = self._post_valid_options(params.get('type', None))
-
         if len(params.get("tags", [])) > 0:
             # Take a list of tags and make them acceptable for upload
             params['tags'] = ",".join(params['tags'])
 
-        return created(self.send_api_request("post", url, params, valid_options))
+        return self._call('create_post', params, blogname=blogname)
+
+    def _call(self, name: str, params=None, **path):
+        """
+        Calls one of the endpoints in pytumblr.endpoints.ENDPOINTS
+
+        :param name: a string, the endpoint's name
+        :param params: a dict, the parameters of the request
+        :param path: the arguments of the endpoint's path, e.g. blogname
+
+        :returns: the response built as the endpoint's return type, or a
+                  Status for writes
+        """
+        endpoint = ENDPOINTS[name]
+        if endpoint.returns is not None:
+            return self.send_typed_request(endpoint.returns, endpoint.method, endpoint.url(**path), params,
+                                           endpoint.schema(params), endpoint.needs_api_key, endpoint)
+        response = self.send_api_request(endpoint.method, endpoint.url(**path), params,
+                                         endpoint.schema(params), endpoint.needs_api_key, endpoint=endpoint)
+        return created(response) if endpoint.creates else ok(response)
+
+    def _iterate(self, name: str, params, prefetch, **path) -> Iterator:
+        """
+        Pages through an endpoint by its cursor, yielding every item
+        """
+        cursor = ENDPOINTS[name].cursor
+        advance = by_offset if cursor.by == OFFSET else before(cursor.timestamp_of)
+        return paginate(lambda page: _page_of(cursor.items, self._call(name, dict(page), **path)),
+                        params, advance, prefetch)
 
     def send_typed_request(self, return_type: Type[T], method: str, url,
-                           params=None, valid_parameters=None, needs_api_key=False) -> Result[T]:
-        return _wrap(return_type, self.send_api_request(url, params, valid_parameters, needs_api_key))
+                           params=None, valid_parameters=None, needs_api_key=False,
+                           endpoint: Endpoint = None) -> Result[T]:
+        with instrument.tracing(self.request.hooks, method, url, endpoint) as trace:
+            response = self.send_api_request(method, url, params, valid_parameters, needs_api_key,
+                                             endpoint=endpoint)
+            with instrument.timed(trace, BUILD):
+                if self.request.validators is not None:
+                    # a 304 hands back the same response, so reuse what we built from it
+                    return self.request.validators.typed(response, return_type, self._wrap)
+                return self._wrap(return_type, response)
 
     def send_api_request(self, method: str, url,
-                         params=None, valid_parameters=None, needs_api_key=False) -> TumblrResponse:
+                         params=None, valid_parameters=None, needs_api_key=False, raw=False,
+                         endpoint: Endpoint = None) -> TumblrResponse:
         """
         Sends the url with parameters to the requested url, validating them
         to make sure that they are what we expect to have passed to us
 
         :param method: a string, the request method you want to make
         :param params: a dict, the parameters used for the API request
-        :param valid_parameters: a list, the list of valid parameters
+        :param valid_parameters: a ParamSchema (or a list of names) of the
+                                 valid parameters
         :param needs_api_key: a boolean, whether or not your request needs an api key injected
+        :param raw: a boolean, whether to skip decoding and return a
+                    pytumblr.request.RawResponse, e.g. to store the body as is
+        :param endpoint: the pytumblr.endpoints.Endpoint being called, if
+                         known; otherwise it's looked up from the url
 
         :returns: a dict parsed from the JSON response
         """
+        with instrument.tracing(self.request.hooks, method, url, endpoint) as trace:
+            response = self._send_api_request(method, url, params, valid_parameters, needs_api_key, raw, endpoint)
+            if trace is not None:
+                trace.result = response
+            return response
+
+    def _send_api_request(self, method, url, params, valid_parameters, needs_api_key, raw,
+                          endpoint) -> TumblrResponse:
         if valid_parameters is None:
-            valid_parameters = []
+            valid_parameters = _NO_PARAMS
         if params is None:
             params = {}
-        if needs_api_key:
-            params.update({'api_key': self.request.consumer_key})
-            valid_parameters.append('api_key')
 
+        # uploads are opened one at a time as the body is streamed
         files = {}
         if 'data' in params:
-            if isinstance(params['data'], list):
+            if isinstance(params['data'], Photoset):
+                files = dict(params['data'].parts)
+            elif isinstance(params['data'], list):
                 for idx, data in enumerate(params['data']):
-                    files['data[' + str(idx) + ']'] = open(params['data'][idx], 'rb')
+                    files['data[' + str(idx) + ']'] = data
             else:
-                files = {'data': open(params['data'], 'rb')}
+                files = {'data': params['data']}
             del params['data']
+        progress = params.pop('progress', None)
 
-        validate_params(valid_parameters, params)
+        if self.validate:
+            with instrument.timed(instrument.current(), VALIDATE):
+                validate_params(valid_parameters, params)
+        signed = True
+        if needs_api_key:
+            # added after validation, so schemas needn't list it
+            params['api_key'] = self.request.consumer_key
+            signed = not self.api_key_only
         if method.lower() == "get":
-            return self.request.get(url, params)
+            if self.cache is None or raw:
+                return self.request.get(url, params, raw=raw, signed=signed)
+            if endpoint is None:
+                endpoint = lookup(method, url)
+            if endpoint is not None and not endpoint.cacheable:
+                # private or quickly changing, e.g. the dashboard
+                return self.request.get(url, params, signed=signed)
+            made_as = self._signed_as if signed else ANONYMOUS
+            response = self.cache.get(url, params, made_as)
+            if response is None:
+                response = self.request.get(url, params, signed=signed)
+                if not isinstance(response, TumblrError):
+                    self.cache.set(url, params, response, made_as)
+            return response
         elif method.lower() == "post":
-            return self.request.post(url, params, files)
+            return self.request.post(url, params, files, raw=raw, progress=progress)
         else:
             raise ValueError('`method` must be either "GET" or "POST"')
+
+
+from .aio import AsyncTumblrRestClient
+from .pool import TumblrClientPool, Credentials
@@ -0,0 +1,176 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial, wraps
+
+from . import TumblrRestClient
+from .endpoints import ENDPOINTS
+from .singleflight import AsyncSingleFlight
+
+# methods only reading from the API, whose concurrent identical calls are coalesced
+_READ_METHODS = frozenset([endpoint.name for endpoint in ENDPOINTS.values()
+                           if endpoint.method == 'get' and endpoint.idempotent] + ['fetch_all_posts'])
+
+
+class AsyncTumblrRestClient:
+    """
+    An asyncio version of TumblrRestClient
+
+    Every API method of TumblrRestClient is available here as a coroutine
+    taking the same arguments and returning the same typed results, and
+    every iter_* method as an async iterator:
+
+        async with pytumblr.AsyncTumblrRestClient(key, secret, token, token_secret,
+                                                  concurrency=32) as client:
+            infos = await asyncio.gather(*[client.blog_info(blog) for blog in blogs])
+
+    Calls are run on a bounded pool of worker threads sharing one pooled
+    TumblrRequest, so at most `concurrency` requests are in flight at once
+    and the rest wait their turn. Parameter validation and response
+    wrapping are exactly those of the synchronous client.
+    """
+
+    def __init__(self, consumer_key, consumer_secret="", oauth_token="", oauth_secret="",
+                 host="https://api.tumblr.com", concurrency=10, executor=None, **options):
+        """
+        :param concurrency: an int, the maximum number of requests in flight
+        :param executor: a concurrent.futures.Executor to run requests on
+                         instead of the client's own thread pool; it is not
+                         shut down by :meth:`close`
+        :param options: any other keyword arguments accepted by
+                        TumblrRestClient, e.g. `pool_block`
+
+        :returns: None
+        """
+        options.setdefault('pool_maxsize', concurrency)
+        self.client = TumblrRestClient(consumer_key, consumer_secret, oauth_token, oauth_secret, host,
+                                       **options)
+        self.concurrency = concurrency
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='pytumblr')
+        self.executor = executor
+        # coalesces identical reads before they take up a worker thread;
+        # TumblrRequest coalesces again across threads and clients
+        self.single_flight = AsyncSingleFlight() if options.get('coalesce', True) else None
+        # sync iterators of iter_*/stream_* calls still being iterated ->
+        # the next() in flight on them, if any
+        self._iterators = {}
+
+    @property
+    def request(self):
+        return self.client.request
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    async def close(self):
+        """
+        Waits for in-flight requests and shuts down the worker threads and
+        connection pool
+
+        :returns: None
+        """
+        # iterators abandoned without being closed, e.g. by a break out of
+        # `async for`, are finalized later, when the executor is gone
+        iterators = dict(self._iterators)
+        self._iterators.clear()
+        if iterators:
+            await self._run(_close_all, iterators)
+        if self._owns_executor:
+            await self._run_shutdown()
+        self.client.close()
+
+    async def _run_shutdown(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.executor.shutdown)
+
+    def bulk(self, journal=None):
+        """
+        Starts a batch of writes, like TumblrRestClient.bulk()
+
+        The batch runs on its own threads, so await it with
+        loop.run_in_executor(None, writer.execute).
+        """
+        return self.client.bulk(journal)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+def _coroutine(name):
+    method = getattr(TumblrRestClient, name)
+
+    @wraps(method)
+    async def call(self, *args, **kwargs):
+        def run():
+            return self._run(getattr(self.client, name), *args, **kwargs)
+
+        if self.single_flight is None or name not in _READ_METHODS:
+            return await run()
+        return await self.single_flight.do((name, _freeze(args, kwargs)), run)
+
+    return call
+
+
+def _freeze(args, kwargs):
+    return repr(args), tuple(sorted((key, repr(value)) for key, value in kwargs.items()))
+
+
+_EXHAUSTED = object()
+
+
+def _async_iterator(name):
+    method = getattr(TumblrRestClient, name)
+
+    @wraps(method)
+    async def iterate(self, *args, **kwargs):
+        items = getattr(self.client, name)(*args, **kwargs)
+        iterators = self._iterators
+        iterators[items] = item = None
+        try:
+            while True:
+                pending = iterators[items] = self.executor.submit(next, items, _EXHAUSTED)
+                item = await asyncio.wrap_future(pending)
+                if item is _EXHAUSTED:
+                    return
+                yield item
+        finally:
+            # stopped early: close the generator, and with it e.g. the
+            # response stream_* reads from, once it's no longer running;
+            # unless close() already has
+            pending = iterators.pop(items, _EXHAUSTED)
+            if pending is not _EXHAUSTED and item is not _EXHAUSTED:
+                try:
+                    closing = self.executor.submit(_close, items, pending)
+                except RuntimeError:
+                    # the executor was shut down, and with it any next()
+                    _close(items, None)
+                else:
+                    await asyncio.wrap_future(closing)
+
+    return iterate
+
+
+def _close(items, pending):
+    if pending is not None:
+        wait([pending])
+    if hasattr(items, 'close'):
+        items.close()
+
+
+def _close_all(iterators):
+    for items, pending in iterators.items():
+        _close(items, pending)
+
+
+# mirror the public surface of the synchronous client
+for _name, _value in vars(TumblrRestClient).items():
+    if callable(_value) and not _name.startswith('_') and _name not in ('close', 'bulk'):
+        if _name.startswith(('iter_', 'stream_')):
+            setattr(AsyncTumblrRestClient, _name, _async_iterator(_name))
+        else:
+            setattr(AsyncTumblrRestClient, _name, _coroutine(_name))
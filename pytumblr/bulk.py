@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .request import TumblrError
+
+
+@dataclass
+class Operation:
+    """
+    One call of a TumblrRestClient write method
+    """
+    # the client method, e.g. 'like'
+    method: str
+    args: Tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    # how many identical operations were queued before this one in the same
+    # batch, so that a write queued twice on purpose is done twice
+    occurrence: int = 0
+
+    @property
+    def key(self) -> str:
+        """
+        Identifies the operation in a journal
+        """
+        key = [self.method, list(self.args), self.kwargs]
+        if self.occurrence:
+            key.append(self.occurrence)
+        return json.dumps(key, sort_keys=True, default=str)
+
+
+@dataclass
+class BulkResult:
+    operation: Operation
+    # whether the write succeeded (or had, according to the journal)
+    ok: bool
+    # what the client method returned, e.g. a Status tuple
+    response: Any = None
+    # the exception the call raised, if it raised one
+    error: Optional[BaseException] = None
+    # True if the journal says an earlier run already did this write
+    skipped: bool = False
+
+
+def succeeded(response) -> bool:
+    """
+    :param response: what a client write method returned
+
+    :returns: True if it reports success
+    """
+    if isinstance(response, TumblrError):
+        return False
+    if isinstance(response, tuple) and len(response) == 2 and isinstance(response[0], bool):
+        # a Status
+        return response[0]
+    return True
+
+
+class Journal:
+    """
+    An append-only record of finished writes, one JSON object per line
+
+    Successful writes are skipped when a batch is run again with the same
+    journal, so a job that crashed halfway can simply be restarted. Failed
+    writes are recorded too, but are tried again.
+    """
+
+    def __init__(self, path: str, fsync=False):
+        """
+        :param path: a string, the journal file, created if missing
+        :param fsync: a boolean, whether to fsync after every record, so
+                      nothing is lost even if the machine goes down
+        """
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+
+    def completed(self) -> Set[str]:
+        """
+        :returns: the keys of the operations that have succeeded
+        """
+        if not os.path.exists(self.path):
+            return set()
+        done = set()
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # the last line may be cut short by a crash
+                    continue
+                if entry.get('ok'):
+                    done.add(entry['key'])
+        return done
+
+    def record(self, result: BulkResult):
+        entry = {'key': result.operation.key, 'ok': result.ok}
+        if not result.ok:
+            entry['error'] = repr(result.error) if result.error is not None else repr(result.response)
+        line = json.dumps(entry) + '\n'
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class BulkWriter:
+    """
+    Collects writes and runs them concurrently
+
+        results = (client.bulk(journal='likes.jsonl')
+                   .like(id, reblog_key)
+                   .follow('staff')
+                   .execute(workers=8))
+        failed = [result for result in results if not result.ok]
+
+    Calls go through the client as usual, so they are counted against its
+    rate limiter and retried by its write retry policy, if it has either.
+    """
+
+    def __init__(self, client, journal: Optional[Journal] = None):
+        """
+        :param client: the TumblrRestClient to write through
+        :param journal: a Journal, or a path to one, to skip the writes an
+                        earlier run already did
+        """
+        self.client = client
+        self.journal = Journal(journal) if isinstance(journal, str) else journal
+        self.operations: List[Operation] = []
+        # Operation.key -> how many operations with it have been queued
+        self._queued: Dict[str, int] = {}
+
+    def add(self, method: str, *args, **kwargs) -> 'BulkWriter':
+        """
+        Queues a call of any client method
+        """
+        if not callable(getattr(self.client, method, None)):
+            raise ValueError('{} is not a method of the client'.format(method))
+        operation = Operation(method, args, kwargs)
+        key = operation.key
+        operation.occurrence = self._queued.get(key, 0)
+        self._queued[key] = operation.occurrence + 1
+        self.operations.append(operation)
+        return self
+
+    def like(self, id, reblog_key) -> 'BulkWriter':
+        return self.add('like', id, reblog_key)
+
+    def unlike(self, id, reblog_key) -> 'BulkWriter':
+        return self.add('unlike', id, reblog_key)
+
+    def follow(self, blogname) -> 'BulkWriter':
+        return self.add('follow', blogname)
+
+    def unfollow(self, blogname) -> 'BulkWriter':
+        return self.add('unfollow', blogname)
+
+    def reblog(self, blogname, **kwargs) -> 'BulkWriter':
+        return self.add('reblog', blogname, **kwargs)
+
+    def delete_post(self, blogname, id) -> 'BulkWriter':
+        return self.add('delete_post', blogname, id)
+
+    def __len__(self):
+        return len(self.operations)
+
+    def _run(self, operation: Operation) -> BulkResult:
+        try:
+            # the client may change the kwargs it's given, e.g. joining tags
+            response = getattr(self.client, operation.method)(*operation.args, **dict(operation.kwargs))
+        except Exception as e:
+            result = BulkResult(operation, False, error=e)
+        else:
+            result = BulkResult(operation, succeeded(response), response)
+        if self.journal is not None:
+            self.journal.record(result)
+        return result
+
+    def execute(self, workers=4) -> List[BulkResult]:
+        """
+        Runs every queued write, `workers` at a time
+
+        Errors don't stop the batch; each one is reported in its result.
+
+        :param workers: an int, the number of writes in flight at once
+
+        :returns: a list of BulkResults, in the order the writes were added
+        """
+        done = self.journal.completed() if self.journal is not None else set()
+        results: List[Optional[BulkResult]] = [None] * len(self.operations)
+        pending = []
+        for index, operation in enumerate(self.operations):
+            if operation.key in done:
+                results[index] = BulkResult(operation, True, skipped=True)
+            else:
+                pending.append(index)
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pytumblr-bulk') as executor:
+                ran = executor.map(self._run, [self.operations[index] for index in pending])
+                for index, result in zip(pending, ran):
+                    results[index] = result
+        finally:
+            if self.journal is not None:
+                self.journal.close()
+        return results
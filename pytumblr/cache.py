@@ -0,0 +1,332 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .retry import endpoint_key
+
+# endpoints worth caching by default, keyed like RetryPolicy overrides; a
+# key also covers every path below it, unless a longer key overrides it
+DEFAULT_TTLS: Dict[str, float] = {
+    '/blog/{blogname}/info': 300,
+    '/blog/{blogname}/avatar': 3600,
+    '/blog/{blogname}/posts': 60,
+    # the owner's own listings, which change as soon as they act on them
+    '/blog/{blogname}/posts/queue': 0,
+    '/blog/{blogname}/posts/draft': 0,
+    '/blog/{blogname}/posts/submission': 0,
+}
+
+# who a request was made as when it was sent unsigned, with just the
+# consumer key as `api_key`
+ANONYMOUS = 'api_key'
+
+
+def identity(oauth_token: str) -> str:
+    """
+    :returns: who a signed request was made as: a digest of its OAuth
+              token, so that the token itself isn't written to a backend
+    """
+    return 'oauth:' + hashlib.sha256(oauth_token.encode('utf-8')).hexdigest()[:16]
+
+
+class CacheBackend:
+    """
+    Where a ResponseCache keeps its entries
+
+    Subclass this to share a cache between processes, e.g. in a local
+    key-value store. Values are JSON-compatible, as parsed from responses.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        :returns: the value stored under `key`, or None if there is none or
+                  it has expired
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float):
+        """
+        Stores `value` under `key` for `ttl` seconds
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """
+    A bounded in-process cache evicting the least recently used entries
+    """
+
+    def __init__(self, maxsize=1024, clock=time.monotonic):
+        """
+        :param maxsize: an int, the most entries kept at once
+        """
+        self.maxsize = maxsize
+        self.clock = clock
+        # key -> (expiry, value), least recently used first
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteCache(CacheBackend):
+    """
+    An on-disk cache that several processes can share
+
+    Expiry uses wall-clock time, since it has to agree between processes.
+    """
+
+    def __init__(self, path, clock=time.time):
+        """
+        :param path: a string, the database file, created if missing
+        """
+        self.path = path
+        self.clock = clock
+        self._local = threading.local()
+        with self._connection() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS responses '
+                       '(key TEXT PRIMARY KEY, expires REAL NOT NULL, value TEXT NOT NULL)')
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite connections can't be shared between threads
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=30)
+        return db
+
+    def get(self, key):
+        row = self._connection().execute('SELECT expires, value FROM responses WHERE key = ?', (key,)).fetchone()
+        if row is None or row[0] <= self.clock():
+            return None
+        return json.loads(row[1])
+
+    def set(self, key, value, ttl):
+        with self._connection() as db:
+            db.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?)',
+                       (key, self.clock() + ttl, json.dumps(value)))
+
+    def delete(self, key):
+        with self._connection() as db:
+            db.execute('DELETE FROM responses WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._connection() as db:
+            db.execute('DELETE FROM responses')
+
+
+class ResponseCache:
+    """
+    Caches successful GET responses for TumblrRestClient
+
+    Entries are keyed on who the request was made as, the url and its
+    sorted parameters, and expire after a TTL chosen per endpoint. Only endpoints with a positive TTL are
+    cached; by default that is blog info, avatars and blog posts.
+
+        cache = ResponseCache(ttls={'/blog/{blogname}/info': 600})
+        client = pytumblr.TumblrRestClient(key, cache=cache)
+        ...
+        print(cache.hits, cache.misses)
+
+    Cached responses are shared, so treat them as read-only.
+    """
+
+    def __init__(self, backend: CacheBackend = None, ttls: Dict[str, float] = None, default_ttl: float = 0):
+        """
+        :param backend: a CacheBackend, defaults to a MemoryCache
+        :param ttls: a dict, endpoint path -> seconds to cache it for,
+                     defaults to DEFAULT_TTLS
+        :param default_ttl: a float, the TTL of every other endpoint
+        """
+        self.backend = MemoryCache() if backend is None else backend
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, params: Dict, made_as: str = '') -> str:
+        """
+        :param made_as: a string, who the request was made as, ANONYMOUS or
+                        an identity(); the same url may answer each user
+                        differently
+
+        :returns: the cache key of a request, the same whatever order its
+                  params are in
+        """
+        key = made_as + ' ' + url if made_as else url
+        if not params:
+            return key
+        return key + '?' + urllib.parse.urlencode(sorted(params.items()))
+
+    def ttl(self, url: str) -> float:
+        """
+        :returns: the seconds responses from this url are cached for
+        """
+        path = endpoint_key(url)
+        while path:
+            if path in self.ttls:
+                return self.ttls[path]
+            path = path.rsplit('/', 1)[0]
+        return self.default_ttl
+
+    def get(self, url: str, params: Dict, made_as: str = ''):
+        """
+        :returns: the cached response, or None
+        """
+        if self.ttl(url) <= 0:
+            return None
+        value = self.backend.get(self.key(url, params, made_as))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, url: str, params: Dict, response, made_as: str = ''):
+        ttl = self.ttl(url)
+        if ttl > 0:
+            self.backend.set(self.key(url, params, made_as), response, ttl)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        :returns: a dict of the hit and miss counts and the hit ratio
+        """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0}
+
+
+class _Validated:
+    __slots__ = ('etag', 'last_modified', 'response', 'typed')
+
+    def __init__(self, etag, last_modified, response):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.response = response
+        # return type -> the typed object built from `response`
+        self.typed = {}
+
+    def headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ValidatorStore:
+    """
+    Remembers the ETag and Last-Modified validators of GET responses so
+    TumblrRequest can poll with conditional requests
+
+    When the server answers 304 Not Modified, the response stored with the
+    validators is returned as is, and TumblrRestClient hands back the typed
+    object it already built from it, so nothing is parsed or rebuilt.
+
+        client = pytumblr.TumblrRestClient(key, validators=ValidatorStore())
+
+    Responses are shared between calls, so treat them as read-only.
+    """
+
+    def __init__(self, maxsize=10000):
+        """
+        :param maxsize: an int, the most urls remembered at once
+        """
+        self.maxsize = maxsize
+        self.not_modified = 0
+        self._entries: 'OrderedDict[str, _Validated]' = OrderedDict()
+        # id(response) -> entry, to find the typed objects of a response
+        self._by_response: Dict[int, _Validated] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[_Validated]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def store(self, url: str, headers, response):
+        """
+        Remembers the validators of a successful response, if it has any
+        """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        entry = _Validated(etag, last_modified, response)
+        with self._lock:
+            self._forget(self._entries.pop(url, None))
+            self._entries[url] = entry
+            self._by_response[id(response)] = entry
+            while len(self._entries) > self.maxsize:
+                self._forget(self._entries.popitem(last=False)[1])
+
+    def _forget(self, entry: Optional[_Validated]):
+        if entry is not None:
+            self._by_response.pop(id(entry.response), None)
+
+    def hit(self, entry: _Validated):
+        """
+        Counts a 304 served from `entry`
+        """
+        with self._lock:
+            self.not_modified += 1
+        return entry.response
+
+    def typed(self, response, return_type, build):
+        """
+        :param response: a response returned by TumblrRequest
+        :param return_type: the type to wrap it in
+        :param build: a function (return_type, response) -> typed object
+
+        :returns: the typed object, built only once per stored response
+        """
+        entry = self._by_response.get(id(response))
+        if entry is None or entry.response is not response:
+            return build(return_type, response)
+        typed = entry.typed.get(return_type)
+        if typed is None:
+            typed = entry.typed[return_type] = build(return_type, response)
+        return typed
@@ -0,0 +1,144 @@
+import dataclasses
+from typing import Dict, Type, TypeVar, Union, get_type_hints
+
+from . import npf
+from . import types
+from .lazy import converter, resolve
+from .request import TumblrError, TumblrResponse
+
+T = TypeVar('T')
+
+# original class -> its slotted mirror
+_MIRRORS: Dict[type, type] = {}
+# slotted mirror -> original class
+_ORIGINALS: Dict[type, type] = {}
+# slotted mirror -> {field name: converter}
+_CONVERTERS: Dict[type, Dict] = {}
+# slotted mirror -> names its __init__ accepts
+_INIT_FIELDS: Dict[type, frozenset] = {}
+
+
+def build(cls: Type[T], data: Dict) -> T:
+    """
+    Builds the slotted mirror of one of the classes in types or npf
+
+    Keys that aren't fields of the class are ignored, so real API payloads
+    carrying fields the class doesn't model can be decoded.
+
+    :param cls: a class in types or npf, or its mirror
+    :param data: a dict, the object's JSON
+
+    :returns: an instance of the mirror of `cls` (or of the subclass `data`
+              dispatches to)
+    """
+    if not isinstance(data, dict):
+        # already built
+        return data
+    target = mirror(resolve(_ORIGINALS.get(cls, cls), data))
+    accepted = _INIT_FIELDS[target]
+    return target(**{key: value for key, value in data.items() if key in accepted})
+
+
+def _post_init(self):
+    converters = _CONVERTERS.get(type(self))
+    if converters is None:
+        hints = get_type_hints(_ORIGINALS[type(self)])
+        converters = {name: converter(hints.get(name), build) for name in _INIT_FIELDS[type(self)]}
+        converters = _CONVERTERS[type(self)] = {name: convert for name, convert in converters.items() if convert}
+    for name, convert in converters.items():
+        value = getattr(self, name)
+        if value is not None:
+            setattr(self, name, convert(value))
+
+
+def _dispatching_new(original):
+    def __new__(cls, *args, **kwargs):
+        if cls is _MIRRORS[original]:
+            cls = mirror(original._resolve(kwargs))
+        return object.__new__(cls)
+    return __new__
+
+
+def mirror(cls: Type[T]) -> Type[T]:
+    """
+    :returns: the slotted mirror of a class in types or npf, creating it on
+              first use
+    """
+    slotted = _MIRRORS.get(cls)
+    if slotted is not None:
+        return slotted
+
+    bases = tuple(mirror(base) if dataclasses.is_dataclass(base) else base for base in cls.__bases__)
+    namespace = {'__module__': __name__, '__qualname__': cls.__qualname__}
+    for name in ('__eq__', '__hash__', '__doc__'):
+        if name in cls.__dict__:
+            namespace[name] = cls.__dict__[name]
+    if '_resolve' in cls.__dict__:
+        namespace['__new__'] = _dispatching_new(cls)
+
+    if '__dataclass_fields__' not in cls.__dict__:
+        # a dispatching base like ContentBlock, without fields of its own
+        namespace['__slots__'] = ()
+        slotted = type(cls.__name__, bases, namespace)
+        if dataclasses.is_dataclass(slotted):
+            # e.g. an undecorated subclass registered in POST_CLASSES
+            _INIT_FIELDS[slotted] = _INIT_FIELDS[bases[0]]
+    else:
+        annotations = cls.__dict__.get('__annotations__', {})
+        namespace['__annotations__'] = dict(annotations)
+        for name in annotations:
+            f = cls.__dataclass_fields__[name]
+            if not f.init and f.default is not dataclasses.MISSING:
+                # __init__ leaves these to the class attribute, which the
+                # slot replaces, so have __init__ set them instead
+                namespace[name] = dataclasses.field(default_factory=(lambda value: lambda: value)(f.default),
+                                                    init=False, repr=f.repr, compare=f.compare)
+            elif f.default is not dataclasses.MISSING or f.default_factory is not dataclasses.MISSING:
+                namespace[name] = dataclasses.field(default=f.default, default_factory=f.default_factory,
+                                                    repr=f.repr, compare=f.compare)
+        namespace['__post_init__'] = _post_init
+        params = cls.__dataclass_params__
+        slotted = dataclasses.dataclass(type(cls.__name__, bases, namespace),
+                                        eq=params.eq, order=params.order, frozen=params.frozen,
+                                        unsafe_hash=params.unsafe_hash)
+        slotted = _add_slots(slotted)
+        _INIT_FIELDS[slotted] = frozenset(f.name for f in dataclasses.fields(slotted) if f.init)
+
+    _MIRRORS[cls] = slotted
+    _ORIGINALS[slotted] = cls
+    return slotted
+
+
+def _add_slots(cls: type) -> type:
+    """
+    Recreates a dataclass with __slots__ for the fields its bases don't
+    already have slots for, like dataclass(slots=True) does on Python 3.10+
+    """
+    inherited = {name for base in cls.__mro__[1:] for name in getattr(base, '__slots__', ())}
+    names = [f.name for f in dataclasses.fields(cls)]
+    namespace = dict(cls.__dict__)
+    namespace['__slots__'] = tuple(name for name in names if name not in inherited)
+    for name in names:
+        # defaults live in __init__; class attributes would shadow the slots
+        namespace.pop(name, None)
+    namespace.pop('__dict__', None)
+    namespace.pop('__weakref__', None)
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+def wrap(return_type: Type[T], response: TumblrResponse) -> Union[T, TumblrError]:
+    """
+    Like pytumblr._wrap, but builds slotted objects
+    """
+    if isinstance(response, TumblrError):
+        return response
+    else:
+        return build(return_type, response)
+
+
+# mirror the whole hierarchy up front, so each class is available here
+# under its own name, e.g. compact.Post or compact.TextBlock
+for _module in (types, npf):
+    for _name, _value in list(vars(_module).items()):
+        if isinstance(_value, type) and dataclasses.is_dataclass(_value) and _value.__module__ == _module.__name__:
+            globals()[_name] = mirror(_value)
@@ -0,0 +1,253 @@
+import dataclasses
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Type, TypeVar, Union, get_type_hints
+
+from . import types
+
+T = TypeVar('T')
+
+# builds an instance of one class from its JSON dict
+Decoder = Callable[[Dict], Any]
+
+# class -> its decoder, dispatching to subclasses if the class does
+_DECODERS: Dict[type, Decoder] = {}
+# concrete class -> the decoder building exactly that class
+_CONCRETE: Dict[type, Decoder] = {}
+# decoders compiled but not yet complete, while a class and the classes
+# it nests are compiled
+_compiling: Dict[type, Decoder] = {}
+_lock = threading.RLock()
+
+_MISSING = dataclasses.MISSING
+
+
+def decode(cls: Type[T], data: Dict) -> T:
+    """
+    Builds one of the classes in types or npf from its JSON
+
+    This does what `cls(**data)` does, but through a function compiled for
+    the class the first time it's needed, so nested objects, lists of them,
+    dates and subclass dispatch cost one straight-line call per object.
+    Keys that aren't fields of the class are ignored, and __init__ and
+    __post_init__ aren't called; fields are converted by their annotations.
+
+        posts = decode.decode(types.Posts, response).posts
+
+    :param cls: a dataclass, e.g. types.Posts or npf.NeuePost
+    :param data: a dict, the object's JSON
+
+    :returns: an instance of `cls`, or of the subclass `data` dispatches to
+    """
+    return decoder(cls)(data)
+
+
+def decoder(cls: Type[T]) -> Callable[[Dict], T]:
+    """
+    :returns: the decoder of a dataclass, compiling it on first use
+    """
+    decode_ = _DECODERS.get(cls)
+    if decode_ is None:
+        with _lock:
+            decode_ = _DECODERS.get(cls)
+            if decode_ is None:
+                if '_resolve' in cls.__dict__:
+                    decode_ = _dispatching(cls)
+                else:
+                    decode_ = _concrete(cls)
+                    if cls not in _CONCRETE:
+                        # still being compiled, further up the stack
+                        return decode_
+                _DECODERS[cls] = decode_
+    return decode_
+
+
+def _dispatching(cls: type) -> Decoder:
+    """
+    :returns: a decoder choosing the subclass to build like cls.__new__
+    """
+    resolve_ = cls._resolve
+    # resolved class -> its decoder; POST_CLASSES etc. may still grow
+    targets: Dict[type, Decoder] = {}
+
+    def decode_(data):
+        target = resolve_(data)
+        decode_target = targets.get(target)
+        if decode_target is None:
+            decode_target = targets[target] = _concrete(target)
+        return decode_target(data)
+
+    decode_.__qualname__ = 'decode_' + cls.__name__
+    return decode_
+
+
+def _parse_date(value):
+    return types.parse_date(value) if isinstance(value, str) else value
+
+
+def _missing(cls: type, data: Dict, required):
+    name = next(name for name in required if name not in data)
+    raise TypeError("{} is missing the required field '{}'".format(cls.__qualname__, name))
+
+
+def _required(hint):
+    """
+    :returns: X for Optional[X]; fields are only converted when not None
+    """
+    if getattr(hint, '__origin__', None) is Union:
+        types_ = [arg for arg in hint.__args__ if arg is not type(None)]
+        if len(types_) == 1:
+            return types_[0]
+    return hint
+
+
+class _Compiler:
+    """
+    Writes the source of one class's decoder
+    """
+
+    def __init__(self, cls: type):
+        self.cls = cls
+        self.namespace = {'_new': object.__new__, '_cls': cls, '_MISSING': _MISSING,
+                          '_missing': _missing, '_parse_date': _parse_date, '_post_date': types.post_date}
+        # name in the namespace -> the class whose decoder goes there
+        self.nested: Dict[str, type] = {}
+        self.depth = 0
+
+    def constant(self, prefix: str, value) -> str:
+        name = '_{}{}'.format(prefix, len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def literal(self, value) -> str:
+        """
+        :returns: `value` as a literal if it can be one, otherwise the name
+                  of a constant holding it
+        """
+        if value is None or type(value) in (bool, int, float, str):
+            return repr(value)
+        return self.constant('default', value)
+
+    def expression(self, hint, value: str) -> Optional[str]:
+        """
+        :returns: an expression converting the JSON in `value` to `hint`,
+                  or None if it's used as is
+        """
+        if hint is datetime:
+            return '_parse_date({})'.format(value)
+        if isinstance(hint, type) and dataclasses.is_dataclass(hint):
+            name = '_decode_{}_{}'.format(hint.__name__, len(self.namespace))
+            self.namespace[name] = None
+            self.nested[name] = hint
+            return '{}({})'.format(name, value)
+
+        origin = getattr(hint, '__origin__', None)
+        args = getattr(hint, '__args__', None) or ()
+        if origin is Union:
+            types_ = [arg for arg in args if arg is not type(None)]
+            if len(types_) != 1:
+                return None
+            inner = self.expression(types_[0], value)
+            if inner is None or types_[0] is datetime:
+                # _parse_date passes None through already
+                return inner
+            return '(None if {0} is None else {1})'.format(value, inner)
+        if origin in (list, List) and args:
+            self.depth += 1
+            item = 'i{}'.format(self.depth)
+            inner = self.expression(args[0], item)
+            self.depth -= 1
+            if inner is None:
+                return None
+            return '[{} for {} in {}]'.format(inner, item, value)
+        return None
+
+    def source(self) -> str:
+        cls = self.cls
+        hints = get_type_hints(cls)
+        fields = dataclasses.fields(cls)
+        names = [f.name for f in fields]
+        required = tuple(f.name for f in fields
+                         if f.init and f.default is _MISSING and f.default_factory is _MISSING)
+        self.namespace['_required'] = required
+
+        reads, defaults, conversions = [], [], []
+        for index, f in enumerate(fields):
+            var = 'v{}'.format(index)
+            key = repr(f.name)
+            if not f.init:
+                # not read from the JSON, as __init__ wouldn't accept it
+                if f.default is not _MISSING:
+                    defaults.append('    {} = {}'.format(var, self.literal(f.default)))
+                else:
+                    defaults.append('    {} = {}()'.format(var, self.constant('factory', f.default_factory)))
+            elif f.name in required:
+                reads.append('        {} = data[{}]'.format(var, key))
+            elif f.default is not _MISSING:
+                defaults.append('    {} = get({}, {})'.format(var, key, self.literal(f.default)))
+            else:
+                defaults.append('    {} = get({}, _MISSING)'.format(var, key))
+                defaults.append('    if {} is _MISSING:'.format(var))
+                defaults.append('        {} = {}()'.format(var, self.constant('factory', f.default_factory)))
+
+            if f.name == 'date' and 'timestamp' in names and hints.get(f.name) is datetime:
+                # like Post.__post_init__, falling back to the timestamp
+                conversions.append('    {} = _post_date(get("timestamp"), {})'.format(var, var))
+                continue
+            convert = self.expression(_required(hints.get(f.name)), var)
+            if convert is not None:
+                conversions.append('    if {} is not None:'.format(var))
+                conversions.append('        {} = {}'.format(var, convert))
+
+        lines = ['def decode_{}(data):'.format(cls.__name__), '    get = data.get']
+        if reads:
+            lines.append('    try:')
+            lines.extend(reads)
+            lines.append('    except KeyError:')
+            lines.append('        _missing(_cls, data, _required)')
+        lines.extend(defaults)
+        lines.extend(conversions)
+        lines.append('    self = _new(_cls)')
+        lines.append('    self.__dict__ = {{{}}}'.format(
+            ', '.join('{!r}: v{}'.format(name, index) for index, name in enumerate(names))))
+        lines.append('    return self')
+        return '\n'.join(lines) + '\n'
+
+
+def _concrete(cls: type) -> Decoder:
+    """
+    :returns: the decoder building exactly `cls`, compiling it on first use
+    """
+    decode_ = _CONCRETE.get(cls)
+    if decode_ is not None:
+        return decode_
+    with _lock:
+        decode_ = _CONCRETE.get(cls) or _compiling.get(cls)
+        if decode_ is not None:
+            return decode_
+        outermost = not _compiling
+        compiler = _Compiler(cls)
+        source = compiler.source()
+        exec(compile(source, '<decoder of {}.{}>'.format(cls.__module__, cls.__qualname__), 'exec'),
+             compiler.namespace)
+        decode_ = _compiling[cls] = compiler.namespace['decode_' + cls.__name__]
+        decode_.__source__ = source
+        # filled in after this decoder is registered, so that classes
+        # nesting each other don't recurse forever
+        for name, nested in compiler.nested.items():
+            if '_resolve' in nested.__dict__:
+                compiler.namespace[name] = decoder(nested)
+            else:
+                compiler.namespace[name] = _concrete(nested)
+        if outermost:
+            # only now is every decoder compiled so far complete
+            _CONCRETE.update(_compiling)
+            _compiling.clear()
+        return decode_
+
+
+def source(cls: type) -> str:
+    """
+    :returns: the generated source of a class's decoder, for debugging
+    """
+    return _concrete(cls).__source__
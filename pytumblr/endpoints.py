@@ -0,0 +1,195 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Tuple, Union
+
+from . import types
+from .helpers import ParamSchema
+from .retry import endpoint_key
+
+# how a request is authorized: signed with OAuth, or with just the consumer
+# key passed as `api_key`
+OAUTH = 'oauth'
+API_KEY = 'api_key'
+
+# how an endpoint pages: by `offset`, or backwards in time by `before`
+OFFSET = 'offset'
+BEFORE = 'before'
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """
+    How to page through an endpoint's typed responses
+    """
+    # the attribute of a page holding its items, e.g. 'posts'
+    items: str
+    by: str = OFFSET
+    # for BEFORE, the item attributes holding its timestamp, tried in order
+    timestamp: Tuple[str, ...] = ('timestamp',)
+
+    def timestamp_of(self, item) -> int:
+        for name in self.timestamp:
+            value = getattr(item, name, None)
+            if value:
+                return value
+        return 0
+
+
+@dataclass(frozen=True, eq=False)
+class Endpoint:
+    """
+    One API endpoint, and everything the client needs to know to call it
+
+    A path segment in square brackets is left out when its argument is None,
+    e.g. '/blog/{blogname}/posts[/{type}]'.
+    """
+    # the TumblrRestClient method calling it, or for creating posts, which
+    # several methods do, a name of its own
+    name: str
+    method: str
+    path: str
+    # the parameters accepted; for post endpoints, a dict keyed by the
+    # `type` parameter, with None for a post of no particular type
+    params: Union[ParamSchema, Mapping[Optional[str], ParamSchema]]
+    auth: str = OAUTH
+    # the class in types a response is built as; None for writes, which
+    # return a Status
+    returns: Optional[type] = None
+    # for writes, whether success is 201 Created rather than 200 OK
+    creates: bool = False
+    cursor: Optional[Cursor] = None
+    # whether sending it twice does no more than sending it once, so it may
+    # be retried and concurrent identical calls may be shared
+    idempotent: bool = True
+    # whether its responses may be served from a ResponseCache
+    cacheable: bool = False
+    # whether only the blog's owner may call it, with their OAuth token
+    owner: bool = False
+
+    @property
+    def needs_api_key(self) -> bool:
+        return self.auth == API_KEY
+
+    def url(self, **args) -> str:
+        """
+        :param args: the path's arguments, e.g. blogname='staff.tumblr.com'
+
+        :returns: the path, relative to the API host
+        """
+        path = _OPTIONAL.sub(lambda match: match.group(1) if args.get(match.group(2)) is not None else '',
+                             self.path)
+        return path.format(**args)
+
+    def schema(self, params: Optional[Dict] = None) -> ParamSchema:
+        """
+        :returns: the ParamSchema the given parameters are checked against
+        """
+        if isinstance(self.params, ParamSchema):
+            return self.params
+        post_type = params.get('type') if params else None
+        return self.params.get(post_type, self.params[None])
+
+
+_OPTIONAL = re.compile(r'\[([^\]]*\{(\w+)\}[^\]]*)\]')
+_ARGUMENT = re.compile(r'\\\{\w+\\\}')
+
+
+def _pattern(path: str):
+    """
+    :returns: a regular expression matching the paths of an endpoint
+    """
+    pattern = re.escape(path).replace(r'\[', '(?:').replace(r'\]', ')?')
+    return re.compile(_ARGUMENT.sub('[^/]+', pattern) + '$')
+
+
+# the parameters each endpoint accepts
+_LIKES = ParamSchema.of('limit', 'offset', 'before', 'after')
+_PAGE = ParamSchema.of('limit', 'offset')
+_POST_ID = ParamSchema.of('id')
+
+# Parameters valid for /post, /post/edit, and /post/reblog: these options
+# are always valid, and others on a per-post-type basis
+_POST_COMMON = ParamSchema.of('type', 'state', 'tags', 'tweet', 'date', 'format', 'slug')
+POST_TYPES: Mapping[Optional[str], ParamSchema] = {
+    None: _POST_COMMON,
+    'text': _POST_COMMON + ParamSchema.of('title', 'body'),
+    'photo': _POST_COMMON + ParamSchema.of('caption', 'link', 'source', 'data', 'photoset_layout'),
+    'quote': _POST_COMMON + ParamSchema.of('quote', 'source'),
+    'link': _POST_COMMON + ParamSchema.of('title', 'url', 'description', 'thumbnail'),
+    'chat': _POST_COMMON + ParamSchema.of('title', 'conversation'),
+    'audio': _POST_COMMON + ParamSchema.of('caption', 'external_url', 'data'),
+    'video': _POST_COMMON + ParamSchema.of('caption', 'embed', 'data'),
+}
+
+_LIKED = Cursor('liked_posts', BEFORE, ('liked_timestamp', 'timestamp'))
+
+ENDPOINTS: Dict[str, Endpoint] = {endpoint.name: endpoint for endpoint in [
+    Endpoint('info', 'get', '/user/info', ParamSchema.of(), returns=types.UserInfoResponse),
+    Endpoint('avatar', 'get', '/blog/{blogname}/avatar/{size}', ParamSchema.of(),
+             returns=types.Avatar, cacheable=True),
+    Endpoint('likes', 'get', '/user/likes', _LIKES, returns=types.Likes, cursor=_LIKED),
+    Endpoint('following', 'get', '/user/following', _PAGE, returns=types.Following, cursor=Cursor('blogs')),
+    Endpoint('dashboard', 'get', '/user/dashboard',
+             ParamSchema.of('limit', 'offset', 'type', 'since_id', 'reblog_info', 'notes_info'),
+             returns=types.Dashboard, cursor=Cursor('posts')),
+    Endpoint('tagged', 'get', '/tagged', ParamSchema.of('before', 'limit', 'filter', 'tag', 'api_key'),
+             API_KEY, types.Posts, cursor=Cursor('posts', BEFORE), cacheable=True),
+    Endpoint('posts', 'get', '/blog/{blogname}/posts[/{type}]',
+             ParamSchema.of('id', 'tag', 'limit', 'offset', 'reblog_info', 'notes_info', 'filter', 'api_key'),
+             API_KEY, types.BlogPosts, cursor=Cursor('posts'), cacheable=True),
+    Endpoint('blog_info', 'get', '/blog/{blogname}/info', ParamSchema.of('api_key'),
+             API_KEY, types.BlogInfoResponse, cacheable=True),
+    Endpoint('blog_following', 'get', '/blog/{blogname}/following', _PAGE,
+             returns=types.Following, cursor=Cursor('blogs'), cacheable=True),
+    Endpoint('followers', 'get', '/blog/{blogname}/followers', _PAGE,
+             returns=types.Followers, cursor=Cursor('users'), owner=True),
+    Endpoint('blog_likes', 'get', '/blog/{blogname}/likes', _LIKES + ParamSchema.of('api_key'),
+             API_KEY, types.Likes, cursor=_LIKED, cacheable=True),
+    Endpoint('queue', 'get', '/blog/{blogname}/posts/queue', ParamSchema.of('limit', 'offset', 'filter'),
+             returns=types.Posts, cursor=Cursor('posts'), owner=True),
+    Endpoint('drafts', 'get', '/blog/{blogname}/posts/draft', ParamSchema.of('filter'), returns=types.Posts,
+             owner=True),
+    Endpoint('submission', 'get', '/blog/{blogname}/posts/submission', ParamSchema.of('offset', 'filter'),
+             returns=types.Submission, owner=True),
+
+    Endpoint('follow', 'post', '/user/follow', ParamSchema.of('url')),
+    Endpoint('unfollow', 'post', '/user/unfollow', ParamSchema.of('url')),
+    Endpoint('like', 'post', '/user/like', ParamSchema.of('id', 'reblog_key')),
+    Endpoint('unlike', 'post', '/user/unlike', ParamSchema.of('id', 'reblog_key')),
+    Endpoint('create_post', 'post', '/blog/{blogname}/post', POST_TYPES, creates=True, idempotent=False,
+             owner=True),
+    Endpoint('edit_post', 'post', '/blog/{blogname}/post/edit',
+             {post_type: _POST_ID + schema for post_type, schema in POST_TYPES.items()}, owner=True),
+    Endpoint('reblog', 'post', '/blog/{blogname}/post/reblog',
+             {post_type: ParamSchema.of('id', 'reblog_key', 'comment') + schema
+              for post_type, schema in POST_TYPES.items()},
+             creates=True, idempotent=False, owner=True),
+    # deleting again fails, as the post is gone
+    Endpoint('delete_post', 'post', '/blog/{blogname}/post/delete', _POST_ID, idempotent=False, owner=True),
+]}
+
+# (method, path pattern, endpoint), paths without arguments of their own
+# first, so e.g. /posts/queue isn't taken for /posts/{type}
+_PATTERNS = [(endpoint.method, _pattern(endpoint.path), endpoint)
+             for endpoint in sorted(ENDPOINTS.values(),
+                                    key=lambda endpoint: endpoint.path.count('{'))]
+# (method, endpoint key) -> endpoint, for paths already looked up
+_FOUND: Dict[Tuple[str, str], Optional[Endpoint]] = {}
+
+
+def lookup(method: str, url: str) -> Optional[Endpoint]:
+    """
+    :param method: a string, "get" or "post"
+    :param url: a string, the path relative to the API host
+
+    :returns: the Endpoint the request is for, or None if it isn't one the
+              client knows
+    """
+    key = (method.lower(), endpoint_key(url))
+    try:
+        return _FOUND[key]
+    except KeyError:
+        pass
+    found = _FOUND[key] = next((endpoint for endpoint_method, pattern, endpoint in _PATTERNS
+                                if endpoint_method == key[0] and pattern.match(key[1])), None)
+    return found
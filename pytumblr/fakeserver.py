@@ -0,0 +1,527 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .endpoints import API_KEY, Endpoint, lookup
+
+TAGS = ['art', 'photography', 'cats', 'aesthetic', 'music', 'writing', 'gif', 'original', 'nature', 'film']
+POST_TYPES = ('text', 'quote', 'photo', 'link', 'chat')
+
+# 2020-01-01, when the generated blogs' first posts were made
+EPOCH = 1577836800
+
+
+def date_string(timestamp: int) -> str:
+    """
+    :returns: a unix timestamp as Tumblr formats dates, e.g.
+              '2020-01-01 00:00:00 GMT'
+    """
+    return time.strftime('%Y-%m-%d %H:%M:%S GMT', time.gmtime(timestamp))
+
+
+def blog(name: str, rng=random) -> Dict:
+    """
+    A blog, in the shape of the /blog/{blogname}/info endpoint
+    """
+    return {
+        'name': name,
+        'updated': EPOCH,
+        'title': name.title(),
+        'description': 'The blog of ' + name,
+        'posts': rng.randint(10, 50000),
+        'ask': False,
+        'ask_anon': False,
+        'likes': rng.randint(0, 1000),
+        'is_blocked_from_primary': False,
+    }
+
+
+def image_size(width: int, rng=random) -> Dict:
+    return {'width': width, 'height': width * 3 // 4,
+            'url': 'https://64.media.tumblr.com/{:x}/s{}x{}/image.jpg'.format(rng.getrandbits(64), width, width)}
+
+
+def post(id: int, type: str = None, rng=random, blog_name: str = None, timestamp: int = None) -> Dict:
+    """
+    A legacy post of the given type (text, quote, photo, link or chat), in
+    the shape of the /blog/{blogname}/posts endpoint
+
+    :param id: an int, the post's id
+    :param type: a string, the post type, or None for a random one
+    :param rng: the random.Random to generate the post with
+    :param blog_name: a string, the blog that made it, or None for a
+                      random one
+    :param timestamp: an int, when it was made; defaults to one derived
+                      from `id`
+    """
+    type = type or rng.choice(POST_TYPES[:4])
+    name = blog_name or 'blog{}'.format(rng.randint(0, 500))
+    if timestamp is None:
+        timestamp = EPOCH + id * 37
+    data = {
+        'id': id,
+        'type': type,
+        'blog_name': name,
+        'post_url': 'https://{}.tumblr.com/post/{}'.format(name, id),
+        'timestamp': timestamp,
+        'date': date_string(timestamp),
+        'format': 'html',
+        'reblog_key': '{:08x}'.format(rng.getrandbits(32)),
+        'tags': rng.sample(TAGS, rng.randint(0, 5)),
+        'total_posts': 1000,
+        'blog': blog(name, rng),
+        'liked': False,
+        'state': 'published',
+    }
+    if type == 'text':
+        data.update(title='Post {}'.format(id), body='<p>' + 'lorem ipsum ' * 30 + '</p>')
+    elif type == 'quote':
+        data.update(text='A quote, number {}'.format(id), source='<a href="https://example.com">someone</a>')
+    elif type == 'photo':
+        data.update(caption='<p>photo {}</p>'.format(id), width=1280, height=960,
+                    photos=[{'caption': '', 'alt_sizes': [image_size(width, rng) for width in (1280, 500, 250, 75)]}
+                            for _ in range(rng.randint(1, 4))])
+    elif type == 'link':
+        data.update(title='A link', url='https://example.com/{}'.format(id), description='<p>a link</p>',
+                    excerpt='an excerpt', publisher='example.com')
+    elif type == 'chat':
+        dialogue = [{'name': speaker, 'label': speaker + ':', 'phrase': 'line {} of post {}'.format(line, id)}
+                    for line, speaker in enumerate(rng.choice(['alice', 'bob']) for _ in range(rng.randint(2, 8)))]
+        data.update(title='A chat', dialogue=dialogue,
+                    body='\r\n'.join('{label} {phrase}'.format(**line) for line in dialogue))
+    return data
+
+
+def posts_page(count: int = 20, start: int = 1, rng=random) -> Dict:
+    return {'posts': [post(id, rng=rng) for id in range(start, start + count)]}
+
+
+def neue_blog(name: str, rng=random) -> Dict:
+    """
+    A blog as NPF posts and their trails name it
+    """
+    return {'uuid': 't:{:x}'.format(rng.getrandbits(64)), 'name': name, 'title': name.title(),
+            'description': 'The blog of ' + name, 'updated': EPOCH}
+
+
+def neue_content(id: int, rng=random) -> Tuple[List[Dict], List[Dict]]:
+    """
+    :returns: (content, layout) of an NPF post or trail item: some text,
+              and perhaps a photo and a link
+    """
+    content = [{'type': 'text', 'text': 'Post {}'.format(id), 'subtype': 'heading1'}]
+    content.extend({'type': 'text', 'text': 'lorem ipsum ' * rng.randint(2, 20)} for _ in range(rng.randint(1, 3)))
+    if rng.random() < 0.5:
+        content.append({'type': 'image', 'media': [image_size(width, rng) for width in (1280, 640, 250)],
+                        'colors': {'c0': '{:06x}'.format(rng.getrandbits(24)),
+                                   'c1': '{:06x}'.format(rng.getrandbits(24))},
+                        'feedback_token': '{:x}'.format(rng.getrandbits(64))})
+        for media in content[-1]['media']:
+            media['type'] = 'image/jpeg'
+    if rng.random() < 0.2:
+        content.append({'type': 'link', 'url': 'https://example.com/{}'.format(id), 'title': 'A link',
+                        'description': 'a link', 'site_name': 'example.com', 'display_url': 'example.com',
+                        'poster': dict(image_size(500, rng), type='image/jpeg')})
+    layout = [{'type': 'rows', 'rows': [[index] for index in range(len(content))]}]
+    return content, layout
+
+
+def neue_post(id: int, depth: int = 0, rng=random) -> Dict:
+    """
+    An NPF post, in the shape of the /blog/{blogname}/posts endpoint with
+    npf=true
+
+    :param id: an int, the post's id
+    :param depth: an int, how many reblogs deep its trail goes
+    :param rng: the random.Random to generate the post with
+    """
+    name = 'blog{}'.format(rng.randint(0, 500))
+    trail = []
+    for reblog in range(depth, 0, -1):
+        origin = 'blog{}'.format(rng.randint(0, 500))
+        content, layout = neue_content(id - reblog, rng)
+        trail.append({'content': content, 'layout': layout, 'post': {'id': str(id - reblog)},
+                      'blog': neue_blog(origin, rng),
+                      'broken_blog': {'name': origin, 'avatar': {
+                          'avatar_url': 'https://64.media.tumblr.com/avatar_{:x}_64.png'.format(rng.getrandbits(48))}}})
+    content, layout = neue_content(id, rng)
+    data = {
+        'id': str(id),
+        'tumblelog_uuid': neue_blog(name, rng)['uuid'],
+        'content': content,
+        'layout': layout,
+        'reblog_key': '{:08x}'.format(rng.getrandbits(32)),
+        'trail': trail,
+    }
+    if depth:
+        data.update(parent_post_id=str(id - 1), parent_tumblelog_uuid=trail[-1]['blog']['uuid'])
+    return data
+
+
+@dataclass(frozen=True)
+class ReceivedRequest:
+    """
+    A request as FakeTumblrServer received it
+    """
+    method: str
+    # the path without the /v2 prefix or query
+    path: str
+    params: Dict[str, List[str]]
+    headers: Dict[str, str]
+    # the endpoint's name, or None for paths it doesn't serve
+    endpoint: Optional[str]
+    status: int
+    body_size: int = 0
+    # the client's (host, port), which stays the same while it reuses a
+    # connection
+    peer: Tuple[str, int] = ('', 0)
+
+
+_BLOGNAME = re.compile(r'^/blog/([^/]+)/')
+_CONSUMER_KEY = re.compile(r'oauth_consumer_key="([^"]*)"')
+
+
+class FakeTumblrServer:
+    """
+    A stand-in for api.tumblr.com on a local port, to run the client and
+    its benchmarks against without a network or credentials
+
+    It serves the v2 endpoints in pytumblr.endpoints over real HTTP, so
+    requests go through the client's connection pool, signing, retries and
+    streaming. Responses are generated in the shapes pytumblr.types
+    decodes, and are the same for the same request and `seed`: every blog
+    has `posts_per_blog` posts, newest first, paged with offset, before and
+    since_id. Writes are accepted and answered as Tumblr does.
+
+    `latency` is added to every response; `error_rate` and `throttle_rate`
+    are the fractions of requests answered with a 503, and with a 429 and a
+    Retry-After of `retry_after` seconds. Each consumer key gets `quota`
+    requests before it's throttled too, with X-Ratelimit-Perhour-* headers
+    counting down to it.
+
+        with FakeTumblrServer(latency=0.02, throttle_rate=0.01) as server:
+            client = pytumblr.TumblrRestClient('key', host=server.url)
+            client.posts('staff', limit=20)
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: int = 1, quota: Optional[int] = None,
+                 posts_per_blog: int = 1000, seed: int = 0, history: int = 1000):
+        """
+        :param host: a string, the interface to listen on
+        :param port: an int, the port, or 0 for any free one
+        :param latency: a float, seconds every response is delayed by
+        :param error_rate: a float between 0 and 1, the fraction of requests
+                           failing with a 503
+        :param throttle_rate: a float between 0 and 1, the fraction of
+                              requests throttled with a 429
+        :param retry_after: an int, the Retry-After of throttled responses
+        :param quota: an int, the requests each consumer key gets before
+                      it's throttled, or None for no limit
+        :param posts_per_blog: an int, how many posts every blog has
+        :param seed: an int, what the generated content is derived from
+        :param history: an int, how many of the latest requests `received`
+                        keeps
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.quota = quota
+        self.posts_per_blog = posts_per_blog
+        self.seed = seed
+        self.received: Deque[ReceivedRequest] = deque(maxlen=history)
+        self.used: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._next_id = 10 ** 12
+
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        The server's address, to pass to TumblrRestClient as `host`
+        """
+        host, port = self._httpd.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def start(self) -> 'FakeTumblrServer':
+        """
+        Starts serving on a background thread
+        """
+        if self._thread is None:
+            # a short poll interval, so stop() doesn't keep tests waiting
+            self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={'poll_interval': 0.05},
+                                            name='FakeTumblrServer', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops serving and closes the listening socket
+        """
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def blog_posts(self, blogname: str, offset: int = 0, limit: int = 20, type: str = None,
+                   before: int = None, since_id: int = None) -> List[Dict]:
+        """
+        :returns: a page of a blog's posts, newest first
+
+        :param blogname: a string, the blog's name or hostname
+        :param offset: an int, how many of the newest posts to skip
+        :param limit: an int, the most posts to return
+        :param type: a string, only posts of this type
+        :param before: an int, only posts made before this timestamp
+        :param since_id: an int, only posts newer than this id
+        """
+        name = blogname.split('.', 1)[0]
+        base = self._first_id(name)
+        # post number n of a blog was made n hours after EPOCH
+        top = self.posts_per_blog
+        if before is not None:
+            top = min(top, (before - EPOCH - 1) // 3600)
+        numbers = range(top, 0, -1)
+        if type is None:
+            numbers, offset = numbers[offset:], 0
+        page = []
+        for number in numbers:
+            if since_id is not None and base + number <= since_id:
+                break
+            rng = random.Random('{}:{}'.format(self.seed, base + number))
+            kind = rng.choice(POST_TYPES)
+            if type is not None and kind != type:
+                continue
+            if offset:
+                offset -= 1
+                continue
+            page.append(post(base + number, kind, rng, name, EPOCH + number * 3600))
+            if len(page) >= limit:
+                break
+        return page
+
+    def find_post(self, blogname: str, id: int) -> Optional[Dict]:
+        """
+        :returns: one of a blog's posts, or None if it has no such post
+        """
+        name = blogname.split('.', 1)[0]
+        number = id - self._first_id(name)
+        if not 0 < number <= self.posts_per_blog:
+            return None
+        rng = random.Random('{}:{}'.format(self.seed, id))
+        return post(id, rng.choice(POST_TYPES), rng, name, EPOCH + number * 3600)
+
+    def blog_info(self, blogname: str) -> Dict:
+        name = blogname.split('.', 1)[0]
+        return dict(blog(name, random.Random('{}:{}'.format(self.seed, name))), posts=self.posts_per_blog)
+
+    def user_info(self) -> Dict:
+        info = self.blog_info('you')
+        return {'name': 'you', 'following': 100, 'default_post_format': 'html', 'likes': info['likes'],
+                'blogs': [{'url': 'https://you.tumblr.com/', 'title': info['title'], 'primary': True,
+                           'followers': 100, 'tweet': 'N', 'facebook': 'N', 'type': 'public'}]}
+
+    def _first_id(self, name: str) -> int:
+        # ids are unique across blogs, as long as they have fewer than
+        # 100000 posts
+        return zlib.crc32(name.encode('utf-8')) % 10 ** 6 * 10 ** 5
+
+    def respond(self, method: str, path: str, params: Dict[str, str],
+                endpoint: Endpoint) -> Tuple[int, Dict]:
+        """
+        :returns: (status, response) for a request the server has accepted
+        """
+        match = _BLOGNAME.match(path)
+        blogname = match.group(1) if match else 'you'
+        limit = min(int(params.get('limit', 20)), 50)
+        offset = int(params.get('offset', 0))
+        before = int(params['before']) if 'before' in params else None
+        name = endpoint.name
+
+        if name == 'info':
+            return 200, {'user': self.user_info()}
+        if name == 'blog_info':
+            return 200, {'blog': self.blog_info(blogname)}
+        if name == 'avatar':
+            size = path.rstrip('/').rsplit('/', 1)[-1]
+            return 200, {'avatar_url': 'https://64.media.tumblr.com/avatar_{}_{}.png'.format(
+                hashlib.md5(blogname.encode('utf-8')).hexdigest()[:12], size)}
+        if name in ('posts', 'queue', 'drafts', 'submission'):
+            type = path.rsplit('/', 1)[-1] if name == 'posts' and not path.endswith('/posts') else None
+            if 'id' in params:
+                found = self.find_post(blogname, int(params['id']))
+                if found is None:
+                    return 404, {'errors': [{'title': 'Not Found'}]}
+                return 200, {'posts': [found], 'blog': self.blog_info(blogname), 'total_posts': 1}
+            posts = self.blog_posts(blogname, offset, limit, type)
+            if 'tag' in params:
+                posts = [item for item in posts if params['tag'] in item['tags']]
+            if name == 'submission':
+                for item in posts:
+                    item.update(state='submission', post_author='anonymous', is_submission=True)
+            return 200, {'posts': posts, 'blog': self.blog_info(blogname), 'total_posts': self.posts_per_blog}
+        if name == 'dashboard':
+            since_id = int(params['since_id']) if 'since_id' in params else None
+            posts = self.blog_posts('dashboard', offset, limit, params.get('type'), since_id=since_id)
+            for item in posts:
+                # from the blogs the user follows, which are named but not
+                # embedded
+                del item['blog']
+                item['blog_name'] = 'blog{}'.format(item['id'] % 100)
+                item['post_url'] = 'https://{}.tumblr.com/post/{}'.format(item['blog_name'], item['id'])
+            return 200, {'posts': posts}
+        if name == 'tagged':
+            if not params.get('tag'):
+                return 400, {'errors': [{'title': 'Bad Request', 'detail': 'tag is required'}]}
+            posts = self.blog_posts('tagged-' + params['tag'], limit=limit, before=before)
+            for item in posts:
+                item['tags'] = sorted(set(item['tags']) | {params['tag']})
+            return 200, {'posts': posts}
+        if name in ('likes', 'blog_likes'):
+            posts = self.blog_posts('likes-' + blogname, offset, limit, before=before)
+            for item in posts:
+                item.update(liked=True, liked_timestamp=item['timestamp'] + 60)
+            return 200, {'liked_posts': posts, 'liked_count': self.posts_per_blog}
+        if name in ('following', 'blog_following'):
+            names = ['blog{}'.format(number) for number in range(offset, min(offset + limit, 100))]
+            return 200, {'blogs': [self.blog_info(name) for name in names], 'total_blogs': 100}
+        if name == 'followers':
+            users = [{'name': 'follower{}'.format(number), 'following': number % 3 == 0,
+                      'url': 'https://follower{}.tumblr.com/'.format(number), 'updated': EPOCH + number}
+                     for number in range(offset, min(offset + limit, 100))]
+            return 200, {'total_users': 100, 'users': users}
+        if endpoint.creates:
+            with self._lock:
+                self._next_id += 1
+                return 201, {'id': self._next_id, 'id_string': str(self._next_id)}
+        if name in ('edit_post', 'delete_post'):
+            return 200, {'id': int(params.get('id', 0))}
+        return 200, {}
+
+    def _gate(self, consumer_key: str) -> Tuple[Optional[int], Dict[str, str]]:
+        """
+        Counts a request against its key's quota and rolls for injected
+        failures
+
+        :returns: (the status to fail the request with, or None, headers)
+        """
+        with self._lock:
+            used = self.used[consumer_key] = self.used.get(consumer_key, 0) + 1
+            roll = self._rng.random()
+        headers = {}
+        if self.quota is not None:
+            headers = {'X-Ratelimit-Perhour-Limit': str(self.quota),
+                       'X-Ratelimit-Perhour-Remaining': str(max(0, self.quota - used)),
+                       'X-Ratelimit-Perhour-Reset': str(self.retry_after)}
+            if used > self.quota:
+                return 429, dict(headers, **{'Retry-After': str(self.retry_after)})
+        if roll < self.throttle_rate:
+            return 429, dict(headers, **{'Retry-After': str(self.retry_after)})
+        if roll < self.throttle_rate + self.error_rate:
+            return 503, headers
+        return None, headers
+
+
+_MESSAGES = {200: 'OK', 201: 'Created', 400: 'Bad Request', 401: 'Unauthorized', 404: 'Not Found',
+             429: 'Limit Exceeded', 503: 'Service Unavailable'}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # keep connections open, as the client pools them
+    protocol_version = 'HTTP/1.1'
+    # the headers and body are written separately; don't let the body wait
+    # for the client to acknowledge the headers
+    disable_nagle_algorithm = True
+    server_version = 'FakeTumblr/1.0'
+
+    def do_GET(self):
+        self.handle_api('get')
+
+    def do_POST(self):
+        self.handle_api('post')
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle_api(self, method: str):
+        fake: FakeTumblrServer = self.server.fake
+        url = urllib.parse.urlsplit(self.path)
+        params = urllib.parse.parse_qs(url.query, keep_blank_values=True)
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if method == 'post' and self.headers.get('Content-Type', '').startswith('application/x-www-form-urlencoded'):
+            for key, values in urllib.parse.parse_qs(body.decode('utf-8'), keep_blank_values=True).items():
+                params.setdefault(key, []).extend(values)
+        flat = {key: values[-1] for key, values in params.items()}
+
+        path = url.path[len('/v2'):] if url.path.startswith('/v2/') else None
+        endpoint = lookup(method, path) if path is not None else None
+        authorization = self.headers.get('Authorization', '')
+        signed = _CONSUMER_KEY.search(authorization)
+        consumer_key = signed.group(1) if signed else flat.get('api_key')
+
+        headers = {}
+        if endpoint is None:
+            status, response = 404, {'errors': [{'title': 'Not Found'}]}
+        elif (consumer_key is None or (endpoint.auth != API_KEY and signed is None) or
+              ((endpoint.owner or path.startswith('/user/')) and 'oauth_token=' not in authorization)):
+            # calls for a user need their token
+            status, response = 401, {'errors': [{'title': 'Unauthorized'}]}
+        else:
+            status, headers = fake._gate(urllib.parse.unquote(consumer_key))
+            if status is not None:
+                response = {'errors': [{'title': _MESSAGES[status]}]}
+            else:
+                try:
+                    status, response = fake.respond(method, path, flat, endpoint)
+                except ValueError:
+                    # e.g. a limit that isn't a number
+                    status, response = 400, {'errors': [{'title': 'Bad Request'}]}
+
+        content = json.dumps({'meta': {'status': status, 'msg': _MESSAGES.get(status, '')}, 'response': response},
+                             separators=(',', ':')).encode('utf-8')
+        etag = '"{}"'.format(hashlib.md5(content).hexdigest())
+        if method == 'get' and status == 200 and self.headers.get('If-None-Match') == etag:
+            status = 304
+        fake.received.append(ReceivedRequest(method, path or url.path, params, dict(self.headers.items()),
+                                             endpoint.name if endpoint is not None else None, status, len(body),
+                                             self.client_address[:2]))
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        if status == 304:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(status, _MESSAGES.get(status))
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        if method == 'get' and status == 200:
+            self.send_header('ETag', etag)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
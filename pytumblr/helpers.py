@@ -1,32 +1,102 @@
+from dataclasses import dataclass
 from functools import wraps
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping, Tuple, Union
 
-def validate_params(valid_options, params):
+# the types a parameter's value may have, for the parameters worth checking
+PARAM_TYPES: Mapping[str, Tuple[type, ...]] = MappingProxyType({
+    'limit': (int,),
+    'offset': (int,),
+    'before': (int,),
+    'after': (int,),
+    'since_id': (int, str),
+    'id': (int, str),
+    'reblog_info': (bool,),
+    'notes_info': (bool,),
+    'tag': (str,),
+    'filter': (str,),
+    'type': (str,),
+    'api_key': (str,),
+    'url': (str,),
+    'reblog_key': (str,),
+    'tags': (str, list, tuple),
+})
+
+#We only allow one version of the data parameter to be passed
+_DATA_PARAMS = frozenset(['data', 'source', 'external_url', 'embed'])
+
+
+@dataclass(frozen=True, eq=False)
+class ParamSchema:
+    """
+    The parameters an endpoint accepts, and the types of their values
+
+    Schemas are built once, when the module defining them is imported, so
+    validating a request is a set lookup and a type check per parameter.
+
+        schema = ParamSchema.of('limit', 'offset')
+        schema.validate({'limit': 20})
+    """
+    names: frozenset
+    types: Mapping[str, Tuple[type, ...]]
+
+    @classmethod
+    def of(cls, *names: str) -> 'ParamSchema':
+        """
+        :param names: the accepted parameters; their types come from PARAM_TYPES
+
+        :returns: a ParamSchema
+        """
+        names = frozenset(names)
+        return cls(names, MappingProxyType({name: PARAM_TYPES[name] for name in names if name in PARAM_TYPES}))
+
+    def __add__(self, other: 'ParamSchema') -> 'ParamSchema':
+        return ParamSchema(self.names | other.names, MappingProxyType({**self.types, **other.types}))
+
+    def validate(self, params: Mapping[str, Any]):
+        """
+        :param params: a dict, the parameters of a request
+
+        :returns: None or throws an exception if the validation fails
+        """
+        if not params:
+            return
+
+        if len(_DATA_PARAMS.intersection(params)) > 1:
+            raise Exception("You can't mix and match data parameters")
+
+        #No bad fields which are not in valid options can pass
+        disallowed_fields = [key for key in params if key not in self.names]
+        if disallowed_fields:
+            field_strings = ",".join(disallowed_fields)
+            raise Exception("{0} are not allowed fields".format(field_strings))
+
+        types = self.types
+        for key, value in params.items():
+            expected = types.get(key)
+            if expected is None or value is None:
+                continue
+            # bool is a subclass of int, but limit=True is surely a mistake
+            if not isinstance(value, expected) or (type(value) is bool and bool not in expected):
+                raise Exception("{0} must be {1}, not {2}".format(
+                    key, " or ".join(t.__name__ for t in expected), type(value).__name__))
+
+
+def validate_params(valid_options: Union[ParamSchema, Iterable[str]], params):
     """
     Helps us validate the parameters for the request
 
-    :param valid_options: a list of strings of valid options for the
-                          api request
+    :param valid_options: a ParamSchema, or a list of strings of valid
+                          options for the api request
     :param params: a dict, the key-value store which we really only care about
                    the key which has tells us what the user is using for the
                    API request
 
     :returns: None or throws an exception if the validation fails
     """
-    #crazy little if statement hanging by himself :(
-    if not params:
-        return
-
-    #We only allow one version of the data parameter to be passed
-    data_filter = ['data', 'source', 'external_url', 'embed']
-    multiple_data = [key for key in params.keys() if key in data_filter]
-    if len(multiple_data) > 1:
-        raise Exception("You can't mix and match data parameters")
-
-    #No bad fields which are not in valid options can pass
-    disallowed_fields = [key for key in params.keys() if key not in valid_options]
-    if disallowed_fields:
-        field_strings = ",".join(disallowed_fields)
-        raise Exception("{0} are not allowed fields".format(field_strings))
+    if not isinstance(valid_options, ParamSchema):
+        valid_options = ParamSchema.of(*valid_options)
+    valid_options.validate(params)
 
 def validate_blogname(fn):
     """
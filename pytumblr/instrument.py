@@ -0,0 +1,399 @@
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from requests.adapters import HTTPAdapter
+from requests.auth import AuthBase
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .endpoints import Endpoint, lookup
+from .retry import endpoint_key
+
+# the phases of a call, in the order they happen
+VALIDATE = 'validate'
+SIGN = 'sign'
+CONNECT = 'connect'
+# from sending the request to receiving the response headers, less any
+# time spent connecting
+TTFB = 'ttfb'
+DOWNLOAD = 'download'
+DECODE = 'decode'
+BUILD = 'build'
+PHASES = (VALIDATE, SIGN, CONNECT, TTFB, DOWNLOAD, DECODE, BUILD)
+
+
+@dataclass
+class RequestEvent:
+    """
+    What one call to the API took, handed to every hook once it's done
+    """
+    method: str
+    # the endpoint's name, e.g. 'posts', or for paths the client doesn't
+    # know, the path, e.g. '/blog/{blogname}/notes'
+    endpoint: str
+    status: Optional[int] = None
+    # response body bytes received
+    bytes: int = 0
+    # how many times the request was sent again, by the retry policy or
+    # the rate limiter
+    retries: int = 0
+    # phase -> seconds spent in it, summed over retries; phases that didn't
+    # happen, e.g. connect on a reused connection, are left out
+    timings: Dict[str, float] = field(default_factory=dict)
+    # seconds from the start of the call to its end
+    duration: float = 0.0
+    # the name of the exception the call raised, if it raised one
+    error: Optional[str] = None
+
+
+Hook = Callable[[RequestEvent], None]
+
+_current: ContextVar[Optional['Trace']] = ContextVar('pytumblr_trace', default=None)
+_NOT_TRACED = nullcontext()
+
+
+class Trace:
+    """
+    Collects the RequestEvent of the call in progress
+    """
+    __slots__ = ('event', 'sends', 'result', '_start')
+
+    def __init__(self, method: str, endpoint: str):
+        self.event = RequestEvent(method.lower(), endpoint)
+        self.sends = 0
+        # what the call returned
+        self.result = None
+        self._start = time.perf_counter()
+
+    def add(self, phase: str, seconds: float):
+        timings = self.event.timings
+        timings[phase] = timings.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def timed(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def received(self, response, connected: float, read: bool):
+        """
+        Takes note of one request sent and its response
+
+        :param response: the requests.Response
+        :param connected: a float, the connect time noted before it was sent
+        :param read: a boolean, whether to read the body now, timing it as
+                     the download; otherwise its Content-Length is counted
+        """
+        self.sends += 1
+        event = self.event
+        event.status = response.status_code
+        connecting = event.timings.get(CONNECT, 0.0) - connected
+        self.add(TTFB, max(0.0, response.elapsed.total_seconds() - connecting))
+        if read:
+            start = time.perf_counter()
+            content = response.content
+            self.add(DOWNLOAD, time.perf_counter() - start)
+            event.bytes += len(content or b'')
+        else:
+            event.bytes += int(response.headers.get('Content-Length') or 0)
+
+    def finish(self) -> RequestEvent:
+        event = self.event
+        event.duration = time.perf_counter() - self._start
+        event.retries = max(0, self.sends - 1)
+        if event.status is None and event.error is None:
+            # answered without a request of its own: cached, or coalesced
+            # with one already in flight
+            event.status = getattr(self.result, 'status', 200)
+        return event
+
+
+def current() -> Optional[Trace]:
+    """
+    :returns: the Trace of the call in progress on this thread, or None if
+              it isn't traced
+    """
+    return _current.get()
+
+
+def timed(trace: Optional[Trace], phase: str):
+    """
+    :returns: a context manager adding the time spent in it to `phase` of
+              `trace`, if there is one
+    """
+    return _NOT_TRACED if trace is None else trace.timed(phase)
+
+
+def tracing(hooks: Sequence[Hook], method: str, url: str, endpoint: Endpoint = None):
+    """
+    :param hooks: the functions to hand the RequestEvent to
+    :param method: a string, "get" or "post"
+    :param url: a string, the path relative to the API host
+    :param endpoint: the Endpoint being called, if known
+
+    :returns: a context manager around a call, giving its Trace, or None if
+              there are no hooks; a call made inside another one is part of
+              its Trace
+    """
+    trace = _current.get()
+    if trace is not None:
+        return nullcontext(trace)
+    if not hooks:
+        return _NOT_TRACED
+    if endpoint is None:
+        endpoint = lookup(method, url)
+    return _traced(hooks, Trace(method, endpoint.name if endpoint is not None else endpoint_key(url)))
+
+
+@contextmanager
+def _traced(hooks: Sequence[Hook], trace: Trace):
+    token = _current.set(trace)
+    try:
+        yield trace
+    except BaseException as e:
+        trace.event.error = type(e).__name__
+        raise
+    finally:
+        _current.reset(token)
+        event = trace.finish()
+        for hook in hooks:
+            hook(event)
+
+
+class TimedAuth(AuthBase):
+    """
+    Adds the time another auth takes to sign a request to a Trace
+    """
+
+    def __init__(self, auth: AuthBase, trace: Trace):
+        self.auth = auth
+        self.trace = trace
+
+    def __call__(self, r):
+        start = time.perf_counter()
+        r = self.auth(r)
+        self.trace.add(SIGN, time.perf_counter() - start)
+        return r
+
+
+class _TimedConnect:
+    def connect(self):
+        trace = _current.get()
+        if trace is None:
+            return super().connect()
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            trace.add(CONNECT, time.perf_counter() - start)
+
+
+class _TimedHTTPConnection(_TimedConnect, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnect, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedAdapter(HTTPAdapter):
+    """
+    An HTTPAdapter whose new connections add the time they took to connect,
+    including the TLS handshake, to the Trace of the call making them
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _TimedHTTPConnectionPool,
+                                                   'https': _TimedHTTPSConnectionPool}
+
+
+# upper bounds of the buckets of histograms of seconds, and of bytes
+SECONDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+           10.0, 30.0)
+BYTES = tuple(256 * 4 ** power for power in range(10))
+
+
+class Histogram:
+    """
+    Counts observations in buckets with fixed upper bounds, which is enough
+    to estimate quantiles without keeping every observation
+    """
+    __slots__ = ('bounds', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, bounds: Sequence[float] = SECONDS):
+        self.bounds = tuple(bounds)
+        # one more, for observations above the last bound
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def __repr__(self):
+        return 'Histogram(count={}, mean={:.6g}, p99={:.6g}, max={:.6g})'.format(
+            self.count, self.mean, self.quantile(0.99), self.max)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        :param q: a float between 0 and 1, e.g. 0.99
+
+        :returns: the upper bound of the bucket the q-quantile fell in, or
+                  the largest observation if that's lower
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(bound, self.max)
+        return self.max
+
+
+class MetricsRegistry:
+    """
+    A hook keeping counters and histograms of every call in memory, by
+    endpoint, to find slow endpoints and the phases they're slow in
+
+        metrics = MetricsRegistry()
+        client = TumblrRestClient(consumer_key, hooks=[metrics])
+        ...
+        metrics.histogram('phase', endpoint='posts', phase='decode').quantile(0.99)
+        metrics.slowest('decode')
+
+    It counts 'requests' by endpoint and status, 'retries' and 'errors' by
+    endpoint, and keeps histograms of each endpoint's 'duration' and
+    'bytes', and of the seconds of each 'phase'.
+    """
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Tuple], int] = {}
+        self.histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: RequestEvent):
+        endpoint = event.endpoint
+        with self._lock:
+            self._count('requests', 1, endpoint=endpoint, status=event.status)
+            if event.retries:
+                self._count('retries', event.retries, endpoint=endpoint)
+            if event.error is not None:
+                self._count('errors', 1, endpoint=endpoint, error=event.error)
+            self._observe('duration', event.duration, SECONDS, endpoint=endpoint)
+            self._observe('bytes', event.bytes, BYTES, endpoint=endpoint)
+            for phase, seconds in event.timings.items():
+                self._observe('phase', seconds, SECONDS, endpoint=endpoint, phase=phase)
+
+    def counter(self, name: str, **tags) -> int:
+        """
+        :returns: a counter's value, e.g. counter('requests', endpoint='posts', status=200)
+        """
+        return self.counters.get((name, tuple(sorted(tags.items()))), 0)
+
+    def histogram(self, name: str, **tags) -> Optional[Histogram]:
+        """
+        :returns: a histogram, e.g. histogram('phase', endpoint='posts', phase='ttfb'),
+                  or None if nothing was observed for it
+        """
+        return self.histograms.get((name, tuple(sorted(tags.items()))))
+
+    def slowest(self, phase: str = None, count: int = 10) -> List[Tuple[str, Histogram]]:
+        """
+        :param phase: a string, one of PHASES, or None for whole calls
+
+        :returns: up to `count` of (endpoint, histogram), those with the
+                  highest mean first
+        """
+        name, wanted = ('duration', ()) if phase is None else ('phase', (('phase', phase),))
+        found = [(dict(tags)['endpoint'], histogram) for (key, tags), histogram in list(self.histograms.items())
+                 if key == name and all(tag in tags for tag in wanted)]
+        return sorted(found, key=lambda item: item[1].mean, reverse=True)[:count]
+
+    def snapshot(self) -> Dict[str, List[Dict]]:
+        """
+        :returns: every counter and a summary of every histogram, as JSON
+                  serializable dicts
+        """
+        with self._lock:
+            counters = [dict(tags, name=name, value=value) for (name, tags), value in self.counters.items()]
+            histograms = [dict(tags, name=name, count=histogram.count, sum=histogram.sum, max=histogram.max,
+                               p50=histogram.quantile(0.5), p95=histogram.quantile(0.95),
+                               p99=histogram.quantile(0.99))
+                          for (name, tags), histogram in self.histograms.items()]
+        return {'counters': counters, 'histograms': histograms}
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def _count(self, name: str, value: int, **tags):
+        key = (name, tuple(sorted(tags.items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def _observe(self, name: str, value: float, bounds: Sequence[float], **tags):
+        key = (name, tuple(sorted(tags.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(bounds)
+        histogram.observe(value)
+
+
+class LogSink:
+    """
+    A hook logging each call as one line of JSON, which is also attached to
+    the log record as `tumblr`
+
+        client = TumblrRestClient(consumer_key, hooks=[LogSink(min_duration=0.5)])
+    """
+
+    def __init__(self, logger: logging.Logger = None, level: int = logging.INFO, min_duration: float = 0.0):
+        """
+        :param logger: the logging.Logger to log to, defaults to
+                       'pytumblr.requests'
+        :param level: an int, the level to log at
+        :param min_duration: a float, the seconds below which successful
+                             calls aren't logged
+        """
+        self.logger = logging.getLogger('pytumblr.requests') if logger is None else logger
+        self.level = level
+        self.min_duration = min_duration
+
+    def __call__(self, event: RequestEvent):
+        failed = event.error is not None or (event.status or 0) >= 400
+        if not failed and event.duration < self.min_duration:
+            return
+        if not self.logger.isEnabledFor(self.level):
+            return
+        record = asdict(event)
+        record['duration'] = round(event.duration, 6)
+        record['timings'] = {phase: round(seconds, 6) for phase, seconds in event.timings.items()}
+        self.logger.log(self.level, json.dumps(record, sort_keys=True), extra={'tumblr': record})
@@ -0,0 +1,183 @@
+import dataclasses
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar, Union, get_type_hints
+
+from . import types
+from .request import TumblrError, TumblrResponse
+
+T = TypeVar('T')
+
+# converts a JSON value to a field's type
+Converter = Callable[[Any], Any]
+# builds an instance of a class from its JSON dict
+Builder = Callable[[Type[T], Dict], T]
+
+
+def resolve(cls: Type[T], data: Dict) -> Type[T]:
+    """
+    :returns: the concrete class to build for `data`, following the same
+              dispatch as the __new__ of Post, ContentBlock, etc.
+    """
+    if '_resolve' in cls.__dict__:
+        return cls._resolve(data)
+    return cls
+
+
+def _parse_date(value):
+    return types.parse_date(value) if isinstance(value, str) else value
+
+
+def converter(hint, build: Builder) -> Optional[Converter]:
+    """
+    :param hint: a field's type annotation
+    :param build: the function nested dataclasses are built with
+
+    :returns: a function converting the field's JSON value, or None if the
+              value is used as is
+    """
+    if hint is datetime:
+        return _parse_date
+    if isinstance(hint, type) and dataclasses.is_dataclass(hint):
+        return lambda value: build(hint, value)
+
+    origin = getattr(hint, '__origin__', None)
+    args = getattr(hint, '__args__', None) or ()
+    if origin is Union:
+        types_ = [arg for arg in args if arg is not type(None)]
+        # None values are never converted, so Optional[X] converts like X
+        return converter(types_[0], build) if len(types_) == 1 else None
+    if origin in (list, List) and args:
+        item = converter(args[0], build)
+        if item is None:
+            return None
+        return lambda values: [item(value) for value in values]
+    return None
+
+
+_MISSING = dataclasses.MISSING
+
+
+def field_specs(cls: type, build: Builder) -> List[Tuple[str, Optional[Converter], Any]]:
+    """
+    :returns: (name, converter, default factory) for every field of a
+              dataclass; the factory is MISSING for required fields
+    """
+    hints = get_type_hints(cls)
+    specs = []
+    for f in dataclasses.fields(cls):
+        if f.default is not _MISSING:
+            default = (lambda value: lambda: value)(f.default)
+        else:
+            default = f.default_factory
+        specs.append((f.name, converter(hints.get(f.name), build), default))
+    return specs
+
+
+class _LazyField:
+    """
+    A field converted from the view's JSON on first access
+    """
+    __slots__ = ('name', 'convert', 'default')
+
+    def __init__(self, name, convert, default):
+        self.name = name
+        self.convert = convert
+        self.default = default
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        cache = instance.__dict__
+        try:
+            return cache[self.name]
+        except KeyError:
+            pass
+
+        value = cache[self.name] = self.build(instance, cache['_raw'])
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+
+    def build(self, instance, raw: Dict):
+        if self.name in raw:
+            value = raw[self.name]
+            if value is not None and self.convert is not None:
+                value = self.convert(value)
+        elif self.default is not _MISSING:
+            value = self.default()
+        else:
+            raise AttributeError("{} has no '{}'".format(type(instance).__qualname__, self.name))
+        return value
+
+
+class _LazyPostDate(_LazyField):
+    """
+    A post's date, built like Post.__post_init__ builds it
+    """
+    __slots__ = ()
+
+    def build(self, instance, raw: Dict):
+        if 'timestamp' not in raw:
+            return super().build(instance, raw)
+        return types.post_date(raw['timestamp'], raw.get(self.name))
+
+
+_VIEW_CLASSES: Dict[type, type] = {}
+
+
+def view_class(cls: Type[T]) -> Type[T]:
+    """
+    :returns: the lazy subclass of a concrete dataclass, creating it on first use
+    """
+    lazy = _VIEW_CLASSES.get(cls)
+    if lazy is None:
+        namespace = {name: _LazyField(name, convert, default)
+                     for name, convert, default in field_specs(cls, view)}
+        if 'timestamp' in namespace and getattr(namespace.get('date'), 'convert', None) is _parse_date:
+            namespace['date'] = _LazyPostDate('date', _parse_date, namespace['date'].default)
+        # skip the dispatching __new__; views are only made by view()
+        namespace['__new__'] = lambda c, *args, **kwargs: object.__new__(c)
+        namespace['__qualname__'] = cls.__qualname__
+        namespace['__module__'] = cls.__module__
+        lazy = _VIEW_CLASSES[cls] = type(cls.__name__, (cls,), namespace)
+    return lazy
+
+
+def view(cls: Type[T], data: Dict) -> T:
+    """
+    Wraps an object's JSON without converting any of it
+
+    Each field (nested objects, parsed dates) is built the first time it's
+    read and cached afterwards. Views are instances of subclasses of the
+    classes they stand in for, so isinstance checks, equality and repr work
+    as they do for eagerly built objects.
+
+        posts = lazy.view(types.Dashboard, response).posts
+        posts[0].id  # only the first post's id has been looked at
+
+    :param cls: one of the classes in types or npf
+    :param data: a dict, the object's JSON
+
+    :returns: a lazy instance of `cls` (or of the subclass `data` dispatches to)
+    """
+    instance = object.__new__(view_class(resolve(cls, data)))
+    instance.__dict__['_raw'] = data
+    return instance
+
+
+def raw(instance) -> Dict:
+    """
+    :returns: the JSON dict a view wraps
+    """
+    return instance.__dict__['_raw']
+
+
+def wrap(return_type: Type[T], response: TumblrResponse) -> Union[T, TumblrError]:
+    """
+    Like pytumblr._wrap, but returns a lazy view of the response
+    """
+    if isinstance(response, TumblrError):
+        return response
+    else:
+        return view(return_type, response)
@@ -0,0 +1,228 @@
+import io
+import mimetypes
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+# what can be uploaded: a path, a bytes-like object or a binary file object
+Source = Union[str, os.PathLike, bytes, bytearray, memoryview, io.IOBase]
+
+# called with the bytes sent so far and the total
+Progress = Callable[[int, int], None]
+
+# Tumblr's limits for photo posts
+MAX_PHOTOS = 10
+MAX_PHOTO_SIZE = 20 * 1024 * 1024
+MAX_GIF_SIZE = 10 * 1024 * 1024
+
+_QUOTED = {10: '%0A', 13: '%0D', 34: '%22'}
+
+
+def _quote(value: str) -> str:
+    # like the HTML5 form encoding requests uses
+    return value.translate(_QUOTED)
+
+
+class _Part:
+    """
+    One file in the body: its headers, where its bytes come from and how
+    many there are
+    """
+    __slots__ = ('headers', 'source', 'size', 'start', 'filename', 'content_type')
+
+    def __init__(self, name: str, source: Source):
+        self.source = source
+        self.start = 0
+        if isinstance(source, (str, os.PathLike)):
+            filename = os.path.basename(os.fspath(source))
+            self.size = os.stat(source).st_size
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            filename = name
+            self.source = memoryview(source).cast('B')
+            self.size = self.source.nbytes
+        elif hasattr(source, 'read'):
+            path = getattr(source, 'name', None)
+            filename = os.path.basename(path) if isinstance(path, str) else name
+            if not (hasattr(source, 'seekable') and source.seekable()):
+                # its length has to be known up front, and it may be sent twice
+                self.source = memoryview(source.read())
+                self.size = self.source.nbytes
+            else:
+                self.start = source.tell()
+                self.size = source.seek(0, io.SEEK_END) - self.start
+                source.seek(self.start)
+        else:
+            raise ValueError('Cannot upload {!r}; pass a path, a bytes-like object or a file'.format(source))
+
+        self.filename = filename
+        self.content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        self.headers = ('Content-Disposition: form-data; name="{}"; filename="{}"\r\n'
+                        'Content-Type: {}\r\n\r\n').format(_quote(name), _quote(filename),
+                                                         self.content_type).encode()
+
+
+class MultipartEncoder:
+    """
+    A multipart/form-data body that is read in bounded chunks as it's sent
+
+    Files given by path are opened one at a time, only while they're being
+    sent, and are always closed again. Bytes-like sources are sent as
+    slices of a memoryview, without copying. The body can be iterated more
+    than once, so a request can be retried.
+
+        encoder = MultipartEncoder({'type': 'video'}, {'data': 'movie.mp4'},
+                                   progress=lambda sent, total: print(sent / total))
+        session.post(url, data=encoder, headers={'Content-Type': encoder.content_type})
+    """
+
+    def __init__(self, fields: Dict[str, Any], files: Dict[str, Source], boundary: str = None,
+                 chunk_size=65536, progress: Optional[Progress] = None):
+        """
+        :param fields: a dict, the form fields; list values are sent once per item
+        :param files: a dict, field name -> path, bytes-like object or file
+                      object, or a Photoset
+        :param boundary: a string, the part boundary, random by default
+        :param chunk_size: an int, the most bytes read from a file at a time
+        :param progress: a function called with (bytes sent, total bytes)
+                         after each chunk
+        """
+        self.boundary = boundary or uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self._open: List[io.IOBase] = []
+
+        delimiter = '--{}\r\n'.format(self.boundary).encode()
+        # the body alternates between prebuilt bytes and file contents
+        self._layout: List[Union[bytes, _Part]] = []
+        head = bytearray()
+        for name, values in fields.items():
+            for value in values if isinstance(values, (list, tuple)) else [values]:
+                if isinstance(value, bytes):
+                    value = value.decode('utf-8')
+                head += delimiter
+                head += 'Content-Disposition: form-data; name="{}"\r\n\r\n{}\r\n'.format(_quote(name), value).encode()
+        for name, source in files.items():
+            part = source if isinstance(source, _Part) else _Part(name, source)
+            head += delimiter + part.headers
+            self._layout.append(bytes(head))
+            self._layout.append(part)
+            head = bytearray(b'\r\n')
+        head += '--{}--\r\n'.format(self.boundary).encode()
+        self._layout.append(bytes(head))
+        self.length = sum(len(item) if isinstance(item, bytes) else item.size for item in self._layout)
+
+    @property
+    def content_type(self) -> str:
+        return 'multipart/form-data; boundary={}'.format(self.boundary)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {'Content-Type': self.content_type, 'Content-Length': str(self.length)}
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self) -> Iterator[bytes]:
+        sent = 0
+        for chunk in self._chunks():
+            yield chunk
+            sent += len(chunk)
+            if self.progress is not None:
+                self.progress(sent, self.length)
+
+    def _chunks(self) -> Iterator[bytes]:
+        for item in self._layout:
+            if isinstance(item, bytes):
+                yield item
+            else:
+                yield from self._read(item)
+
+    def _read(self, part: _Part) -> Iterator[bytes]:
+        source = part.source
+        if isinstance(source, memoryview):
+            for start in range(0, part.size, self.chunk_size):
+                yield source[start:start + self.chunk_size]
+            return
+
+        opened = isinstance(source, (str, os.PathLike))
+        f = open(source, 'rb') if opened else source
+        if opened:
+            self._open.append(f)
+        try:
+            f.seek(part.start)
+            remaining = part.size
+            while remaining > 0:
+                chunk = f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    raise IOError('{} got shorter while it was being uploaded'.format(getattr(f, 'name', 'A file')))
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            if opened and f in self._open:
+                self._open.remove(f)
+                f.close()
+
+    def close(self):
+        """
+        Closes any file still open because sending stopped partway
+        """
+        while self._open:
+            self._open.pop().close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+
+class Photoset:
+    """
+    The photos of a photo post, checked and measured before anything is sent
+
+    Every file is stat'ed on a thread pool and the part headers are built
+    up front, so a photoset with an oversize or missing file fails before
+    any network I/O, and encoding it later only has to read the files.
+
+        photos = Photoset(['1.jpg', '2.jpg', '3.gif'])
+        client.create_photo(blogName, data=photos, caption='Holiday')
+    """
+
+    def __init__(self, sources: List[Source], workers=8, max_photos=MAX_PHOTOS,
+                 max_size=MAX_PHOTO_SIZE, max_gif_size=MAX_GIF_SIZE):
+        """
+        :param sources: a list of paths, bytes-like objects or binary files
+        :param workers: an int, the most files stat'ed at the same time
+        :param max_photos: an int, the most photos allowed
+        :param max_size: an int, the largest photo allowed, in bytes
+        :param max_gif_size: an int, the largest GIF allowed, in bytes
+
+        :raises ValueError: if there are too many photos or any is too large
+        :raises OSError: if a file can't be read
+        """
+        if not sources:
+            raise ValueError('A photoset needs at least one photo')
+        if len(sources) > max_photos:
+            raise ValueError('A photoset can have at most {} photos, not {}'.format(max_photos, len(sources)))
+
+        names = ['data[{}]'.format(index) for index in range(len(sources))]
+        with ThreadPoolExecutor(max_workers=min(workers, len(sources)), thread_name_prefix='pytumblr-stat') as executor:
+            parts = list(executor.map(_Part, names, sources))
+
+        oversize = []
+        for part in parts:
+            limit = max_gif_size if part.content_type == 'image/gif' else max_size
+            if part.size > limit:
+                oversize.append('{} ({:.1f} MB, the limit is {:.0f} MB)'.format(
+                    part.filename, part.size / 2 ** 20, limit / 2 ** 20))
+        if oversize:
+            raise ValueError('Too large to upload: ' + ', '.join(oversize))
+
+        # field name -> part, in order
+        self.parts: Dict[str, _Part] = dict(zip(names, parts))
+        self.size = sum(part.size for part in parts)
+
+    def __len__(self):
+        return len(self.parts)
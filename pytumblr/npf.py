@@ -10,7 +10,7 @@ class ShortBlogInfo(types.BlogInfo):
     """
     A blog which is only guaranteed to have a uuid
     """
-    uuid: str
+    uuid: str = None
 
     title: str = None
     posts: int = None
@@ -50,10 +50,13 @@ class ContentFormat(NeueObject):
     end: int
 
     def __new__(cls, *args, **kwargs):
-        if 'type' in kwargs:
-            return FORMAT_CLASSES[kwargs['type']](*args, **kwargs)
-        else:
-            return ContentFormat(*args, **kwargs)
+        if cls is ContentFormat:
+            cls = ContentFormat._resolve(kwargs)
+        return super().__new__(cls)
+
+    @staticmethod
+    def _resolve(data: Dict[str, Any]) -> Type['ContentFormat']:
+        return FORMAT_CLASSES.get(data.get('type'), ContentFormat)
 
 
 @dataclass
@@ -77,17 +80,24 @@ class ColorFormat(ContentFormat):
 FORMAT_CLASSES = {
     'color': ColorFormat,
     'link': LinkFormat,
+    'mention': MentionFormat,
     'content': ContentFormat,
 }
 
 
 class ContentBlock(NeueObject):
     def __new__(cls, *args, **kwargs):
-        if kwargs['type'] in CONTENT_CLASSES:
-            return CONTENT_CLASSES[kwargs['type']](*args, **kwargs)
+        if cls is ContentBlock:
+            cls = ContentBlock._resolve(kwargs)
+        return super().__new__(cls)
+
+    @staticmethod
+    def _resolve(data: Dict[str, Any]) -> Type['ContentBlock']:
+        if data['type'] in CONTENT_CLASSES:
+            return CONTENT_CLASSES[data['type']]
         else:
             # type is a generic mime type
-            return ImageBlock(*args, **kwargs)
+            return ImageBlock
 
 
 @dataclass
@@ -106,7 +116,13 @@ class Media(NeueObject):
 
 class Attribution(NeueObject):
     def __new__(cls, *args, **kwargs):
-        return ATTRIBUTION_CLASSES[kwargs['type']](*args, **kwargs)
+        if cls is Attribution:
+            cls = Attribution._resolve(kwargs)
+        return super().__new__(cls)
+
+    @staticmethod
+    def _resolve(data: Dict[str, Any]) -> Type['Attribution']:
+        return ATTRIBUTION_CLASSES[data['type']]
 
 
 @dataclass
@@ -141,7 +157,8 @@ class AppAttribution(Attribution):
     logo: Media = None
 
     def __post_init__(self):
-        self.logo = Media(**self.logo)
+        if isinstance(self.logo, dict):
+            self.logo = Media(**self.logo)
 
 
 ATTRIBUTION_CLASSES: Dict[str, Type] = {
@@ -162,8 +179,10 @@ class ImageBlock(ContentBlock):
 
     def __post_init__(self):
         self.media = [Media(**item) for item in self.media]
-        self.poster = Media(**self.poster)
-        self.attribution = Attribution(self.attribution)
+        if isinstance(self.poster, dict):
+            self.poster = Media(**self.poster)
+        if isinstance(self.attribution, dict):
+            self.attribution = Attribution(**self.attribution)
 
 
 @dataclass
@@ -177,7 +196,8 @@ class LinkBlock(ContentBlock):
     poster: Media = None
 
     def __post_init__(self):
-        self.poster = Media(**self.poster)
+        if isinstance(self.poster, dict):
+            self.poster = Media(**self.poster)
 
 
 @dataclass
@@ -195,9 +215,12 @@ class MediaBlock(ContentBlock):
     attribution: Attribution = None
 
     def __post_init__(self):
-        self.poster = [Media(**poster) for poster in self.poster]
-        self.media = Media(**self.media)
-        self.attribution = Attribution(**self.attribution)
+        if self.poster is not None:
+            self.poster = [Media(**poster) for poster in self.poster]
+        if isinstance(self.media, dict):
+            self.media = Media(**self.media)
+        if isinstance(self.attribution, dict):
+            self.attribution = Attribution(**self.attribution)
 
 
 @dataclass
@@ -223,7 +246,13 @@ CONTENT_CLASSES = {
 
 class LayoutBlock(NeueObject):
     def __new__(cls, *args, **kwargs):
-        return LAYOUT_CLASSES[kwargs['type']](*args, **kwargs)
+        if cls is LayoutBlock:
+            cls = LayoutBlock._resolve(kwargs)
+        return super().__new__(cls)
+
+    @staticmethod
+    def _resolve(data: Dict[str, Any]) -> Type['LayoutBlock']:
+        return LAYOUT_CLASSES[data['type']]
 
 
 IndexList = List[int]
@@ -259,7 +288,8 @@ class AskLayout(LayoutBlock):
 
     def __post_init__(self):
         self.attribution = Attribution(**self.attribution)
-        self.blog = ShortBlogInfo(**self.blog)
+        if isinstance(self.blog, dict):
+            self.blog = ShortBlogInfo(**self.blog)
 
 
 LAYOUT_CLASSES: Dict[str, Type] = {
@@ -269,6 +299,17 @@ LAYOUT_CLASSES: Dict[str, Type] = {
 }
 
 
+def _layout(data: Dict[str, Any]) -> LayoutBlock:
+    """
+    Builds a LayoutBlock from its JSON; rows and condensed layouts set their
+    own type, so they aren't passed it
+    """
+    cls = LayoutBlock._resolve(data)
+    if cls.__dataclass_fields__['type'].init:
+        return cls(**data)
+    return cls(**{key: value for key, value in data.items() if key != 'type'})
+
+
 @dataclass
 class BrokenBlog:
     name: str
@@ -289,11 +330,14 @@ class Trail:
 
     def __post_init__(self):
         self.content = [ContentBlock(**block) for block in self.content]
-        self.layout = [LayoutBlock(**block) for block in self.layout]
+        self.layout = [_layout(block) for block in self.layout]
 
-        self.broken_blog = BrokenBlog(**self.broken_blog)
-        self.post = PostInfo(**self.post)
-        self.blog = ShortBlogInfo(**self.blog)
+        if isinstance(self.broken_blog, dict):
+            self.broken_blog = BrokenBlog(**self.broken_blog)
+        if isinstance(self.post, dict):
+            self.post = PostInfo(**self.post)
+        if isinstance(self.blog, dict):
+            self.blog = ShortBlogInfo(**self.blog)
 
 
 @dataclass
@@ -315,5 +359,6 @@ class NeuePost(NeuePostInfo):
 
     def __post_init__(self):
         self.content = [ContentBlock(**block) for block in self.content]
-        self.layout = [LayoutBlock(**block) for block in self.layout]
-        self.trail = [Trail(**item) for item in self.trail]
+        self.layout = [_layout(block) for block in self.layout]
+        if self.trail is not None:
+            self.trail = [Trail(**item) for item in self.trail]
@@ -0,0 +1,128 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, TypeVar, Union
+
+from .request import TumblrError, TumblrRequestError
+
+T = TypeVar('T')
+
+# fetches one page for the given params and returns its items
+PageFetcher = Callable[[Dict], Union[List[T], TumblrError]]
+# given the params of the page just fetched and its items, returns the
+# params for the next page or None if there isn't one
+Cursor = Callable[[Dict, List[T]], Optional[Dict]]
+
+
+def by_offset(params: Dict, page: List) -> Optional[Dict]:
+    """
+    Advances `offset` past the page just read
+    """
+    return dict(params, offset=params.get('offset', 0) + len(page))
+
+
+def before(key: Callable[[T], int]) -> Cursor:
+    """
+    Pages backwards in time by passing the timestamp of the last item of
+    each page as `before`
+
+    :param key: a function returning the timestamp of an item
+    """
+    def cursor(params: Dict, page: List) -> Optional[Dict]:
+        timestamp = key(page[-1])
+        if timestamp is None or timestamp == params.get('before'):
+            # the cursor would not move, so we'd fetch this page forever
+            return None
+        params = dict(params, before=timestamp)
+        params.pop('offset', None)
+        return params
+    return cursor
+
+
+def _items(fetch: PageFetcher, params: Dict) -> List:
+    page = fetch(dict(params))
+    if isinstance(page, TumblrError):
+        raise TumblrRequestError(page)
+    return page
+
+
+def paginate(fetch: PageFetcher, params: Dict, cursor: Cursor, prefetch=False) -> Iterator[T]:
+    """
+    Lazily yields every item of a paginated endpoint, one page in memory at
+    a time
+
+    :param fetch: a function fetching a single page
+    :param params: a dict, the parameters of the first page
+    :param cursor: a function computing the parameters of the next page
+    :param prefetch: a boolean, whether to request the next page in the
+                     background while the current one is being consumed
+
+    :returns: an iterator of items; raises TumblrRequestError if a page
+              can't be fetched
+    """
+    if not prefetch:
+        while params is not None:
+            page = _items(fetch, params)
+            if not page:
+                return
+            params = cursor(params, page)
+            yield from page
+        return
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='pytumblr-prefetch') as executor:
+        pending = executor.submit(_items, fetch, params)
+        while pending is not None:
+            page = pending.result()
+            if not page:
+                return
+            params = cursor(params, page)
+            pending = executor.submit(_items, fetch, params) if params is not None else None
+            yield from page
+
+
+def fetch_offset_pages(fetch: PageFetcher, params: Dict, total: int, limit: int,
+                       workers=4, max_in_flight=None, start=0) -> Union[List[T], TumblrError]:
+    """
+    Fetches every page of an offset-paginated endpoint concurrently
+
+    The offset windows are planned up front from `total`, fetched on a pool
+    of `workers` threads with at most `max_in_flight` pages requested at
+    once, and reassembled in offset order.
+
+    :param fetch: a function fetching a single page
+    :param params: a dict, parameters sent with every page
+    :param total: an int, the number of items the endpoint holds
+    :param limit: an int, the number of items per page
+    :param workers: an int, the number of pages fetched at the same time
+    :param max_in_flight: an int, the number of pages submitted but not yet
+                          collected, defaults to `workers`
+    :param start: an int, the offset of the first page to fetch, e.g. `limit`
+                  when the first page has been fetched already
+
+    :returns: a list of every item in order, or the TumblrError of the first
+              page that failed
+    """
+    if max_in_flight is None:
+        max_in_flight = workers
+    windows = iter(range(start, total, limit))
+    items = []
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pytumblr-fetch') as executor:
+        in_flight = deque()
+
+        def submit_next():
+            offset = next(windows, None)
+            if offset is not None:
+                in_flight.append(executor.submit(fetch, dict(params, offset=offset, limit=limit)))
+
+        for _ in range(max_in_flight):
+            submit_next()
+        while in_flight:
+            page = in_flight.popleft().result()
+            if isinstance(page, TumblrError):
+                for future in in_flight:
+                    future.cancel()
+                return page
+            items.extend(page)
+            submit_next()
+
+    return items
@@ -0,0 +1,285 @@
+import threading
+import time
+from dataclasses import dataclass
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from . import TumblrRestClient
+from .endpoints import ENDPOINTS, Endpoint
+from .ratelimit import RateLimiter, FAIL, READ
+from .request import TumblrError, TumblrRequestError
+
+# statuses that take a set of credentials out of rotation: throttled, for
+# a while, and rejected, until restore() is called
+THROTTLED = 429
+UNAUTHORIZED = 401
+
+
+@dataclass(frozen=True)
+class Credentials:
+    """
+    One consumer key, and optionally a user's OAuth token for it
+    """
+    consumer_key: str
+    consumer_secret: str = ''
+    oauth_token: str = ''
+    oauth_secret: str = ''
+    # the blogs the token's user owns, which writes to them are sent with
+    blogs: Tuple[str, ...] = ()
+
+
+def _blog_host(blogname: str) -> str:
+    # like validate_blogname
+    return blogname if '.' in blogname else blogname + '.tumblr.com'
+
+
+def endpoint_of(method: str) -> Optional[Endpoint]:
+    """
+    :param method: a string, the name of a TumblrRestClient method
+
+    :returns: the Endpoint the method calls, or None
+    """
+    if method.startswith('create_'):
+        return ENDPOINTS['create_post']
+    if method == 'fetch_all_posts':
+        return ENDPOINTS['posts']
+    for prefix in ('iter_', 'stream_'):
+        if method.startswith(prefix):
+            method = method[len(prefix):]
+    return ENDPOINTS.get(method)
+
+
+class _Member:
+    __slots__ = ('client', 'credentials', 'in_flight', 'benched_until', 'disabled')
+
+    def __init__(self, client: TumblrRestClient, credentials: Credentials):
+        self.client = client
+        self.credentials = credentials
+        self.in_flight = 0
+        self.benched_until = 0.0
+        self.disabled = False
+
+
+class TumblrClientPool:
+    """
+    Spreads calls over several sets of credentials, each with its own
+    client, to get past the quota a single consumer key has
+
+    Public reads, e.g. posts() or tagged(), go to the credentials with the
+    most quota left, as reported by the shared RateLimiter. When a call is
+    throttled (429) those credentials sit out for a while; when they're
+    rejected (401) they sit out until restore(). Either way the call is
+    tried again with the next best credentials. (Iterators are routed when
+    they're created, and aren't moved once they've started.)
+
+    Calls that act for a particular user stick to their credentials:
+    writes to a blog, and reading its queue, drafts, submissions or
+    followers, use the credentials listing the blog in `blogs`; likes,
+    follows, the dashboard and other /user calls use the first credentials
+    with an OAuth token.
+
+        pool = TumblrClientPool([Credentials(key1, secret1),
+                                 Credentials(key2, secret2, token, token_secret, blogs=('mine',))])
+        pool.posts('staff')                  # whichever key has the most quota
+        pool.create_text('mine', body='Hi')  # always the owner's token
+    """
+
+    def __init__(self, credentials: Sequence[Union[Credentials, Tuple]], rate_limiter: RateLimiter = None,
+                 cooldown: float = 60.0, clock: Callable[[], float] = time.monotonic, **options):
+        """
+        :param credentials: a list of Credentials, or of tuples or dicts of
+                            their fields
+        :param rate_limiter: a RateLimiter shared by every client, defaults
+                             to one in FAIL mode, so throttled credentials
+                             are skipped instead of waited for
+        :param cooldown: a float, how many seconds throttled credentials sit
+                         out if the response doesn't say
+        :param options: any other keyword arguments accepted by
+                        TumblrRestClient, e.g. `cache`
+
+        :returns: None
+        """
+        if not credentials:
+            raise ValueError('A pool needs at least one set of credentials')
+        self.rate_limiter = RateLimiter(mode=FAIL) if rate_limiter is None else rate_limiter
+        self.cooldown = cooldown
+        self.clock = clock
+        self.members: List[_Member] = []
+        self._owners: Dict[str, _Member] = {}
+        self._user: Optional[_Member] = None
+        for entry in credentials:
+            if isinstance(entry, dict):
+                entry = Credentials(**entry)
+            elif not isinstance(entry, Credentials):
+                entry = Credentials(*entry)
+            client = TumblrRestClient(entry.consumer_key, entry.consumer_secret, entry.oauth_token,
+                                      entry.oauth_secret, rate_limiter=self.rate_limiter, **options)
+            member = _Member(client, entry)
+            self.members.append(member)
+            for blog in entry.blogs:
+                self._owners.setdefault(_blog_host(blog), member)
+            if self._user is None and entry.oauth_token:
+                self._user = member
+        self._lock = threading.Lock()
+        self._turn = 0
+
+    def client_for(self, blogname: str) -> TumblrRestClient:
+        """
+        :returns: the client with the token of the blog's owner
+
+        :raises ValueError: if no credentials own the blog
+        """
+        return self._sticky('create_post', (blogname,), {}).client
+
+    def available(self) -> List[TumblrRestClient]:
+        """
+        :returns: the clients currently in rotation
+        """
+        now = self.clock()
+        return [member.client for member in self.members if self._usable(member, now)]
+
+    def restore(self):
+        """
+        Puts every set of credentials back into rotation
+        """
+        with self._lock:
+            for member in self.members:
+                member.disabled = False
+                member.benched_until = 0.0
+
+    def close(self):
+        for member in self.members:
+            member.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _usable(self, member: _Member, now: float) -> bool:
+        return not member.disabled and member.benched_until <= now
+
+    def _quota(self, member: _Member) -> float:
+        """
+        :returns: how many more reads the member's key is good for, as far
+                  as the rate limiter knows
+        """
+        key = member.credentials.consumer_key
+        remaining = self.rate_limiter.quota_remaining(key)
+        if remaining is not None:
+            return remaining
+        buckets = self.rate_limiter.buckets(key, READ)
+        return min((bucket.tokens for bucket in buckets), default=float('inf'))
+
+    def _pick(self, tried) -> Optional[_Member]:
+        """
+        :returns: the member with the most quota left, the fewest calls in
+                  flight breaking ties, or None if none is usable
+        """
+        now = self.clock()
+        with self._lock:
+            candidates = [member for member in self.members
+                          if member not in tried and self._usable(member, now)]
+            if not candidates:
+                return None
+            # rotate the starting point so equal members share the load
+            self._turn = (self._turn + 1) % len(candidates)
+            candidates = candidates[self._turn:] + candidates[:self._turn]
+            member = max(candidates, key=lambda member: (self._quota(member), -member.in_flight))
+            member.in_flight += 1
+            return member
+
+    def _sticky(self, name: str, args, kwargs) -> Optional[_Member]:
+        """
+        :returns: the member a call must use, or None if any will do
+        """
+        endpoint = endpoint_of(name)
+        if endpoint is None:
+            # e.g. send_api_request; the user's, if there is one
+            return self._user
+        if endpoint.owner:
+            blogname = args[0] if args else kwargs.get('blogname')
+            if not blogname:
+                raise ValueError('{} needs the blogname of a blog the credentials own'.format(name))
+            member = self._owners.get(_blog_host(blogname))
+            if member is None:
+                raise ValueError('None of the credentials own {}'.format(blogname))
+            return member
+        if endpoint.path.startswith('/user/'):
+            if self._user is None:
+                raise ValueError('{} needs credentials with an OAuth token'.format(name))
+            return self._user
+        return None
+
+    def _note(self, member: _Member, result):
+        """
+        Takes credentials out of rotation if the result says to
+
+        :returns: True if it did
+        """
+        error = result
+        if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], bool):
+            # a Status
+            error = result[1]
+        if not isinstance(error, TumblrError) or error.status not in (THROTTLED, UNAUTHORIZED):
+            return False
+        with self._lock:
+            if error.status == UNAUTHORIZED:
+                member.disabled = True
+            else:
+                # the rate limiter says how long when it's the one refusing
+                wait = error.response.get('retry_after') if isinstance(error.response, dict) else None
+                member.benched_until = self.clock() + (wait or self.cooldown)
+        return True
+
+    def call(self, name: str, *args, **kwargs):
+        """
+        Calls a TumblrRestClient method through the pool
+
+        :param name: a string, the method, e.g. 'posts'
+
+        :returns: what the method returns; if every set of credentials is
+                  throttled or rejected, the last error
+        """
+        sticky = self._sticky(name, args, kwargs)
+        if sticky is not None:
+            result = getattr(sticky.client, name)(*args, **kwargs)
+            self._note(sticky, result)
+            return result
+
+        tried = []
+        result = TumblrError(THROTTLED, 'Too Many Requests', {'error': 'Every key in the pool is out of rotation'})
+        while True:
+            member = self._pick(tried)
+            if member is None:
+                return result
+            tried.append(member)
+            try:
+                result = getattr(member.client, name)(*args, **kwargs)
+            except TumblrRequestError as e:
+                if not self._note(member, e.error):
+                    raise
+                result = e.error
+                continue
+            finally:
+                with self._lock:
+                    member.in_flight -= 1
+            if not self._note(member, result):
+                return result
+
+
+def _routed(name):
+    method = getattr(TumblrRestClient, name)
+
+    @wraps(method)
+    def call(self, *args, **kwargs):
+        return self.call(name, *args, **kwargs)
+
+    return call
+
+
+# mirror the public surface of the client, like AsyncTumblrRestClient
+for _name, _value in vars(TumblrRestClient).items():
+    if callable(_value) and not _name.startswith('_') and _name not in ('close', 'bulk'):
+        setattr(TumblrClientPool, _name, _routed(_name))
@@ -0,0 +1,255 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# endpoint classes, each with their own quotas
+READ = 'read'
+# creating posts and reblogs, which share Tumblr's daily post limit
+POST = 'post'
+# every other write, e.g. likes and follows
+WRITE = 'write'
+
+# wait for the rate limiter to allow a request
+SLEEP = 'sleep'
+# give up on a request the rate limiter doesn't allow right away
+FAIL = 'fail'
+
+THROTTLED_STATUSES = frozenset((429, 503))
+
+
+def endpoint_class(method: str, url: str) -> str:
+    """
+    Classifies a request for the purpose of rate limiting
+
+    :param method: a string, the HTTP method
+    :param url: a string, the url being requested
+
+    :returns: READ, POST or WRITE
+    """
+    if method.lower() == 'get':
+        return READ
+    path = url.split('?', 1)[0].rstrip('/')
+    if path.endswith('/post') or path.endswith('/post/reblog'):
+        return POST
+    return WRITE
+
+
+@dataclass(frozen=True)
+class Rate:
+    """
+    A quota of `calls` requests every `period` seconds
+    """
+    calls: int
+    period: float
+
+
+# Tumblr's documented quotas for a single consumer key
+DEFAULT_LIMITS: Dict[str, List[Rate]] = {
+    READ: [Rate(1000, 3600), Rate(5000, 86400)],
+    POST: [Rate(250, 86400)],
+    WRITE: [],
+}
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket refilled continuously at `rate.calls` tokens
+    per `rate.period` seconds, holding at most `rate.calls` tokens
+    """
+
+    def __init__(self, rate: Rate, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = float(rate.calls)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate.calls / self.rate.period)
+        self.updated = now
+
+    def take(self) -> float:
+        """
+        Takes a token if one is available
+
+        :returns: 0 if a token was taken, otherwise the number of seconds
+                  until one will be
+        """
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) * self.rate.period / self.rate.calls
+
+    def drain(self, remaining: int):
+        """
+        Lowers the tokens left to what the server says remains of the quota
+        """
+        with self._lock:
+            self._refill(self.clock())
+            self.tokens = min(self.tokens, float(remaining))
+
+
+class RateLimiter:
+    """
+    Client-side rate limiting for TumblrRequest
+
+    Requests are counted against token buckets per consumer key and
+    endpoint class (reads, new posts and other writes). The limiter also
+    follows the X-Ratelimit-* headers Tumblr sends back, and when a
+    response is throttled (429/503) it stops handing out tokens for the
+    key until the server says to try again.
+
+        limiter = RateLimiter(mode=FAIL)
+        client = pytumblr.TumblrRestClient(key, secret, rate_limiter=limiter)
+    """
+
+    # header prefix -> period in seconds
+    _QUOTA_HEADERS = (('X-Ratelimit-Perhour', 3600), ('X-Ratelimit-Perday', 86400))
+
+    def __init__(self, limits: Dict[str, List[Rate]] = None, mode=SLEEP, max_wait: Optional[float] = None,
+                 key_limits: Dict[str, Dict[str, List[Rate]]] = None, max_throttled_retries=3,
+                 backoff=1.0, max_backoff=300.0, clock=time.monotonic, sleep=time.sleep):
+        """
+        :param limits: a dict, endpoint class -> list of Rates that all must allow a request,
+                       defaults to DEFAULT_LIMITS
+        :param mode: SLEEP to wait until a request is allowed, FAIL to
+                     return a 429 TumblrError immediately instead
+        :param max_wait: a float, in SLEEP mode the longest to wait before
+                         failing anyway; None waits as long as needed
+        :param key_limits: a dict, consumer key -> limits for that key,
+                           overriding `limits`
+        :param max_throttled_retries: an int, how many times a throttled
+                                      request is re-sent in SLEEP mode
+        :param backoff: a float, the seconds to pause after the first
+                        throttled response without a Retry-After header,
+                        doubled for each consecutive one
+        :param max_backoff: a float, the longest such pause
+        """
+        if mode not in (SLEEP, FAIL):
+            raise ValueError('`mode` must be either SLEEP or FAIL')
+        self.limits = DEFAULT_LIMITS if limits is None else limits
+        self.key_limits = key_limits or {}
+        self.mode = mode
+        self.max_wait = max_wait
+        self.max_throttled_retries = max_throttled_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.sleep = sleep
+
+        # (consumer key, endpoint class) -> buckets
+        self._buckets: Dict[Tuple[str, str], List[TokenBucket]] = {}
+        # consumer key -> {period: remaining calls} as last reported by the server
+        self.remaining: Dict[str, Dict[int, int]] = {}
+        self._strikes: Dict[str, int] = {}
+        # consumer key -> clock time before which no request is allowed
+        self._paused_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def buckets(self, consumer_key: str, endpoint: str) -> List[TokenBucket]:
+        key = (consumer_key, endpoint)
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            with self._lock:
+                buckets = self._buckets.get(key)
+                if buckets is None:
+                    rates = self.key_limits.get(consumer_key, self.limits).get(endpoint, [])
+                    buckets = self._buckets[key] = [TokenBucket(rate, self.clock) for rate in rates]
+        return buckets
+
+    def pause(self, consumer_key: str, seconds: float):
+        """
+        Allows no requests with this key for the next `seconds` seconds
+        """
+        with self._lock:
+            until = self.clock() + seconds
+            self._paused_until[consumer_key] = max(self._paused_until.get(consumer_key, 0.0), until)
+
+    def acquire(self, consumer_key: str, endpoint: str) -> float:
+        """
+        Takes a token from every bucket of this key and endpoint class,
+        sleeping until they're available in SLEEP mode
+
+        :returns: 0 if the request may go ahead, otherwise how many seconds
+                  the caller would have had to wait
+        """
+        waited = 0.0
+        while True:
+            wait = self._paused_until.get(consumer_key, 0.0) - self.clock()
+            if wait <= 0:
+                wait = 0.0
+                for bucket in self.buckets(consumer_key, endpoint):
+                    wait = bucket.take()
+                    if wait:
+                        # tokens taken from earlier buckets are simply spent;
+                        # that errs on the side of staying under the quota
+                        break
+            if not wait:
+                return 0.0
+            if self.mode == FAIL or (self.max_wait is not None and waited + wait > self.max_wait):
+                return wait
+            self.sleep(wait)
+            waited += wait
+
+    def update(self, consumer_key: str, status: int, headers, endpoint: str = READ) -> float:
+        """
+        Takes note of the quota headers of a response
+
+        :param status: an int, the HTTP status of the response
+        :param headers: the response headers
+        :param endpoint: a string, the endpoint class of the request, whose
+                         buckets the quota headers drain; e.g. reads don't
+                         use up the daily quota of new posts
+
+        :returns: 0 for a normal response, or the seconds the key is paused
+                  for if the response was throttled
+        """
+        resets = []
+        for prefix, period in self._QUOTA_HEADERS:
+            remaining = _int_header(headers, prefix + '-Remaining')
+            if remaining is None:
+                continue
+            self.remaining.setdefault(consumer_key, {})[period] = remaining
+            for bucket in self._buckets.get((consumer_key, endpoint), ()):
+                if bucket.rate.period == period:
+                    bucket.drain(remaining)
+            reset = _int_header(headers, prefix + '-Reset')
+            if remaining <= 0 and reset:
+                resets.append(reset)
+
+        if status not in THROTTLED_STATUSES:
+            self._strikes.pop(consumer_key, None)
+            pause = max(resets, default=0)
+        else:
+            strikes = self._strikes[consumer_key] = self._strikes.get(consumer_key, 0) + 1
+            pause = _int_header(headers, 'Retry-After')
+            if pause is None:
+                pause = max(resets, default=min(self.max_backoff, self.backoff * 2 ** (strikes - 1)))
+
+        if pause:
+            self.pause(consumer_key, pause)
+        return pause if status in THROTTLED_STATUSES else 0.0
+
+    def quota_remaining(self, consumer_key: str) -> Optional[int]:
+        """
+        :returns: the smallest quota the server last reported for this key,
+                  or None if it hasn't reported any
+        """
+        remaining = self.remaining.get(consumer_key)
+        return min(remaining.values()) if remaining else None
+
+
+def _int_header(headers, name: str) -> Optional[int]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -1,10 +1,43 @@
+import json
+import re
 import urllib.parse
-from dataclasses import dataclass
-from typing import Dict, Union, Tuple, List
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Union, Tuple, List, Optional
 
 import requests
 from requests.exceptions import TooManyRedirects, HTTPError
-from requests_oauthlib import OAuth1
+
+from .ratelimit import RateLimiter, endpoint_class, SLEEP, THROTTLED_STATUSES
+from .retry import RetryPolicy, endpoint_key, DEFAULT_RETRY_POLICY
+from .cache import ValidatorStore
+from .singleflight import SingleFlight
+from .multipart import MultipartEncoder, Progress
+from .endpoints import lookup
+from .oauth import OAuth1Signer
+from . import instrument
+from .instrument import DECODE, Hook, TimedAdapter, TimedAuth
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def default_json_loads() -> Callable[[bytes], Any]:
+    """
+    :returns: the fastest JSON decoder installed: orjson, then ujson, then
+              the standard library's
+    """
+    if orjson is not None:
+        return orjson.loads
+    if ujson is not None:
+        return ujson.loads
+    return json.loads
 
 
 @dataclass
@@ -24,6 +57,38 @@ class TumblrError:
     errors: List[Reason] = None
 
 
+class TumblrRequestError(Exception):
+    """
+    Raised in the few places a TumblrError can't be handed back as a value,
+    e.g. from inside an iterator
+    """
+
+    def __init__(self, error: TumblrError):
+        super().__init__('{} {}'.format(error.status, error.msg))
+        self.error = error
+
+
+@dataclass
+class RawResponse:
+    """
+    An undecoded response, as returned in raw mode
+    """
+    # the status and message from the response's meta, e.g. 200 and 'OK'
+    status: int
+    msg: str
+    # the body as sent, meta and all
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict, repr=False)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200
+
+
+# the meta object Tumblr puts at the start of every body
+_META = re.compile(rb'\s*\{\s*"meta"\s*:\s*\{\s*"status"\s*:\s*(\d+)\s*,\s*"msg"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
 TumblrResponse = Union[TumblrError, Dict]
 Status = Tuple[bool, TumblrError]
 
@@ -48,61 +113,200 @@ class TumblrRequest:
     __version = "0.0.8"
 
     def __init__(self, consumer_key, consumer_secret="", oauth_token="", oauth_secret="",
-                 host="https://api.tumblr.com", version=2):
+                 host="https://api.tumblr.com", version=2,
+                 pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive=True,
+                 session=None, rate_limiter: RateLimiter = None,
+                 retry_policy: Optional[RetryPolicy] = DEFAULT_RETRY_POLICY,
+                 write_retry_policy: Optional[RetryPolicy] = None,
+                 retry_policies: Dict[str, Optional[RetryPolicy]] = None,
+                 validators: ValidatorStore = None, coalesce=True,
+                 json_loads: Callable[[bytes], Any] = None, hooks: List[Hook] = None):
+        """
+        :param pool_connections: an int, the number of distinct hosts to keep
+                                 connection pools for
+        :param pool_maxsize: an int, the maximum number of connections kept
+                             open to any single host
+        :param pool_block: a boolean, whether to wait for a free connection
+                           once a host has `pool_maxsize` connections in use
+                           rather than opening a throwaway one
+        :param keep_alive: a boolean, whether connections are reused between
+                           requests
+        :param session: a requests.Session to issue requests through, if you
+                        want to configure it yourself; it is not closed by
+                        :meth:`close`
+        :param rate_limiter: a RateLimiter that requests are counted against,
+                             which may be shared between several
+                             TumblrRequests
+        :param retry_policy: the RetryPolicy for GET requests, or None to
+                             never retry them
+        :param write_retry_policy: the RetryPolicy for POST requests; None
+                                   by default. Even when given, it isn't
+                                   used for writes the endpoint registry
+                                   marks as not idempotent, e.g. creating
+                                   a post, unless they're named in
+                                   `retry_policies`
+        :param retry_policies: a dict, overriding the policy (or None) per
+                               endpoint, keyed by path with any blog name
+                               replaced, e.g.
+                               {'/user/like': RetryPolicy(),
+                                '/blog/{blogname}/posts': None}
+        :param validators: a ValidatorStore, to send GET requests as
+                           conditional requests against the ETag and
+                           Last-Modified of the previous response
+        :param coalesce: a boolean, whether identical GET requests made
+                         while one is already in flight wait for its
+                         response instead of being sent again
+        :param json_loads: a function decoding a response body from bytes,
+                           defaults to the fastest decoder installed
+        :param hooks: a list of functions, each called with a
+                      pytumblr.instrument.RequestEvent after every request
+                      with the time each phase of it took
+        """
         self.host = '{}/v{}'.format(host, version)
-        self.oauth = OAuth1(
-            consumer_key,
-            client_secret=consumer_secret,
-            resource_owner_key=oauth_token,
-            resource_owner_secret=oauth_secret
-        )
+        self.oauth = OAuth1Signer(consumer_key, consumer_secret, oauth_token, oauth_secret)
         self.consumer_key = consumer_key
 
         self.headers = {
             "User-Agent": "pytumblr/" + self.__version,
         }
+        if not keep_alive:
+            self.headers["Connection"] = "close"
 
-    def get(self, url, params) -> TumblrResponse:
+        self._owns_session = session is None
+        if session is None:
+            session = requests.Session()
+            # an HTTPAdapter that also times connecting, when traced
+            adapter = TimedAdapter(pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize,
+                                   pool_block=pool_block)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self.session = session
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.write_retry_policy = write_retry_policy
+        self.retry_policies = retry_policies or {}
+        self.validators = validators
+        self.single_flight = SingleFlight() if coalesce else None
+        self.json_loads = default_json_loads() if json_loads is None else json_loads
+        self.hooks = list(hooks or [])
+
+    def close(self):
+        """
+        Closes every pooled connection held by this request object
+        """
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, url, params, raw=False, signed=True) -> TumblrResponse:
         """
         Issues a GET request against the API, properly formatting the params
 
         :param url: a string, the url you are requesting
         :param params: a dict, the key-value of all the paramaters needed
                        in the request
+        :param raw: a boolean, whether to return the body undecoded as a
+                    RawResponse
+        :param signed: a boolean, whether to sign the request with OAuth;
+                       endpoints that take an api_key don't need it
         :returns: either a dict of the returned response or a TumblrError in case of failure
         """
-        url = self.host + url
-        if params:
-            url += "?" + urllib.parse.urlencode(params)
+        with instrument.tracing(self.hooks, 'get', url) as trace:
+            retry = self.retry_policy_for('get', url)
+            url = self.host + url
+            if params:
+                url += "?" + urllib.parse.urlencode(params)
 
-        try:
-            resp = requests.get(url, allow_redirects=False, headers=self.headers, auth=self.oauth)
-        except TooManyRedirects as e:
-            resp = e.response
+            def send():
+                return self._send('get', url, retry, conditional=self.validators is not None and not raw,
+                                  raw=raw, signed=signed, allow_redirects=False)
+
+            if self.single_flight is None:
+                response = send()
+            else:
+                key = (url.split('?', 1)[0],
+                       tuple(sorted((k, str(v)) for k, v in params.items())) if params else (), raw, signed)
+                response = self.single_flight.do(key, send)
+            if trace is not None:
+                trace.result = response
+            return response
+
+    def get_stream(self, url, params, signed=True) -> Union[requests.Response, TumblrError]:
+        """
+        Issues a GET request without reading its body
 
-        return self.json_parse(resp)
+        :param url: a string, the url you are requesting
+        :param params: a dict, the key-value of all the paramaters needed
+                       in the request
+        :param signed: a boolean, whether to sign the request with OAuth
+        :returns: the requests.Response, whose body can be read with
+                  iter_content() and which must be closed afterwards; or a
+                  TumblrError if the request failed
+        """
+        with instrument.tracing(self.hooks, 'get', url) as trace:
+            retry = self.retry_policy_for('get', url)
+            url = self.host + url
+            if params:
+                url += "?" + urllib.parse.urlencode(params)
+            response = self._send('get', url, retry, stream=True, signed=signed, allow_redirects=False)
+            if trace is not None:
+                trace.result = response
+            return response
 
-    def post(self, url, params={}, files=[]) -> TumblrResponse:
+    def post(self, url, params={}, files=None, raw=False, progress: Progress = None) -> TumblrResponse:
         """
         Issues a POST request against the API, allows for multipart data uploads
 
         :param url: a string, the url you are requesting
         :param params: a dict, the key-value of all the parameters needed
                        in the request
-        :param files: a list, the list of tuples of files
+        :param files: a dict, field name -> path, bytes-like object or file
+                      object to upload
+        :param raw: a boolean, whether to return the body undecoded as a
+                    RawResponse
+        :param progress: a function called with (bytes sent, total bytes)
+                         while files are uploaded
 
         :returns: a dict parsed of the JSON response
         """
-        url = self.host + url
-        try:
-            if files:
-                return self.post_multipart(url, params, files)
-            else:
-                data = urllib.parse.urlencode(params)
-                resp = requests.post(url, data=data, headers=self.headers, auth=self.oauth)
-                return self.json_parse(resp)
-        except HTTPError as e:
-            return self.json_parse(e.response)
+        with instrument.tracing(self.hooks, 'post', url) as trace:
+            retry = self.retry_policy_for('post', url)
+            url = self.host + url
+            try:
+                if files:
+                    response = self.post_multipart(url, params, files, retry, raw=raw, progress=progress)
+                else:
+                    data = urllib.parse.urlencode(params)
+                    response = self._send('post', url, retry, raw=raw, data=data)
+            except HTTPError as e:
+                response = self.raw_parse(e.response) if raw else self.json_parse(e.response)
+            if trace is not None:
+                trace.result = response
+            return response
+
+    def raw_parse(self, response) -> RawResponse:
+        """
+        Reads the status of a response from its meta without decoding the
+        rest of the body
+
+        :param response: The response returned to us from the request
+
+        :returns: a RawResponse; the HTTP status is used if the body
+                  doesn't start with a meta object
+        """
+        content = response.content
+        match = _META.match(content)
+        if match is not None:
+            status, msg = int(match.group(1)), match.group(2).decode('utf-8')
+        else:
+            status, msg = response.status_code, response.reason or ''
+        return RawResponse(status, msg, content, response.headers)
 
     def json_parse(self, response) -> TumblrResponse:
         """
@@ -114,7 +318,7 @@ class TumblrRequest:
         :returns: a dict of the json response
         """
         try:
-            data = response.json()
+            data = self.json_loads(response.content)
         except ValueError:
             data = {'meta': {'status': 500, 'msg': 'Server Error'},
                     'response': {"error": "Malformed JSON or HTML was returned."}}
@@ -128,23 +332,120 @@ class TumblrRequest:
                                data['meta']['msg'],
                                data['response'])
 
-    def post_multipart(self, url, params, files) -> TumblrResponse:
+    def post_multipart(self, url, params, files, retry: RetryPolicy = None, raw=False,
+                       progress: Progress = None) -> TumblrResponse:
         """
         Generates and issues a multipart request for data files
 
+        The body is streamed in bounded chunks, and any file opened to send
+        it is closed before this returns.
+
         :param url: a string, the url you are requesting
         :param params: a dict, a key-value of all the parameters
-        :param files:  a dict, matching the form '{name: file descriptor}'
+        :param files: a dict, field name -> path, bytes-like object or file object
+        :param retry: the RetryPolicy to send the request with, if any
+        :param raw: a boolean, whether to return a RawResponse
+        :param progress: a function called with (bytes sent, total bytes)
 
         :returns: a dict parsed from the JSON response
         """
-        resp = requests.post(
-            url,
-            data=params,
-            params=params,
-            files=files,
-            headers=self.headers,
-            allow_redirects=False,
-            auth=self.oauth
-        )
-        return self.json_parse(resp)
+        with MultipartEncoder(params, files, progress=progress) as encoder:
+            # params go in the query string too, so that OAuth signs them
+            return self._send('post', url, retry, raw=raw, data=encoder, params=params,
+                              headers=encoder.headers, allow_redirects=False)
+
+    def retry_policy_for(self, method: str, url: str) -> Optional[RetryPolicy]:
+        """
+        :param method: a string, "get" or "post"
+        :param url: a string, the path relative to the API host
+
+        :returns: the RetryPolicy a request should be sent with, or None
+        """
+        key = endpoint_key(url)
+        if key in self.retry_policies:
+            return self.retry_policies[key]
+        if method.lower() == 'get':
+            return self.retry_policy
+        endpoint = lookup(method, url)
+        if endpoint is not None and not endpoint.idempotent:
+            # sending it again could e.g. create the same post twice
+            return None
+        return self.write_retry_policy
+
+    def _send(self, method, url, retry: RetryPolicy = None, **kwargs) -> TumblrResponse:
+        """
+        Sends a request through the session, honouring the rate limiter
+        and retrying it according to `retry`
+
+        :param method: a string, "get" or "post"
+        :param url: a string, the full url you are requesting
+        :param retry: the RetryPolicy to send the request with, if any
+        :param kwargs: any other arguments for the session
+
+        :returns: a dict parsed from the JSON response, or a TumblrError
+        """
+        if retry is None:
+            return self._attempt(method, url, **kwargs)
+        limiter = self.rate_limiter
+        if limiter is not None and limiter.mode == SLEEP and retry.statuses & THROTTLED_STATUSES:
+            # _attempt already re-sends throttled requests once the limiter
+            # allows it, so the policy must not send them again on top
+            retry = replace(retry, statuses=retry.statuses - THROTTLED_STATUSES)
+        return retry.call(lambda: self._attempt(method, url, **kwargs))
+
+    def _attempt(self, method, url, conditional=False, raw=False, headers=None, signed=True,
+                 **kwargs) -> TumblrResponse:
+        headers = dict(self.headers, **headers) if headers else self.headers
+        auth = self.oauth if signed else None
+        stream = kwargs.get('stream', False)
+        trace = instrument.current()
+        if trace is not None:
+            if auth is not None:
+                auth = TimedAuth(auth, trace)
+            # read the body here rather than in the session, to time it
+            kwargs['stream'] = True
+        validated = None
+        if conditional:
+            validated = self.validators.get(url)
+            if validated is not None:
+                headers = dict(headers, **validated.headers())
+
+        limiter = self.rate_limiter
+        endpoint = endpoint_class(method, url)
+        throttled = 0
+        while True:
+            if limiter is not None:
+                wait = limiter.acquire(self.consumer_key, endpoint)
+                if wait:
+                    return TumblrError(429, 'Too Many Requests',
+                                       {'error': 'Client-side rate limit reached', 'retry_after': wait})
+
+            connected = trace.event.timings.get(instrument.CONNECT, 0.0) if trace is not None else 0.0
+            try:
+                resp = getattr(self.session, method)(url, headers=headers, auth=auth, **kwargs)
+            except TooManyRedirects as e:
+                resp = e.response
+            if trace is not None:
+                trace.received(resp, connected, read=not stream)
+
+            if limiter is not None:
+                limiter.update(self.consumer_key, resp.status_code, resp.headers, endpoint)
+                if (resp.status_code in THROTTLED_STATUSES and limiter.mode == SLEEP
+                        and throttled < limiter.max_throttled_retries):
+                    # acquire() waits out the pause the limiter just started
+                    throttled += 1
+                    continue
+
+            if stream and resp.status_code == 200:
+                return resp
+            if raw:
+                with instrument.timed(trace, DECODE):
+                    return self.raw_parse(resp)
+            if validated is not None and resp.status_code == 304:
+                return self.validators.hit(validated)
+            with instrument.timed(trace, DECODE):
+                response = self.json_parse(resp)
+            if conditional and not isinstance(response, TumblrError):
+                self.validators.store(url, resp.headers, response)
+            return response
+
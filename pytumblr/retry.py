@@ -0,0 +1,109 @@
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Callable, FrozenSet, Optional, Tuple, Type
+
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+
+# transient server errors, including the 500 json_parse reports when the
+# body isn't valid JSON
+RETRY_STATUSES = frozenset((500, 502, 503, 504))
+
+_BLOG_PATH = re.compile(r'^/blog/[^/]+/')
+
+
+def endpoint_key(url: str) -> str:
+    """
+    Normalizes an API path so that it names an endpoint rather than a
+    single blog's copy of it, e.g. '/blog/staff.tumblr.com/posts' becomes
+    '/blog/{blogname}/posts'
+
+    :param url: a string, the path relative to the API host
+    """
+    return _BLOG_PATH.sub('/blog/{blogname}/', url.split('?', 1)[0])
+
+
+@dataclass
+class RetryPolicy:
+    """
+    When and how often a failed request is tried again
+
+    Requests failing with a status in `statuses`, or raising one of
+    `exceptions`, are re-sent after an exponentially growing, jittered
+    delay until `max_attempts` is reached or the next attempt would start
+    after `deadline` seconds.
+
+        policy = RetryPolicy(max_attempts=5, deadline=30,
+                             on_complete=lambda attempts, result: stats.record(attempts))
+    """
+    max_attempts: int = 3
+    # seconds before the first retry, doubled for each one after
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+    # the fraction of each delay that is randomized; 1.0 is "full jitter"
+    jitter: float = 1.0
+    # seconds from the first attempt after which no more are started
+    deadline: Optional[float] = None
+    statuses: FrozenSet[int] = RETRY_STATUSES
+    exceptions: Tuple[Type[Exception], ...] = (RequestsConnectionError, Timeout)
+
+    # called before each retry with the attempt that failed, its
+    # TumblrError or exception, and the delay before the next one
+    on_retry: Optional[Callable] = None
+    # called once with the number of attempts made and the final result
+    on_complete: Optional[Callable] = None
+
+    sleep: Callable[[float], None] = field(default=time.sleep, repr=False)
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False)
+
+    def delay(self, attempt: int) -> float:
+        """
+        :param attempt: an int, the attempt that just failed, starting at 1
+
+        :returns: the seconds to wait before the next attempt
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return delay - delay * self.jitter * random.random()
+
+    def should_retry(self, result) -> bool:
+        return getattr(result, 'status', None) in self.statuses
+
+    def call(self, send: Callable):
+        """
+        Calls `send` until it succeeds or the policy gives up
+
+        :param send: a function sending the request, returning its parsed
+                     response or a TumblrError
+
+        :returns: the last result; the last exception is re-raised if the
+                  final attempt raised one
+        """
+        start = self.clock()
+        attempt = 0
+        while True:
+            attempt += 1
+            raised = None
+            try:
+                result = send()
+                failure = result if self.should_retry(result) else None
+            except self.exceptions as e:
+                result = failure = raised = e
+
+            delay = self.delay(attempt) if failure is not None else 0.0
+            give_up = (failure is None or attempt >= self.max_attempts or
+                       (self.deadline is not None and self.clock() + delay - start > self.deadline))
+            if give_up:
+                if self.on_complete is not None:
+                    self.on_complete(attempt, result)
+                if raised is not None:
+                    raise raised
+                return result
+
+            if self.on_retry is not None:
+                self.on_retry(attempt, failure, delay)
+            self.sleep(delay)
+
+
+# what GET requests use unless told otherwise
+DEFAULT_RETRY_POLICY = RetryPolicy()
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls into one
+
+    While a call for a key is running, other threads asking for the same key
+    wait for it and get its result (or exception) instead of making their
+    own call.
+
+        flight = SingleFlight()
+        info = flight.do(url, lambda: fetch(url))
+    """
+
+    def __init__(self):
+        self.calls = 0
+        # calls answered by another thread's call
+        self.shared = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        :param key: identifies the call
+        :param fn: makes the call
+
+        :returns: the result of `fn`, possibly from a call made by another thread
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    Collapses concurrent identical coroutine calls into one, within an
+    event loop
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]) -> Any:
+        """
+        :param key: identifies the call
+        :param fn: a function returning the awaitable making the call
+
+        :returns: the result of awaiting `fn()`, possibly shared with other callers
+        """
+        self.calls += 1
+        future = self._calls.get(key)
+        if future is not None:
+            self.shared += 1
+            # shield, so one caller being cancelled doesn't cancel the rest
+            return await asyncio.shield(future)
+
+        future = self._calls[key] = asyncio.ensure_future(fn())
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._calls.pop(key, None)
+            else:
+                future.add_done_callback(lambda _: self._calls.pop(key, None))
@@ -0,0 +1,264 @@
+import json
+import re
+from typing import Any, Callable, Iterable, Iterator, List, Set, Tuple
+
+from .request import TumblrError, TumblrRequestError
+
+# a path to a value in a JSON document: object keys, with '*' standing for
+# any element of an array, e.g. ('response', 'posts', '*')
+Path = Tuple[str, ...]
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_STRING_END = re.compile(rb'(?:[^"\\]|\\.)*"', re.S)
+_STRUCTURE = re.compile(rb'[{}\[\]"]')
+_SCALAR_END = re.compile(rb'[,}\] \t\n\r]')
+
+_OBJECT, _ARRAY = ord('{'), ord('[')
+
+# what a container expects next
+_FIRST, _KEY, _COLON, _VALUE, _COMMA = range(5)
+
+
+class _Frame:
+    __slots__ = ('kind', 'path', 'key', 'expect')
+
+    def __init__(self, kind, path):
+        self.kind = kind
+        self.path = path
+        self.key = None
+        self.expect = _FIRST
+
+
+class _Value:
+    """
+    A value being skipped or captured, which may span several chunks
+    """
+    __slots__ = ('start', 'path', 'capture', 'scan', 'depth')
+
+    def __init__(self, start, path, capture):
+        self.start = start
+        self.path = path
+        self.capture = capture
+        # where to carry on looking for its end, and how deeply nested that is
+        self.scan = start
+        self.depth = 0
+
+
+class JsonStream:
+    """
+    Picks values out of a JSON document as its bytes arrive
+
+    Only the containers leading to the wanted paths are walked. Every other
+    value is skipped by counting brackets, and each wanted value is decoded
+    on its own as soon as its last byte has arrived, so memory stays
+    bounded by the largest wanted value rather than the whole document.
+
+        stream = JsonStream({('response', 'posts', '*')})
+        for chunk in chunks:
+            for path, post in stream.feed(chunk):
+                ...
+        stream.close()
+    """
+
+    def __init__(self, wanted: Set[Path], loads: Callable[[bytes], Any] = json.loads):
+        """
+        :param wanted: a set of paths whose values are returned
+        :param loads: a function decoding a single value from bytes
+        """
+        self.wanted = frozenset(wanted)
+        self._prefixes = frozenset(path[:i] for path in self.wanted for i in range(len(path)))
+        self.loads = loads
+        self._buffer = bytearray()
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._value = None
+        self._started = False
+        self.done = False
+
+    def feed(self, chunk: bytes) -> List[Tuple[Path, Any]]:
+        """
+        :returns: a list of (path, value) for the wanted values completed
+                  by this chunk, in document order
+        """
+        self._buffer += chunk
+        found = []
+        self._run(found, final=False)
+        self._compact()
+        return found
+
+    def close(self) -> List[Tuple[Path, Any]]:
+        """
+        Ends the document, raising ValueError if it was cut short
+
+        :returns: any wanted values only completed by the end of the input
+        """
+        found = []
+        self._run(found, final=True)
+        if not self.done:
+            raise ValueError('JSON document ended early')
+        return found
+
+    def _run(self, found, final):
+        buffer = self._buffer
+        while not self.done:
+            if self._value is not None:
+                if not self._finish(found, final):
+                    return
+                continue
+
+            pos = self._pos = _WHITESPACE.match(buffer, self._pos).end()
+            if pos >= len(buffer):
+                return
+            char = buffer[pos]
+            if not self._stack:
+                if self._started:
+                    raise ValueError('Extra data after the JSON document at byte {}'.format(pos))
+                self._started = True
+                self._begin((), pos)
+                continue
+
+            frame = self._stack[-1]
+            expect = frame.expect
+            if expect == _COMMA:
+                if char == ord(','):
+                    frame.expect = _KEY if frame.kind == _OBJECT else _VALUE
+                    self._pos += 1
+                elif char == (ord('}') if frame.kind == _OBJECT else ord(']')):
+                    self._pop()
+                else:
+                    raise ValueError('Expected , or a closing bracket at byte {}'.format(pos))
+            elif frame.kind == _ARRAY:
+                if expect == _FIRST and char == ord(']'):
+                    self._pop()
+                else:
+                    self._begin(frame.path + ('*',), pos)
+            elif expect in (_FIRST, _KEY):
+                if expect == _FIRST and char == ord('}'):
+                    self._pop()
+                    continue
+                if char != ord('"'):
+                    raise ValueError('Expected a key at byte {}'.format(pos))
+                match = _STRING_END.match(buffer, pos + 1)
+                if match is None:
+                    return
+                frame.key = json.loads(bytes(buffer[pos:match.end()]))
+                frame.expect = _COLON
+                self._pos = match.end()
+            elif expect == _COLON:
+                if char != ord(':'):
+                    raise ValueError('Expected : at byte {}'.format(pos))
+                frame.expect = _VALUE
+                self._pos += 1
+            else:
+                self._begin(frame.path + (frame.key,), pos)
+
+    def _begin(self, path, pos):
+        if path in self.wanted:
+            self._value = _Value(pos, path, True)
+        elif path in self._prefixes and self._buffer[pos] in (_OBJECT, _ARRAY):
+            self._stack.append(_Frame(self._buffer[pos], path))
+            self._pos = pos + 1
+        else:
+            self._value = _Value(pos, path, False)
+
+    def _pop(self):
+        self._stack.pop()
+        self._pos += 1
+        self._ended()
+
+    def _ended(self):
+        # the value just read was the next member or element of its parent
+        if self._stack:
+            self._stack[-1].expect = _COMMA
+        else:
+            self.done = True
+
+    def _finish(self, found, final) -> bool:
+        """
+        Looks for the end of the value being skipped or captured
+
+        :returns: True once it has been found
+        """
+        value = self._value
+        buffer = self._buffer
+        char = buffer[value.start]
+        if char in (_OBJECT, _ARRAY):
+            scan = value.scan
+            while True:
+                match = _STRUCTURE.search(buffer, scan)
+                if match is None:
+                    value.scan = len(buffer)
+                    return False
+                char = buffer[match.start()]
+                if char == ord('"'):
+                    string = _STRING_END.match(buffer, match.end())
+                    if string is None:
+                        # read the whole string again once more has arrived
+                        value.scan = match.start()
+                        return False
+                    scan = string.end()
+                    continue
+                scan = match.end()
+                value.depth += 1 if char in (_OBJECT, _ARRAY) else -1
+                if value.depth == 0:
+                    end = scan
+                    break
+        elif char == ord('"'):
+            match = _STRING_END.match(buffer, value.start + 1)
+            if match is None:
+                return False
+            end = match.end()
+        else:
+            match = _SCALAR_END.search(buffer, value.start)
+            if match is not None:
+                end = match.start()
+            elif final:
+                end = len(buffer)
+            else:
+                return False
+
+        if value.capture:
+            found.append((value.path, self.loads(bytes(buffer[value.start:end]))))
+        self._value = None
+        self._pos = end
+        self._ended()
+        return True
+
+    def _compact(self):
+        """
+        Drops the bytes that have been read completely
+        """
+        keep = self._pos if self._value is None else self._value.start
+        if keep:
+            del self._buffer[:keep]
+            self._pos -= keep
+            if self._value is not None:
+                self._value.start -= keep
+                self._value.scan -= keep
+
+
+def stream_items(chunks: Iterable[bytes], path: Path = ('response', 'posts'),
+                 loads: Callable[[bytes], Any] = json.loads) -> Iterator[Any]:
+    """
+    Yields the elements of an array in an API response as they arrive
+
+    :param chunks: an iterable of bytes, e.g. response.iter_content()
+    :param path: the keys leading to the array
+    :param loads: a function decoding a single element from bytes
+
+    :returns: an iterator of the decoded elements; raises TumblrRequestError
+              if the response's meta reports an error
+    """
+    items = path + ('*',)
+    stream = JsonStream({('meta',), items}, loads)
+
+    def found(values):
+        for value_path, value in values:
+            if value_path == items:
+                yield value
+            elif value.get('status') != 200:
+                raise TumblrRequestError(TumblrError(value.get('status'), value.get('msg')))
+
+    for chunk in chunks:
+        yield from found(stream.feed(chunk))
+    yield from found(stream.close())
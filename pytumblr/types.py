@@ -1,15 +1,39 @@
 from collections import UserList
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Type
 
 DATE_FORMAT = '%Y-%m-%d %H:%M:%S %Z'
 
 
+_EPOCH = datetime(1970, 1, 1)
+
+
 def parse_date(tumblr_date: str) -> datetime:
+    """
+    :param tumblr_date: a string like '2020-01-01 00:00:00 GMT'
+
+    :returns: a naive datetime in UTC, like strptime with DATE_FORMAT
+    """
+    if tumblr_date.endswith(' GMT'):
+        # the only zone the API uses; fromisoformat is far cheaper than strptime
+        try:
+            return datetime.fromisoformat(tumblr_date[:-4])
+        except ValueError:
+            pass
     return datetime.strptime(tumblr_date, DATE_FORMAT)
 
 
+def date_from_timestamp(timestamp: int) -> datetime:
+    """
+    :param timestamp: an int, seconds since the epoch
+
+    :returns: the same naive UTC datetime parse_date returns for the
+              matching date string
+    """
+    return _EPOCH + timedelta(seconds=timestamp)
+
+
 @dataclass
 class Link:
     """
@@ -64,6 +88,14 @@ class BlogInfo(BaseBlog):
     is_blocked_from_primary: bool
 
 
+@dataclass
+class BlogInfoResponse:
+    blog: BlogInfo
+
+    def __post_init__(self):
+        self.blog = BlogInfo(**self.blog)
+
+
 @dataclass
 class UserBlogInfo:
     url: str
@@ -87,6 +119,14 @@ class UserInfo:
         self.blogs = [UserBlogInfo(**blog) for blog in self.blogs]
 
 
+@dataclass
+class UserInfoResponse:
+    user: UserInfo
+
+    def __post_init__(self):
+        self.user = UserInfo(**self.user)
+
+
 @dataclass
 class Avatar:
     avatar_url: str
@@ -114,12 +154,23 @@ class Post:
     liked: Optional[bool] = None
     state: Optional[str] = None
     is_blocks_post_format: Optional[bool] = None
+    # only present on liked posts
+    liked_timestamp: Optional[int] = None
 
     def __new__(cls, *args, **kwargs):
-        if 'blog_name' in kwargs and 'blog' not in kwargs:
-            return DashboardPost(*args, **kwargs)
+        if cls is Post:
+            cls = Post._resolve(kwargs)
+        return super().__new__(cls)
+
+    @staticmethod
+    def _resolve(data: Dict[str, Any]) -> Type['Post']:
+        """
+        :returns: the Post subclass for a post's JSON
+        """
+        if 'blog_name' in data and 'blog' not in data:
+            return DashboardPost
         else:
-            return POST_CLASSES[kwargs['type']](*args, **kwargs)
+            return POST_CLASSES.get(data['type'], Post)
 
     def __eq__(self, other):
         return self.id == other.id
@@ -128,8 +179,23 @@ class Post:
         return hash(self.id)
 
     def __post_init__(self):
-        self.date = parse_date(self.date)
-        self.blog = BlogInfo(**self.blog)
+        self.date = post_date(self.timestamp, self.date)
+        if isinstance(self.blog, dict):
+            self.blog = BlogInfo(**self.blog)
+
+
+def post_date(timestamp: Optional[int], date) -> Optional[datetime]:
+    """
+    :returns: a post's date, parsed from its date string, or derived from
+              its numeric timestamp when it only has that
+    """
+    # the string first: parse_date's fromisoformat path is about twice as
+    # fast as date_from_timestamp (see benchmarks/bench_dates.py)
+    if isinstance(date, str):
+        return parse_date(date)
+    if date is None and isinstance(timestamp, int):
+        return date_from_timestamp(timestamp)
+    return date
 
 
 @dataclass
@@ -193,6 +259,7 @@ class LegacyPhotoPost(Post):
     photos: List[Photo] = field(default_factory=list)
 
     def __post_init__(self):
+        super().__post_init__()
         self.photos = [Photo(**photo) for photo in self.photos]
 
 
@@ -214,6 +281,7 @@ class LegacyLinkPost(Post):
     photos: List[VerbosePhoto] = field(default_factory=list)
 
     def __post_init__(self):
+        super().__post_init__()
         self.photos = [VerbosePhoto(**photo) for photo in self.photos]
 
 
@@ -231,6 +299,7 @@ class LegacyChatPost(Post):
     dialogue: List[ChatLine] = field(default_factory=list)
 
     def __post_init__(self):
+        super().__post_init__()
         self.dialogue = [ChatLine(**line) for line in self.dialogue]
 
 
@@ -256,7 +325,7 @@ class VideoPlayer:
 @dataclass
 class LegacyVideoPost(Post):
     caption: Optional[str] = None
-    player: List[Any] = field(default_factory=[])
+    player: List[Any] = field(default_factory=list)
 
 
 @dataclass
@@ -269,6 +338,7 @@ class LegacyAnswerPost(Post):
 
 # a type -> class dict
 POST_CLASSES: Dict[str, Type] = {
+    'text': LegacyTextPost,
     'photo': LegacyPhotoPost,
     'quote': LegacyQuotePost,
     'link': LegacyLinkPost,
@@ -338,6 +408,7 @@ class Posts:
 @dataclass
 class BlogPosts(Posts):
     blog: BlogInfo
+    total_posts: Optional[int] = None
 
     def __post_init__(self):
         self.blog = BlogInfo(**self.blog)
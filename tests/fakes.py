@@ -0,0 +1,31 @@
+import json
+
+import mock
+
+
+class FakeClock:
+    """
+    A clock that only moves when a test moves it, or sleeps on it
+    """
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def response(status=200, body=None, headers=None):
+    """
+    :returns: a mock requests.Response with the API's JSON envelope, whose
+              `response` is `body`, or an empty list
+    """
+    mp = mock.MagicMock()
+    mp.status_code = status
+    mp.headers = headers or {}
+    mp.content = json.dumps({"meta": {"status": status, "msg": "msg"},
+                             "response": [] if body is None else body}).encode()
+    return mp
@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+import mock
+
+import pytumblr
+from pytumblr.bulk import Journal, Operation
+
+from fakes import response
+
+
+class BulkWriterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = pytumblr.TumblrRestClient('consumer_key')
+        self.dir = tempfile.TemporaryDirectory()
+        self.journal = os.path.join(self.dir.name, 'journal.jsonl')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    @mock.patch('requests.Session.post')
+    def test_results_in_order(self, mock_post):
+        def post(url, **kwargs):
+            return response(404 if 'unfollow' in url else 200)
+        mock_post.side_effect = post
+
+        results = (self.client.bulk()
+                   .like(1, 'a').follow('staff').unfollow('david').like(2, 'b')
+                   .execute(workers=3))
+        assert [result.operation.method for result in results] == ['like', 'follow', 'unfollow', 'like']
+        assert [result.ok for result in results] == [True, True, False, True]
+        assert results[2].response[1].status == 404
+        assert mock_post.call_count == 4
+
+    @mock.patch('requests.Session.post')
+    def test_exceptions_are_kept(self, mock_post):
+        mock_post.side_effect = [response(), ConnectionError('reset')]
+
+        results = self.client.bulk().like(1, 'a').like(2, 'b').execute(workers=1)
+        assert results[0].ok
+        assert not results[1].ok and isinstance(results[1].error, ConnectionError)
+
+    @mock.patch('requests.Session.post')
+    def test_journal_resumes(self, mock_post):
+        mock_post.side_effect = [response(), response(500), response()]
+
+        def batch():
+            return self.client.bulk(self.journal).like(1, 'a').like(2, 'b').follow('staff')
+
+        first = batch().execute(workers=1)
+        assert [result.ok for result in first] == [True, False, True]
+
+        mock_post.side_effect = [response()]
+        second = batch().execute(workers=1)
+        assert [result.skipped for result in second] == [True, False, True]
+        assert all(result.ok for result in second)
+        assert mock_post.call_count == 4
+        assert len(Journal(self.journal).completed()) == 3
+
+    @mock.patch('requests.Session.post')
+    def test_journal_resumes_repeated_writes(self, mock_post):
+        mock_post.side_effect = [response(201), response(500)]
+
+        def batch():
+            return self.client.bulk(self.journal).reblog('mine', id=1, reblog_key='a').reblog('mine', id=1, reblog_key='a')
+
+        first = batch().execute(workers=1)
+        assert [result.ok for result in first] == [True, False]
+
+        mock_post.side_effect = [response(201)]
+        second = batch().execute(workers=1)
+        assert [result.skipped for result in second] == [True, False]
+        assert mock_post.call_count == 3
+        assert len(Journal(self.journal).completed()) == 2
+
+    def test_truncated_journal(self):
+        with open(self.journal, 'w') as f:
+            f.write(json.dumps({'key': Operation('follow', ('staff.tumblr.com',)).key, 'ok': True}) + '\n')
+            f.write('{"key": "[\\"like\\"')
+        assert Journal(self.journal).completed() == {Operation('follow', ('staff.tumblr.com',)).key}
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            self.client.bulk().add('explode')
+
+    @mock.patch('requests.Session.post')
+    def test_concurrent(self, mock_post):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def post(url, **kwargs):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            threading.Event().wait(0.01)
+            with lock:
+                running.pop()
+            return response()
+        mock_post.side_effect = post
+
+        writer = self.client.bulk()
+        for i in range(12):
+            writer.like(i, 'key')
+        assert all(result.ok for result in writer.execute(workers=4))
+        assert 1 < max(peak) <= 4
+
+
+if __name__ == "__main__":
+    unittest.main()
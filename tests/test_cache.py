@@ -0,0 +1,145 @@
+import os
+import tempfile
+import unittest
+
+import mock
+
+import pytumblr
+from pytumblr.cache import ResponseCache, MemoryCache, SqliteCache, ValidatorStore
+
+from fakes import FakeClock, response
+
+
+class MemoryCacheTest(unittest.TestCase):
+
+    def test_expiry(self):
+        clock = FakeClock(1000.0)
+        cache = MemoryCache(clock=clock)
+        cache.set('a', 1, 10)
+        assert cache.get('a') == 1
+        clock.now += 10
+        assert cache.get('a') is None
+
+    def test_lru_eviction(self):
+        cache = MemoryCache(maxsize=2)
+        cache.set('a', 1, 60)
+        cache.set('b', 2, 60)
+        cache.get('a')
+        cache.set('c', 3, 60)
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert len(cache) == 2
+
+
+class SqliteCacheTest(unittest.TestCase):
+
+    def test_shared_between_instances(self):
+        clock = FakeClock(1000.0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache.db')
+            SqliteCache(path, clock=clock).set('a', {'posts': [1, 2]}, 10)
+            other = SqliteCache(path, clock=clock)
+            assert other.get('a') == {'posts': [1, 2]}
+            clock.now += 10
+            assert other.get('a') is None
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def test_key_ignores_param_order(self):
+        assert ResponseCache.key('/u', {'a': 1, 'b': 2}) == ResponseCache.key('/u', {'b': 2, 'a': 1})
+
+    def test_ttl_per_endpoint(self):
+        cache = ResponseCache(ttls={'/blog/{blogname}/avatar': 60, '/blog/{blogname}/avatar/512': 5})
+        assert cache.ttl('/blog/staff.tumblr.com/avatar/64') == 60
+        assert cache.ttl('/blog/staff.tumblr.com/avatar/512') == 5
+        assert cache.ttl('/user/dashboard') == 0
+
+    def test_owner_listings_not_cached_by_default(self):
+        cache = ResponseCache()
+        assert cache.ttl('/blog/staff.tumblr.com/posts/photo') == 60
+        assert cache.ttl('/blog/staff.tumblr.com/posts/queue') == 0
+        assert cache.ttl('/blog/staff.tumblr.com/posts/draft') == 0
+        assert cache.ttl('/blog/staff.tumblr.com/posts/submission') == 0
+
+    @mock.patch('requests.Session.get')
+    def test_client_serves_hits(self, mock_get):
+        cache = ResponseCache()
+        client = pytumblr.TumblrRestClient('key', cache=cache)
+        mock_get.return_value = response(body={'avatar_url': 'a.png'})
+
+        assert client.avatar('staff').avatar_url == 'a.png'
+        assert client.avatar('staff').avatar_url == 'a.png'
+        assert mock_get.call_count == 1
+        assert cache.stats() == {'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+
+    @mock.patch('requests.Session.get')
+    def test_shared_between_users(self, mock_get):
+        cache = ResponseCache()
+        mock_get.return_value = response()
+        clients = [pytumblr.TumblrRestClient('key', 'secret', token, 'token_secret', cache=cache, api_key_only=False)
+                   for token in ('alice', 'bob', 'alice')]
+        clients += [pytumblr.TumblrRestClient('key', 'secret', token, 'token_secret', cache=cache, api_key_only=True)
+                    for token in ('alice', 'bob')]
+
+        for client in clients:
+            client.send_api_request('get', '/blog/staff.tumblr.com/posts', {}, None, True)
+        # alice and bob signed, then one anonymous request
+        assert mock_get.call_count == 3
+        assert cache.stats()['hits'] == 2
+
+    @mock.patch('requests.Session.get')
+    def test_uncached_endpoints(self, mock_get):
+        client = pytumblr.TumblrRestClient('key', cache=ResponseCache())
+        mock_get.return_value = response()
+
+        client.send_api_request('get', '/user/info')
+        client.send_api_request('get', '/user/info')
+        assert mock_get.call_count == 2
+
+
+def validated_response(status, body=None, headers=None):
+    mp = response(status, body, headers)
+    if status == 304:
+        mp.content = b'<html></html>'
+    return mp
+
+
+class ConditionalRequestTest(unittest.TestCase):
+
+    @mock.patch('requests.Session.get')
+    def test_not_modified(self, mock_get):
+        validators = ValidatorStore()
+        client = pytumblr.TumblrRestClient('key', validators=validators)
+        mock_get.side_effect = [validated_response(200, {'avatar_url': 'a.png'}, {'ETag': '"v1"'}),
+                                validated_response(304)]
+
+        first = client.avatar('staff')
+        second = client.avatar('staff')
+        assert second is first
+        assert mock_get.call_args[1]['headers']['If-None-Match'] == '"v1"'
+        assert validators.not_modified == 1
+
+    @mock.patch('requests.Session.get')
+    def test_changed(self, mock_get):
+        client = pytumblr.TumblrRestClient('key', validators=ValidatorStore())
+        mock_get.side_effect = [validated_response(200, {'avatar_url': 'a.png'}, {'Last-Modified': 'yesterday'}),
+                                validated_response(200, {'avatar_url': 'b.png'}, {'Last-Modified': 'today'}),
+                                validated_response(304)]
+
+        assert client.avatar('staff').avatar_url == 'a.png'
+        assert client.avatar('staff').avatar_url == 'b.png'
+        assert mock_get.call_args[1]['headers']['If-Modified-Since'] == 'yesterday'
+        assert client.avatar('staff').avatar_url == 'b.png'
+        assert mock_get.call_args[1]['headers']['If-Modified-Since'] == 'today'
+
+    def test_bounded(self):
+        validators = ValidatorStore(maxsize=1)
+        validators.store('a', {'ETag': '1'}, {})
+        validators.store('b', {'ETag': '2'}, {})
+        assert validators.get('a') is None
+        assert validators.get('b').etag == '2'
+
+
+if __name__ == "__main__":
+    unittest.main()
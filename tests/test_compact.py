@@ -0,0 +1,52 @@
+import json
+import unittest
+
+import mock
+
+import pytumblr
+from pytumblr import compact, npf, types
+
+from test_lazy import photo_post
+
+
+class CompactTest(unittest.TestCase):
+
+    def test_no_instance_dict(self):
+        posts = compact.build(types.Posts, {"posts": [photo_post(1)]})
+        post = posts.posts[0]
+        for obj in (posts, post, post.blog, post.photos[0], post.photos[0].alt_sizes[0]):
+            assert not hasattr(obj, '__dict__'), obj
+
+    def test_dispatch(self):
+        post = compact.Post(**{key: value for key, value in photo_post(1).items() if key != 'note_count'})
+        assert type(post) is compact.LegacyPhotoPost
+        assert isinstance(post, compact.Post)
+        assert post.photos[0].alt_sizes[0].url == 'a.jpg'
+
+        block = compact.ContentBlock(type='text', text='hi')
+        assert type(block) is compact.TextBlock
+        assert type(compact.build(npf.ContentBlock, {"type": "image/png", "media": []})) is compact.ImageBlock
+
+    def test_registered_post_classes_are_used(self):
+        class LegacyTestPost(types.Post):
+            pass
+
+        with mock.patch.dict(types.POST_CLASSES, {'test': LegacyTestPost}):
+            post = compact.build(types.Post, dict(photo_post(1), type='test'))
+        assert type(post) is compact.mirror(LegacyTestPost)
+        assert not hasattr(post, '__dict__')
+
+    @mock.patch('requests.Session.get')
+    def test_compact_client(self, mock_get):
+        mp = mock.MagicMock()
+        mp.content = json.dumps({"meta": {"status": 200, "msg": "OK"}, "response": {"posts": [photo_post(1)]}}).encode()
+        mock_get.return_value = mp
+
+        client = pytumblr.TumblrRestClient('key', compact=True)
+        posts = client.tagged('gif')
+        assert type(posts[0]) is compact.LegacyPhotoPost
+        assert posts[0].blog.name == 'staff'
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import dataclasses
+import unittest
+from datetime import datetime
+
+import mock
+
+from pytumblr import decode, npf, types
+
+from test_lazy import BLOG, photo_post
+
+
+def text_post(id, **fields):
+    return dict({"id": id, "type": "text", "blog_name": "staff", "post_url": "https://staff.tumblr.com/post/1",
+                 "timestamp": 1577836800, "date": "2020-01-01 00:00:00 GMT", "format": "html",
+                 "reblog_key": "abc", "tags": [], "total_posts": 10, "blog": BLOG, "body": "hi"}, **fields)
+
+
+NEUE_POST = {
+    "id": "1", "tumblelog_uuid": "t:1",
+    "content": [{"type": "text", "text": "hello"},
+                {"type": "image/png", "media": [{"type": "image/png", "url": "a.png", "width": 10}]}],
+    "layout": [{"type": "rows", "rows": [[0, 1]]}],
+    "trail": [{"content": [{"type": "text", "text": "earlier"}], "layout": [],
+               "broken_blog": {"name": "gone", "avatar": {"avatar_url": "g.png"}}}],
+}
+
+
+class DecodeTest(unittest.TestCase):
+
+    def test_matches_constructors(self):
+        page = {"posts": [text_post(1), dict(photo_post(2))]}
+        del page["posts"][1]["note_count"]
+        decoded = decode.decode(types.Posts, page)
+        built = types.Posts(**page)
+        for mine, theirs in zip(decoded.posts, built.posts):
+            assert type(mine) is type(theirs)
+            assert dataclasses.asdict(mine) == dataclasses.asdict(theirs)
+        assert decoded.posts[0].date == datetime(2020, 1, 1)
+
+    def test_unknown_keys_are_ignored(self):
+        post = decode.decode(types.Post, text_post(1, note_count=3))
+        assert type(post) is types.LegacyTextPost
+        assert 'note_count' not in vars(post)
+
+    def test_missing_field(self):
+        data = text_post(1)
+        del data["reblog_key"]
+        with self.assertRaisesRegex(TypeError, "reblog_key"):
+            decode.decode(types.Post, data)
+
+    def test_npf(self):
+        post = decode.decode(npf.NeuePost, NEUE_POST)
+        assert [type(block) for block in post.content] == [npf.TextBlock, npf.ImageBlock]
+        assert post.content[1].media[0].width == 10
+        assert post.content[1].colors == {}
+        layout = post.layout[0]
+        assert type(layout) is npf.RowsLayout and layout.type == 'rows'
+        assert post.trail[0].broken_blog.avatar.avatar_url == 'g.png'
+        assert post.trail[0].post is None
+
+    def test_dispatch_follows_registered_classes(self):
+        @dataclasses.dataclass
+        class LegacyTestPost(types.Post):
+            extra: str = None
+
+        with mock.patch.dict(types.POST_CLASSES, {'test': LegacyTestPost}):
+            post = decode.decode(types.Post, text_post(1, type='test', extra='x'))
+        assert type(post) is LegacyTestPost
+        assert post.extra == 'x'
+
+    def test_source(self):
+        assert decode.source(types.ImageSize).startswith('def decode_ImageSize(data):')
+        assert decode.decoder(types.Post) is decode.decoder(types.Post)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+import mock
+
+import pytumblr
+from pytumblr.cache import ResponseCache
+from pytumblr.endpoints import ENDPOINTS, lookup
+from pytumblr.retry import RetryPolicy
+
+from fakes import response
+
+
+class EndpointTest(unittest.TestCase):
+
+    def test_url(self):
+        posts = ENDPOINTS['posts']
+        assert posts.url(blogname='staff.tumblr.com', type=None) == '/blog/staff.tumblr.com/posts'
+        assert posts.url(blogname='staff.tumblr.com', type='photo') == '/blog/staff.tumblr.com/posts/photo'
+        assert ENDPOINTS['avatar'].url(blogname='staff', size=64) == '/blog/staff/avatar/64'
+
+    def test_lookup(self):
+        assert lookup('GET', '/blog/staff.tumblr.com/posts?limit=1') is ENDPOINTS['posts']
+        assert lookup('get', '/blog/staff/posts/photo') is ENDPOINTS['posts']
+        assert lookup('get', '/blog/staff/posts/queue') is ENDPOINTS['queue']
+        assert lookup('post', '/blog/staff/post') is ENDPOINTS['create_post']
+        assert lookup('post', '/blog/staff/post/reblog') is ENDPOINTS['reblog']
+        assert lookup('get', '/blog/staff/post') is None
+        assert lookup('get', '/unknown') is None
+
+    def test_schema_by_post_type(self):
+        create = ENDPOINTS['create_post']
+        assert 'body' in create.schema({'type': 'text'}).names
+        assert 'body' not in create.schema({'type': 'photo'}).names
+        assert create.schema({}).names == create.schema({'type': 'unknown'}).names
+        assert 'comment' in ENDPOINTS['reblog'].schema({'type': 'text'}).names
+
+    def test_every_read_has_a_client_method(self):
+        for endpoint in ENDPOINTS.values():
+            if endpoint.method == 'get':
+                assert callable(getattr(pytumblr.TumblrRestClient, endpoint.name))
+
+
+class RegistryDrivenClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = RetryPolicy(jitter=0, sleep=lambda seconds: None)
+
+    @mock.patch('requests.Session.post')
+    def test_idempotent_writes_use_the_write_policy(self, mock_post):
+        client = pytumblr.TumblrRestClient('key', write_retry_policy=self.policy)
+        mock_post.side_effect = [response(500), response(200)]
+
+        assert client.like(1, 'key')[0] is True
+        assert mock_post.call_count == 2
+
+    @mock.patch('requests.Session.post')
+    def test_posts_are_never_retried_implicitly(self, mock_post):
+        client = pytumblr.TumblrRestClient('key', write_retry_policy=self.policy)
+        mock_post.side_effect = [response(500), response(201)]
+
+        assert client.create_text('staff', body='hi')[0] is False
+        assert mock_post.call_count == 1
+
+    @mock.patch('requests.Session.get')
+    def test_uncacheable_endpoints(self, mock_get):
+        client = pytumblr.TumblrRestClient('key', cache=ResponseCache(default_ttl=60))
+        mock_get.return_value = response(200, {'posts': []})
+
+        client.dashboard()
+        client.dashboard()
+        assert mock_get.call_count == 2
+        # only the owner may read these, and they change as the owner acts
+        assert not [endpoint.name for endpoint in ENDPOINTS.values() if endpoint.owner and endpoint.cacheable]
+
+    @mock.patch('requests.Session.get')
+    def test_iterate_by_cursor(self, mock_get):
+        client = pytumblr.TumblrRestClient('key')
+        mock_get.side_effect = [response(200, {'users': [{'name': 'a', 'following': False, 'url': 'u',
+                                                          'updated': 1}], 'total_users': 1}),
+                                response(200, {'users': [], 'total_users': 1})]
+
+        assert [user.name for user in client.iter_followers('staff')] == ['a']
+        assert 'offset=1' in mock_get.call_args_list[1][0][0]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+
+import pytumblr
+from pytumblr import TumblrClientPool, Credentials
+from pytumblr.fakeserver import FakeTumblrServer
+from pytumblr.request import TumblrError
+
+
+class FakeTumblrServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeTumblrServer(posts_per_blog=60).start()
+        self.addCleanup(self.server.stop)
+
+    def client(self, *credentials, **options):
+        client = pytumblr.TumblrRestClient(*(credentials or ('key', 'secret', 'token', 'token_secret')),
+                                           host=self.server.url, **options)
+        self.addCleanup(client.close)
+        return client
+
+    def test_pages_over_one_connection(self):
+        client = self.client()
+        posts = list(client.iter_posts('staff', limit=20))
+
+        assert len(posts) == 60
+        assert len({post.id for post in posts}) == 60
+        assert [post.timestamp for post in posts] == sorted((post.timestamp for post in posts), reverse=True)
+        assert len({request.peer for request in self.server.received}) == 1
+
+    def test_same_content_for_the_same_seed(self):
+        client = self.client()
+        first = client.posts('staff', type='photo', limit=5)
+        assert first.blog.name == 'staff'
+        assert {post.type for post in first.posts} == {'photo'}
+
+        with FakeTumblrServer(posts_per_blog=60) as other:
+            again = pytumblr.TumblrRestClient('key', host=other.url, api_key_only=True)
+            assert again.posts('staff', type='photo', limit=5) == first
+            again.close()
+
+    def test_stream_matches_the_page(self):
+        client = self.client()
+        assert list(client.stream_posts('staff', limit=20)) == client.posts('staff', limit=20).posts
+
+    def test_multipart_upload(self):
+        client = self.client()
+        status = client.create_photo('staff', data=b'\x89PNG' * 10000, caption='hi')
+
+        assert status[0] is True
+        request = self.server.received[-1]
+        assert request.endpoint == 'create_post' and request.status == 201
+        assert request.headers['Content-Type'].startswith('multipart/form-data')
+        assert request.body_size > 40000
+        assert request.params == {'caption': ['hi'], 'type': ['photo']}
+
+    def test_api_key_reads_and_auth(self):
+        client = self.client('key', api_key_only=True)
+        assert client.blog_info('staff').blog.name == 'staff'
+        assert self.server.received[-1].params['api_key'] == ['key']
+        assert 'Authorization' not in self.server.received[-1].headers
+        assert self.client().info().user.blogs[0].primary
+
+        # no token to sign it with
+        error = client.dashboard()
+        assert isinstance(error, TumblrError) and error.status == 401
+
+    def test_conditional_requests(self):
+        client = self.client(validators=pytumblr.ValidatorStore(), coalesce=False)
+        assert client.avatar('staff') == client.avatar('staff')
+        assert [request.status for request in self.server.received] == [200, 304]
+
+
+class InjectedFailuresTest(unittest.TestCase):
+
+    def serve(self, **options):
+        server = FakeTumblrServer(**options).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def test_server_errors_are_retried(self):
+        server = self.serve(error_rate=1.0)
+        client = pytumblr.TumblrRestClient('key', host=server.url,
+                                           retry_policy=pytumblr.RetryPolicy(max_attempts=3, backoff=0))
+        error = client.avatar('staff')
+        client.close()
+
+        assert isinstance(error, TumblrError) and error.status == 503
+        assert len(server.received) == 3
+
+    def test_quota_moves_the_pool_on(self):
+        server = self.serve(quota=2, retry_after=60)
+        with TumblrClientPool([Credentials('key1'), Credentials('key2')], host=server.url, retry_policy=None) as pool:
+            for _ in range(4):
+                assert pool.avatar('staff').avatar_url
+
+        assert server.used == {'key1': 2, 'key2': 2}
+        assert pool.rate_limiter.quota_remaining('key1') == 0
+
+        with TumblrClientPool([Credentials('key1'), Credentials('key2')], host=server.url, retry_policy=None) as pool:
+            error = pool.avatar('staff')
+        assert isinstance(error, TumblrError) and error.status == 429
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import unittest
+from urllib.parse import parse_qs, urlsplit
+
+import mock
+
+import pytumblr
+from pytumblr.helpers import ParamSchema, validate_params
+
+
+def query(mock_get):
+    return parse_qs(urlsplit(mock_get.call_args[0][0]).query)
+
+
+def response(body):
+    mp = mock.MagicMock(status_code=200)
+    mp.content = json.dumps(body).encode()
+    return mp
+
+
+class ParamSchemaTest(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = ParamSchema.of('limit', 'offset', 'reblog_info', 'id', 'tag')
+
+    def test_valid(self):
+        self.schema.validate({'limit': 20, 'offset': 40, 'reblog_info': True, 'id': '123', 'tag': 'gif'})
+        self.schema.validate({})
+
+    def test_unknown_names(self):
+        with self.assertRaisesRegex(Exception, 'before,after are not allowed fields'):
+            self.schema.validate({'limit': 20, 'before': 1, 'after': 2})
+
+    def test_types(self):
+        with self.assertRaisesRegex(Exception, 'limit must be int, not str'):
+            self.schema.validate({'limit': '20'})
+        with self.assertRaisesRegex(Exception, 'reblog_info must be bool, not str'):
+            self.schema.validate({'reblog_info': 'true'})
+        with self.assertRaisesRegex(Exception, 'offset must be int, not bool'):
+            self.schema.validate({'offset': True})
+        with self.assertRaisesRegex(Exception, 'id must be int or str, not float'):
+            self.schema.validate({'id': 1.5})
+
+    def test_names_without_types(self):
+        ParamSchema.of('caption').validate({'caption': 7})
+
+    def test_mixed_data(self):
+        with self.assertRaisesRegex(Exception, "can't mix and match"):
+            ParamSchema.of('source', 'embed').validate({'source': 'a', 'embed': 'b'})
+
+    def test_add(self):
+        schema = self.schema + ParamSchema.of('before')
+        assert schema.names == {'limit', 'offset', 'reblog_info', 'id', 'tag', 'before'}
+        with self.assertRaises(Exception):
+            schema.validate({'before': 'yesterday'})
+
+    def test_validate_params_takes_a_list(self):
+        validate_params(['limit'], {'limit': 1})
+        with self.assertRaises(Exception):
+            validate_params(['limit'], {'limit': '1'})
+
+
+class ClientValidationTest(unittest.TestCase):
+
+    @mock.patch('requests.Session.get')
+    def test_checked(self, mock_get):
+        client = pytumblr.TumblrRestClient('consumer_key')
+        with self.assertRaisesRegex(Exception, 'limit must be int'):
+            client.posts('staff', limit='10')
+        with self.assertRaisesRegex(Exception, 'bogus are not allowed fields'):
+            client.dashboard(bogus=1)
+        mock_get.assert_not_called()
+
+    @mock.patch('requests.Session.get')
+    def test_switched_off(self, mock_get):
+        mock_get.return_value = response({'meta': {'status': 200, 'msg': 'OK'}, 'response': {}})
+        client = pytumblr.TumblrRestClient('consumer_key', validate=False)
+        client.send_api_request('get', '/blog/staff/posts', {'limit': '10', 'bogus': 1},
+                                pytumblr.ENDPOINTS['posts'].params, True)
+        assert query(mock_get) == {'limit': ['10'], 'bogus': ['1'], 'api_key': ['consumer_key']}
+
+    @mock.patch('requests.Session.get')
+    def test_api_key_not_listed(self, mock_get):
+        mock_get.return_value = response({'meta': {'status': 200, 'msg': 'OK'},
+                                          'response': {'liked_posts': [], 'liked_count': 0}})
+        client = pytumblr.TumblrRestClient('consumer_key')
+        valid = ['limit']
+        client.send_api_request('get', '/blog/staff/likes', {'limit': 1}, valid, True)
+        # the caller's list isn't touched
+        assert valid == ['limit']
+        assert query(mock_get)['api_key'] == ['consumer_key']
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import json
+import unittest
+
+import pytumblr
+from pytumblr import instrument
+from pytumblr.fakeserver import FakeTumblrServer
+from pytumblr.instrument import Histogram, LogSink, MetricsRegistry, RequestEvent
+
+
+class InstrumentTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeTumblrServer().start()
+        self.addCleanup(self.server.stop)
+        self.events = []
+
+    def client(self, **options):
+        client = pytumblr.TumblrRestClient('key', 'secret', 'token', 'token_secret', host=self.server.url,
+                                           hooks=[self.events.append], **options)
+        self.addCleanup(client.close)
+        return client
+
+    def test_phases_of_a_typed_read(self):
+        client = self.client()
+        client.posts('staff', limit=20)
+        client.posts('staff', limit=20)
+
+        first, second = self.events
+        assert first.endpoint == 'posts' and first.method == 'get' and first.status == 200
+        assert first.bytes > 10000 and first.retries == 0 and first.error is None
+        assert set(first.timings) == set(instrument.PHASES)
+        # the connection is reused
+        assert set(second.timings) == set(instrument.PHASES) - {instrument.CONNECT}
+        assert first.duration >= sum(first.timings.values())
+
+    def test_writes_and_unknown_paths(self):
+        client = self.client()
+        client.like(1, 'key')
+        client.send_api_request('get', '/blog/staff/notes', raw=True)
+
+        like, notes = self.events
+        assert (like.endpoint, like.method, like.status) == ('like', 'post', 200)
+        assert instrument.BUILD not in like.timings
+        assert (notes.endpoint, notes.status) == ('/blog/{blogname}/notes', 404)
+
+    def test_retries_are_counted(self):
+        self.server.error_rate = 1.0
+        client = self.client(retry_policy=pytumblr.RetryPolicy(max_attempts=3, backoff=0))
+        client.avatar('staff')
+
+        event, = self.events
+        assert event.status == 503 and event.retries == 2
+
+    def test_cached_calls(self):
+        client = self.client(cache=pytumblr.ResponseCache(default_ttl=60))
+        client.blog_info('staff')
+        client.blog_info('staff')
+
+        assert len(self.events) == 2 and self.events[1].status == 200
+        assert instrument.TTFB not in self.events[1].timings
+        assert len(self.server.received) == 1
+
+    def test_no_hooks(self):
+        client = pytumblr.TumblrRestClient('key', host=self.server.url)
+        self.addCleanup(client.close)
+        with instrument.tracing(client.request.hooks, 'get', '/user/info') as trace:
+            assert trace is None
+        assert client.blog_info('staff').blog.name == 'staff'
+
+
+class MetricsTest(unittest.TestCase):
+
+    def test_histogram_quantiles(self):
+        histogram = Histogram()
+        for value in [0.002] * 90 + [0.2] * 9 + [45.0]:
+            histogram.observe(value)
+
+        assert histogram.count == 100 and histogram.max == 45.0
+        assert histogram.quantile(0.5) == 0.0025
+        assert histogram.quantile(0.95) == 0.25
+        assert histogram.quantile(1.0) == 45.0
+
+    def test_registry(self):
+        metrics = MetricsRegistry()
+        metrics(RequestEvent('get', 'posts', 200, 1000, 0, {'decode': 0.001}, 0.05))
+        metrics(RequestEvent('get', 'posts', 503, 50, 2, {'decode': 0.0001}, 0.5))
+        metrics(RequestEvent('get', 'dashboard', 200, 1000, 0, {'decode': 0.01}, 0.01))
+
+        assert metrics.counter('requests', endpoint='posts', status=200) == 1
+        assert metrics.counter('retries', endpoint='posts') == 2
+        assert metrics.histogram('phase', endpoint='posts', phase='decode').count == 2
+        assert [endpoint for endpoint, _ in metrics.slowest()] == ['posts', 'dashboard']
+        assert [endpoint for endpoint, _ in metrics.slowest('decode')] == ['dashboard', 'posts']
+        assert json.loads(json.dumps(metrics.snapshot()))['counters']
+
+    def test_log_sink(self):
+        sink = LogSink(min_duration=0.1)
+        with self.assertLogs('pytumblr.requests') as logs:
+            sink(RequestEvent('get', 'posts', 200, duration=0.01))
+            sink(RequestEvent('get', 'posts', 200, duration=0.2, timings={'ttfb': 0.15}))
+            sink(RequestEvent('get', 'dashboard', 429, duration=0.01))
+
+        records = [json.loads(record.getMessage()) for record in logs.records]
+        assert [(record['endpoint'], record['status']) for record in records] == [('posts', 200), ('dashboard', 429)]
+        assert records[0]['timings'] == {'ttfb': 0.15}
+        assert logs.records[1].tumblr['status'] == 429
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import json
+import unittest
+from datetime import datetime
+
+import mock
+
+import pytumblr
+from pytumblr import lazy, npf, types
+
+BLOG = {"name": "staff", "updated": 1, "title": "Staff", "description": "", "posts": 10, "ask": False,
+        "ask_anon": False, "likes": 0, "is_blocked_from_primary": False}
+
+
+def photo_post(id):
+    return {"id": id, "type": "photo", "blog_name": "staff", "post_url": "https://staff.tumblr.com/post/1",
+            "timestamp": 1577836800, "date": "2020-01-01 00:00:00 GMT", "format": "html",
+            "reblog_key": "abc", "tags": ["a"], "total_posts": 10, "blog": BLOG, "note_count": 5,
+            "photos": [{"caption": "", "alt_sizes": [{"width": 500, "height": 400, "url": "a.jpg"}]}]}
+
+
+class LazyViewTest(unittest.TestCase):
+
+    def test_dispatch_and_isinstance(self):
+        posts = lazy.view(types.Posts, {"posts": [photo_post(1)]})
+        post = posts.posts[0]
+        assert isinstance(posts, types.Posts)
+        assert isinstance(post, types.LegacyPhotoPost)
+        assert repr(post).startswith('LegacyPhotoPost(')
+
+    def test_fields_are_built_on_access(self):
+        post = lazy.view(types.Post, photo_post(1))
+        assert post.id == 1
+        assert 'blog' not in vars(post) and 'date' not in vars(post)
+
+        assert post.date == datetime(2020, 1, 1)
+        assert isinstance(post.blog, types.BlogInfo)
+        assert post.blog.name == 'staff'
+        assert post.photos[0].alt_sizes[0].url == 'a.jpg'
+        assert post.photos is post.photos
+
+    def test_defaults_and_missing(self):
+        post = lazy.view(types.Post, photo_post(1))
+        assert post.caption is None
+        del lazy.raw(post)['reblog_key']
+        with self.assertRaises(AttributeError):
+            post.reblog_key
+
+    def test_npf_dispatch(self):
+        block = lazy.view(npf.ContentBlock, {"type": "text", "text": "hi"})
+        assert isinstance(block, npf.TextBlock)
+        assert block.subtype == ''
+
+    @mock.patch('requests.Session.get')
+    def test_lazy_client(self, mock_get):
+        mp = mock.MagicMock()
+        mp.content = json.dumps({"meta": {"status": 200, "msg": "OK"},
+                                 "response": {"posts": [photo_post(1), photo_post(2)], "blog": BLOG}}).encode()
+        mock_get.return_value = mp
+
+        client = pytumblr.TumblrRestClient('key', lazy=True)
+        posts = client.posts('staff')
+        assert [post.id for post in posts.posts] == [1, 2]
+        assert posts.blog.title == 'Staff'
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import email.parser
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import mock
+
+import pytumblr
+from pytumblr.multipart import MultipartEncoder, Photoset
+
+
+def parse(encoder):
+    body = b''.join(bytes(chunk) for chunk in encoder)
+    message = email.parser.BytesParser().parsebytes(
+        b'Content-Type: ' + encoder.content_type.encode() + b'\r\n\r\n' + body)
+    return body, {part.get_param('name', header='content-disposition'): part for part in message.get_payload()}
+
+
+class MultipartEncoderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'cat.jpg')
+        with open(self.path, 'wb') as f:
+            f.write(b'\xff\xd8' + os.urandom(300000))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_body(self):
+        buffer = bytearray(b'pixels')
+        encoder = MultipartEncoder({'type': 'photo', 'tags': ['a', 'b'], 'caption': 'say "hi"'},
+                                   {'data[0]': self.path, 'data[1]': buffer, 'data[2]': io.BytesIO(b'xyz')},
+                                   chunk_size=4096)
+        body, parts = parse(encoder)
+        assert len(body) == len(encoder)
+        with open(self.path, 'rb') as f:
+            assert parts['data[0]'].get_payload(decode=True) == f.read()
+        assert parts['data[0]'].get_filename() == 'cat.jpg'
+        assert parts['data[0]'].get_content_type() == 'image/jpeg'
+        assert parts['data[1]'].get_payload(decode=True) == b'pixels'
+        assert parts['data[2]'].get_payload(decode=True) == b'xyz'
+        assert parts['type'].get_payload() == 'photo'
+        # the same body again, e.g. for a retry
+        assert b''.join(bytes(chunk) for chunk in encoder) == body
+
+    def test_bounded_chunks_without_copies(self):
+        buffer = bytes(10000)
+        encoder = MultipartEncoder({}, {'data': self.path, 'more': buffer}, chunk_size=1024)
+        chunks = list(encoder)
+        assert max(len(chunk) for chunk in chunks[1:-1]) <= 1024
+        views = [chunk for chunk in chunks if isinstance(chunk, memoryview)]
+        assert views and all(view.obj is buffer for view in views)
+
+    def test_files_are_closed(self):
+        encoder = MultipartEncoder({}, {'data': self.path}, chunk_size=1024)
+        assert not encoder._open
+        chunks = iter(encoder)
+        next(chunks)
+        next(chunks)
+        opened = list(encoder._open)
+        assert len(opened) == 1
+        encoder.close()
+        assert opened[0].closed
+
+        list(encoder)
+        assert not encoder._open
+
+    def test_progress(self):
+        progress = mock.Mock()
+        encoder = MultipartEncoder({'a': 'b'}, {'data': self.path}, progress=progress)
+        list(encoder)
+        sent = [call[0][0] for call in progress.call_args_list]
+        assert sent == sorted(sent)
+        progress.assert_called_with(len(encoder), len(encoder))
+
+    def test_unsupported_source(self):
+        with self.assertRaises(ValueError):
+            MultipartEncoder({}, {'data': 42})
+
+    @mock.patch('requests.Session.post')
+    def test_create_photo(self, mock_post):
+        mp = mock.MagicMock(status_code=201)
+        mp.content = json.dumps({"meta": {"status": 201, "msg": "Created"}, "response": {"id": 1}}).encode()
+        mock_post.return_value = mp
+        progress = mock.Mock()
+
+        client = pytumblr.TumblrRestClient('consumer_key')
+        client.create_photo('staff', data=[self.path, memoryview(b'png')], caption='two', progress=progress)
+
+        kwargs = mock_post.call_args[1]
+        encoder = kwargs['data']
+        assert isinstance(encoder, MultipartEncoder)
+        assert kwargs['headers']['Content-Type'] == encoder.content_type
+        assert kwargs['params'] == {'type': 'photo', 'caption': 'two'}
+        _, parts = parse(encoder)
+        assert sorted(parts) == ['caption', 'data[0]', 'data[1]', 'type']
+
+
+class PhotosetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def photo(self, name, size):
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'wb') as f:
+            f.truncate(size)
+        return path
+
+    def test_parts(self):
+        paths = [self.photo('{}.jpg'.format(i), 100 * (i + 1)) for i in range(10)]
+        photos = Photoset(paths)
+        assert len(photos) == 10
+        assert list(photos.parts) == ['data[{}]'.format(i) for i in range(10)]
+        assert photos.size == sum(100 * (i + 1) for i in range(10))
+
+    def test_limits(self):
+        with self.assertRaisesRegex(ValueError, 'big.jpg .*moving.gif'):
+            Photoset([self.photo('big.jpg', 21 * 2 ** 20), self.photo('ok.gif', 2 ** 20),
+                      self.photo('moving.gif', 11 * 2 ** 20)])
+        with self.assertRaisesRegex(ValueError, 'at most 10'):
+            Photoset([b'x'] * 11)
+        with self.assertRaises(FileNotFoundError):
+            Photoset([self.photo('a.jpg', 1), os.path.join(self.dir.name, 'missing.jpg')])
+
+    @mock.patch('requests.Session.post')
+    def test_rejected_before_sending(self, mock_post):
+        client = pytumblr.TumblrRestClient('consumer_key')
+        with self.assertRaises(ValueError):
+            client.create_photo('staff', data=[self.photo('a.jpg', 1), self.photo('b.jpg', 25 * 2 ** 20)])
+        mock_post.assert_not_called()
+
+    @mock.patch('requests.Session.post')
+    def test_create_photo(self, mock_post):
+        mp = mock.MagicMock(status_code=201)
+        mp.content = json.dumps({"meta": {"status": 201, "msg": "Created"}, "response": {"id": 1}}).encode()
+        mock_post.return_value = mp
+
+        client = pytumblr.TumblrRestClient('consumer_key')
+        client.create_photo('staff', data=Photoset([self.photo('a.jpg', 10), b'raw']))
+        _, parts = parse(mock_post.call_args[1]['data'])
+        assert parts['data[0]'].get_filename() == 'a.jpg'
+        assert parts['data[1]'].get_payload(decode=True) == b'raw'
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import re
+import unittest
+
+import mock
+import requests
+from requests_oauthlib import OAuth1
+
+import pytumblr
+from pytumblr.multipart import MultipartEncoder
+from pytumblr.oauth import OAuth1Signer
+
+from fakes import response
+
+
+def oauth_params(request):
+    header = request.headers['Authorization']
+    if isinstance(header, bytes):
+        header = header.decode('utf-8')
+    return dict(re.findall(r'(\w+)="([^"]*)"', header))
+
+
+class OAuth1SignerTest(unittest.TestCase):
+
+    def assert_signed_like_oauthlib(self, request, token='token', token_secret='token_secret'):
+        expected = request.copy()
+        OAuth1('key', client_secret='secret', resource_owner_key=token or None,
+               resource_owner_secret=token_secret or None, nonce='nonce', timestamp='1700000000')(expected)
+        OAuth1Signer('key', 'secret', token, token_secret, clock=lambda: 1700000000.5,
+                     nonce=lambda: 'nonce')(request)
+        assert oauth_params(request) == oauth_params(expected)
+        return request
+
+    def test_get(self):
+        url = 'https://api.tumblr.com/v2/blog/staff.tumblr.com/posts?limit=20&tag=a+b%26c&filter='
+        self.assert_signed_like_oauthlib(requests.Request('GET', url).prepare())
+
+    def test_form_body(self):
+        request = requests.Request('POST', 'https://api.tumblr.com/v2/user/like',
+                                   data='id=1&reblog_key=k%20y&tags=%C3%A9,x').prepare()
+        self.assert_signed_like_oauthlib(request)
+        assert request.headers['Content-Type'] == 'application/x-www-form-urlencoded'
+
+    def test_multipart_body_is_not_signed(self):
+        encoder = MultipartEncoder({'caption': 'hi'}, {'data': b'\x89PNG'}, boundary='b')
+        request = requests.Request('POST', 'https://api.tumblr.com/v2/blog/staff/post?type=photo',
+                                   data=encoder, headers=encoder.headers).prepare()
+        self.assert_signed_like_oauthlib(request)
+
+    def test_without_a_token(self):
+        request = requests.Request('GET', 'https://API.tumblr.com:443/v2/user/info').prepare()
+        self.assert_signed_like_oauthlib(request, '', '')
+        assert 'oauth_token' not in oauth_params(request)
+
+    def test_fresh_nonce_each_time(self):
+        signer = OAuth1Signer('key', 'secret', 'token', 'token_secret')
+        first, second = (oauth_params(signer(requests.Request('GET', 'https://api.tumblr.com/v2/user/info').prepare()))
+                         for _ in range(2))
+        assert first['oauth_nonce'] != second['oauth_nonce']
+        assert first['oauth_signature'] != second['oauth_signature']
+
+
+class ApiKeyOnlyTest(unittest.TestCase):
+
+    @mock.patch('requests.Session.get')
+    def test_api_key_reads_are_unsigned(self, mock_get):
+        mock_get.return_value = response()
+        client = pytumblr.TumblrRestClient('key', 'secret', 'token', 'token_secret', api_key_only=True)
+
+        client.send_api_request('get', '/blog/staff/info', needs_api_key=True)
+        assert mock_get.call_args[1]['auth'] is None
+        client.send_api_request('get', '/user/dashboard')
+        assert mock_get.call_args[1]['auth'] is client.request.oauth
+
+    @mock.patch('requests.Session.get')
+    def test_default(self, mock_get):
+        mock_get.return_value = response()
+        signed = pytumblr.TumblrRestClient('key', 'secret', 'token', 'token_secret')
+        signed.send_api_request('get', '/blog/staff/info', needs_api_key=True)
+        assert mock_get.call_args[1]['auth'] is signed.request.oauth
+
+        # without a token there's nothing OAuth would add
+        anonymous = pytumblr.TumblrRestClient('key', 'secret')
+        anonymous.send_api_request('get', '/blog/staff/info', needs_api_key=True)
+        assert mock_get.call_args[1]['auth'] is None
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+import mock
+
+from pytumblr import TumblrClientPool, Credentials
+from pytumblr.request import TumblrError
+
+from fakes import FakeClock, response
+
+
+AVATAR = {'avatar_url': 'a.png'}
+
+
+class TumblrClientPoolTest(unittest.TestCase):
+
+    def sent_with(self, mock_get, index=-1):
+        """
+        :returns: the consumer key a request was signed with
+        """
+        auth = mock_get.call_args_list[index][1]['auth']
+        return next(member.credentials.consumer_key for member in self.pool.members
+                    if member.client.request.oauth is auth)
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.pool = TumblrClientPool([Credentials('key1'), Credentials('key2'),
+                                      Credentials('key3', 'secret', 'token', 'token_secret', blogs=('mine',))],
+                                     clock=self.clock, retry_policy=None)
+
+    @mock.patch('requests.Session.get')
+    def test_most_quota_left(self, mock_get):
+        mock_get.return_value = response(body=AVATAR)
+        limiter = self.pool.rate_limiter
+        limiter.update('key1', 200, {'X-Ratelimit-Perhour-Remaining': '10'})
+        limiter.update('key2', 200, {'X-Ratelimit-Perhour-Remaining': '900'})
+        limiter.update('key3', 200, {'X-Ratelimit-Perhour-Remaining': '50'})
+
+        assert self.pool.avatar('staff').avatar_url == 'a.png'
+        assert self.sent_with(mock_get) == 'key2'
+
+    @mock.patch('requests.Session.get')
+    def test_throttled_keys_sit_out(self, mock_get):
+        mock_get.side_effect = [response(429), response(body=AVATAR)]
+
+        assert self.pool.avatar('staff').avatar_url == 'a.png'
+        assert self.sent_with(mock_get, 0) != self.sent_with(mock_get, 1)
+        assert len(self.pool.available()) == 2
+
+        self.clock.now += 61
+        assert len(self.pool.available()) == 3
+
+    @mock.patch('requests.Session.get')
+    def test_rejected_keys_sit_out_until_restored(self, mock_get):
+        mock_get.return_value = response(401)
+
+        error = self.pool.avatar('staff')
+        assert isinstance(error, TumblrError) and error.status == 401
+        assert mock_get.call_count == 3
+        assert self.pool.available() == []
+
+        self.pool.restore()
+        assert len(self.pool.available()) == 3
+
+    @mock.patch('requests.Session.post')
+    def test_writes_stick_to_the_owner(self, mock_post):
+        mock_post.return_value = response(201)
+
+        assert self.pool.create_text('mine', body='Hi')[0] is True
+        assert mock_post.call_args[1]['auth'] is self.pool.members[2].client.request.oauth
+        assert self.pool.client_for('mine.tumblr.com') is self.pool.members[2].client
+
+        with self.assertRaisesRegex(ValueError, 'None of the credentials own'):
+            self.pool.create_text('theirs', body='Hi')
+        with self.assertRaisesRegex(ValueError, 'queue needs the blogname'):
+            self.pool.queue(limit=5)
+
+    @mock.patch('requests.Session.post')
+    def test_user_calls_use_the_token(self, mock_post):
+        mock_post.return_value = response(200)
+
+        assert self.pool.like(1, 'key')[0] is True
+        assert mock_post.call_args[1]['auth'] is self.pool.members[2].client.request.oauth
+
+    def test_user_calls_need_a_token(self):
+        pool = TumblrClientPool([('key1',), {'consumer_key': 'key2'}])
+        with self.assertRaisesRegex(ValueError, 'needs credentials with an OAuth token'):
+            pool.dashboard()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import unittest
 from urllib.parse import parse_qs
@@ -5,12 +6,13 @@ from urllib.parse import parse_qs
 import mock
 
 import pytumblr
+from pytumblr import fakeserver
 
 
 def wrap_response(response_text):
     def inner(*args, **kwargs):
         mp = mock.MagicMock()
-        mp.json.return_value = json.loads(response_text)
+        mp.content = response_text.encode()
         return mp
     return inner
 
@@ -21,7 +23,7 @@ def wrap_response_storing_data(response_text, store):
         store.data = kwargs.get('data')
 
         mp = mock.MagicMock()
-        mp.json.return_value = json.loads(response_text)
+        mp.content = response_text.encode()
         return mp
     return inner
 
@@ -35,28 +37,28 @@ class TumblrRestClientTest(unittest.TestCase):
             credentials = json.loads(f.read())
         self.client = pytumblr.TumblrRestClient(credentials['consumer_key'], credentials['consumer_secret'], credentials['oauth_token'], credentials['oauth_token_secret'])
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_dashboard(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": {"posts": [] } }')
 
         response = self.client.dashboard()
         assert response['posts'] == []
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_posts(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": {"posts": [] } }')
 
         response = self.client.posts('codingjester.tumblr.com')
         assert response['posts'] == []
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_posts_with_type(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": {"posts": [] } }')
 
         response = self.client.posts('seejohnrun', 'photo')
         assert response['posts'] == []
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_posts_with_type_and_arg(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": {"posts": [] } }')
 
@@ -64,84 +66,84 @@ class TumblrRestClientTest(unittest.TestCase):
         response = self.client.posts('seejohnrun', 'photo', **args)
         assert response['posts'] == []
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_blogInfo(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": {"blog": {} } }')
 
         response = self.client.blog_info('codingjester.tumblr.com')
         assert response['blog'] == {}
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_avatar_with_301(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 301, "msg": "Moved Permanently"}, "response": {"avatar_url": "" } }')
 
         response = self.client.avatar('staff.tumblr.com')
         assert response['avatar_url'] == ''
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_avatar_with_302(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 302, "msg": "Found"}, "response": {"avatar_url": "" } }')
 
         response = self.client.avatar('staff.tumblr.com')
         assert response['avatar_url'] == ''
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_followers(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": {"users": [] } }')
 
         response = self.client.followers('codingjester.tumblr.com')
         assert response['users'] == []
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_blog_following(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": {"blogs": [], "total_blogs": 1}}')
 
         response = self.client.blog_following('pytblr.tumblr.com')
         assert response['blogs'] == []
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_blogLikes(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": {"liked_posts": [] } }')
 
         response = self.client.blog_likes('codingjester.tumblr.com')
         assert response['liked_posts'] == []
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_blogLikes_with_after(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": {"liked_posts": [] } }')
 
         response = self.client.blog_likes('codingjester.tumblr.com', after=1418684291)
         assert response['liked_posts'] == []
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_blogLikes_with_before(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": {"liked_posts": [] } }')
 
         response = self.client.blog_likes('codingjester.tumblr.com', before=1418684291)
         assert response['liked_posts'] == []
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_queue(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": {"posts": [] } }')
 
         response = self.client.queue('codingjester.tumblr.com')
         assert response['posts'] == []
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_drafts(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": {"posts": [] } }')
 
         response = self.client.drafts('codingjester.tumblr.com')
         assert response['posts'] == []
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_submissions(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": {"posts": [] } }')
 
         response = self.client.submission('codingjester.tumblr.com')
         assert response['posts'] == []
 
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_follow(self, mock_post):
         mock_post.side_effect = wrap_response_storing_data(
             '{"meta": {"status": 200, "msg": "OK"}, "response": []}',
@@ -152,7 +154,7 @@ class TumblrRestClientTest(unittest.TestCase):
 
         assert parse_qs(mock_post.data) == parse_qs('url=codingjester.tumblr.com')
 
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_unfollow(self, mock_post):
         mock_post.side_effect = wrap_response_storing_data(
             '{"meta": {"status": 200, "msg": "OK"}, "response": []}',
@@ -163,7 +165,7 @@ class TumblrRestClientTest(unittest.TestCase):
 
         assert parse_qs(mock_post.data) == parse_qs('url=codingjester.tumblr.com')
 
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_reblog(self, mock_post):
         mock_post.side_effect = wrap_response_storing_data(
             '{"meta": {"status": 200, "msg": "OK"}, "response": []}',
@@ -174,7 +176,7 @@ class TumblrRestClientTest(unittest.TestCase):
 
         assert parse_qs(mock_post.data) == parse_qs('state=coolguy&reblog_key=adsfsadf&id=123&tags=hello%2Cworld')
 
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_edit_post(self, mock_post):
         mock_post.side_effect = wrap_response_storing_data(
             '{"meta": {"status": 200, "msg": "OK"}, "response": []}',
@@ -185,7 +187,7 @@ class TumblrRestClientTest(unittest.TestCase):
 
         assert parse_qs(mock_post.data) == parse_qs('state=coolguy&id=123&tags=hello%2Cworld')
 
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_like(self, mock_post):
         mock_post.side_effect = wrap_response_storing_data(
             '{"meta": {"status": 200, "msg": "OK"}, "response": []}',
@@ -196,7 +198,7 @@ class TumblrRestClientTest(unittest.TestCase):
 
         assert parse_qs(mock_post.data) == parse_qs('id=123&reblog_key=adsfsadf')
 
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_unlike(self, mock_post):
         mock_post.side_effect = wrap_response_storing_data(
             '{"meta": {"status": 200, "msg": "OK"}, "response": []}',
@@ -207,56 +209,56 @@ class TumblrRestClientTest(unittest.TestCase):
 
         assert parse_qs(mock_post.data) == parse_qs('id=123&reblog_key=adsfsadf')
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_info(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": []}')
 
         response = self.client.info()
         assert response == []
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_likes(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": []}')
 
         response = self.client.likes()
         assert response == []
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_likes_with_after(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": []}')
 
         response = self.client.likes(after=1418684291)
         assert response == []
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_likes_with_before(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": []}')
 
         response = self.client.likes(before=1418684291)
         assert response == []
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_following(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": []}')
 
         response = self.client.following()
         assert response == []
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_tagged(self, mock_get):
         mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": []}')
 
         response = self.client.tagged('food')
         assert response == []
 
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_create_text(self, mock_post):
         mock_post.side_effect = wrap_response('{"meta": {"status": 201, "msg": "OK"}, "response": []}')
 
         response = self.client.create_text('codingjester.tumblr.com', body="Testing")
         assert response == []
 
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_create_link(self, mock_post):
         mock_post.side_effect = wrap_response_storing_data(
             '{"meta": {"status": 201, "msg": "OK"}, "response": []}',
@@ -267,7 +269,7 @@ class TumblrRestClientTest(unittest.TestCase):
 
         assert parse_qs(mock_post.data) == parse_qs('url=https%3A%2F%2Fgoogle.com&type=link&tags=omg%2Cnice')
 
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_no_tags(self, mock_post):
         mock_post.side_effect = wrap_response_storing_data(
             '{"meta": {"status": 201, "msg": "OK"}, "response": []}',
@@ -277,41 +279,242 @@ class TumblrRestClientTest(unittest.TestCase):
 
         assert parse_qs(mock_post.data) == parse_qs('type=link&tags=')
 
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_create_quote(self, mock_post):
         mock_post.side_effect = wrap_response('{"meta": {"status": 201, "msg": "OK"}, "response": []}')
 
         response = self.client.create_quote('codingjester.tumblr.com', quote="It's better to love and lost, than never have loved at all.")
         assert response == []
 
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_create_chat(self, mock_post):
         mock_post.side_effect = wrap_response('{"meta": {"status": 201, "msg": "OK"}, "response": []}')
 
         response = self.client.create_chat('codingjester.tumblr.com', conversation="JB: Testing is rad.\nJC: Hell yeah.")
         assert response == []
 
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_create_photo(self, mock_post):
         mock_post.side_effect = wrap_response('{"meta": {"status": 201, "msg": "OK"}, "response": []}')
 
         response = self.client.create_photo('codingjester.tumblr.com', source="https://media.tumblr.com/image.jpg")
         assert response == []
 
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_create_audio(self, mock_post):
         mock_post.side_effect = wrap_response('{"meta": {"status": 201, "msg": "OK"}, "response": []}')
 
         response = self.client.create_audio('codingjester.tumblr.com', external_url="https://media.tumblr.com/audio.mp3")
         assert response == []
 
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_create_video(self, mock_post):
         mock_post.side_effect = wrap_response('{"meta": {"status": 201, "msg": "OK"}, "response": []}')
 
         response = self.client.create_video('codingjester.tumblr.com', embed="blahblahembed")
         assert response == []
 
+    def test_session_pool(self):
+        client = pytumblr.TumblrRestClient('consumer_key', pool_maxsize=25, pool_block=True)
+        adapter = client.request.session.get_adapter('https://api.tumblr.com')
+        assert adapter._pool_maxsize == 25
+        assert adapter._pool_block
+
+    @mock.patch('requests.Session.close')
+    def test_context_manager_closes_session(self, mock_close):
+        with pytumblr.TumblrRestClient('consumer_key') as client:
+            assert client.request.session is not None
+        mock_close.assert_called_once_with()
+
+
+def followers_page(count):
+    users = [{"name": "blog{}".format(i), "following": False, "url": "https://blog{}.tumblr.com".format(i),
+              "updated": 0} for i in range(count)]
+    return json.dumps({"meta": {"status": 200, "msg": "OK"}, "response": {"total_users": 3, "users": users}})
+
+
+def posts_page(offset, limit, total):
+    posts = [fakeserver.post(1000 - number, 'text', blog_name='staff') for number in range(offset, min(offset + limit, total))]
+    return json.dumps({"meta": {"status": 200, "msg": "OK"},
+                       "response": {"blog": fakeserver.blog('staff'), "posts": posts, "total_posts": total}})
+
+
+class PaginationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = pytumblr.TumblrRestClient('consumer_key')
+
+    @mock.patch('requests.Session.get')
+    def test_iter_followers(self, mock_get):
+        pages = [followers_page(2), followers_page(1), followers_page(0)]
+        mock_get.side_effect = lambda *args, **kwargs: wrap_response(pages.pop(0))()
+
+        followers = list(self.client.iter_followers('codingjester', limit=2))
+        assert [follower.name for follower in followers] == ['blog0', 'blog1', 'blog0']
+        urls = [call[0][0] for call in mock_get.call_args_list]
+        assert 'offset=2' in urls[1]
+        assert 'offset=3' in urls[2]
+
+    @mock.patch('requests.Session.get')
+    def test_iter_followers_prefetch(self, mock_get):
+        pages = [followers_page(2), followers_page(0)]
+        mock_get.side_effect = lambda *args, **kwargs: wrap_response(pages.pop(0))()
+
+        followers = list(self.client.iter_followers('codingjester', prefetch=True))
+        assert len(followers) == 2
+
+    @mock.patch('requests.Session.get')
+    def test_iter_error(self, mock_get):
+        mock_get.side_effect = wrap_response('{"meta": {"status": 404, "msg": "Not Found"}, "response": []}')
+
+        with self.assertRaises(pytumblr.TumblrRequestError) as context:
+            list(self.client.iter_followers('codingjester'))
+        assert context.exception.error.status == 404
+
+    def test_fetch_offset_pages(self):
+        requested = []
+
+        def fetch(params):
+            requested.append(params['offset'])
+            return list(range(params['offset'], min(params['offset'] + params['limit'], 45)))
+
+        items = pytumblr.pagination.fetch_offset_pages(fetch, {'filter': 'text'}, 45, 10, workers=3)
+        assert items == list(range(45))
+        assert sorted(requested) == [0, 10, 20, 30, 40]
+
+    def test_fetch_offset_pages_error(self):
+        def fetch(params):
+            if params['offset'] == 20:
+                return pytumblr.TumblrError(500, 'Server Error')
+            return [params['offset']]
+
+        error = pytumblr.pagination.fetch_offset_pages(fetch, {}, 100, 10, workers=2)
+        assert error.status == 500
+
+    @mock.patch('requests.Session.get')
+    def test_fetch_all_posts(self, mock_get):
+        def get(url, *args, **kwargs):
+            query = parse_qs(url.split('?', 1)[1])
+            return wrap_response(posts_page(int(query['offset'][0]), int(query['limit'][0]), 45))()
+        mock_get.side_effect = get
+
+        posts = self.client.fetch_all_posts('staff', workers=3, limit=10)
+        assert [post.id for post in posts] == list(range(1000, 955, -1))
+        assert mock_get.call_count == 5
+
+    @mock.patch('requests.Session.get')
+    def test_blog_info(self, mock_get):
+        body = {"meta": {"status": 200, "msg": "OK"}, "response": {"blog": fakeserver.blog('staff')}}
+        mock_get.side_effect = wrap_response(json.dumps(body))
+
+        assert self.client.blog_info('staff').blog.name == 'staff'
+
+
+class AsyncTumblrRestClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = pytumblr.AsyncTumblrRestClient('consumer_key', concurrency=4)
+
+    def tearDown(self):
+        asyncio.run(self.client.close())
+
+    def test_iterator_closed_early(self):
+        closed = []
+
+        def items(*args, **kwargs):
+            try:
+                yield from range(10)
+            finally:
+                closed.append(True)
+        self.client.client.iter_posts = items
+
+        async def first():
+            posts = self.client.iter_posts('staff')
+            async for post in posts:
+                break
+            await posts.aclose()
+            return post
+
+        assert asyncio.run(first()) == 0
+        assert closed == [True]
+
+    def test_iterator_abandoned_until_close(self):
+        closed = []
+        errors = []
+
+        def items(*args, **kwargs):
+            try:
+                yield from range(10)
+            finally:
+                closed.append(True)
+
+        async def first():
+            asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+            async with pytumblr.AsyncTumblrRestClient('consumer_key') as client:
+                client.client.stream_posts = items
+                async for post in client.stream_posts('staff'):
+                    break
+            return post
+
+        assert asyncio.run(first()) == 0
+        assert closed == [True] and errors == []
+
+    @mock.patch('requests.Session.get')
+    def test_avatar(self, mock_get):
+        mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": {"avatar_url": "a.png"}}')
+
+        response = asyncio.run(self.client.avatar('staff'))
+        assert response == pytumblr.types.Avatar('a.png')
+
+    @mock.patch('requests.Session.post')
+    def test_like_gather(self, mock_post):
+        mock_post.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": []}')
+
+        async def like_all():
+            return await asyncio.gather(*[self.client.like(i, 'key') for i in range(10)])
+
+        responses = asyncio.run(like_all())
+        assert responses == [(True, [])] * 10
+        assert mock_post.call_count == 10
+
+
+class ResponseDecodingTest(unittest.TestCase):
+
+    @mock.patch('requests.Session.get')
+    def test_json_backend(self, mock_get):
+        mock_get.side_effect = wrap_response('{"meta": {"status": 200, "msg": "OK"}, "response": {"avatar_url": "a.png"}}')
+        loads = mock.Mock(side_effect=json.loads)
+
+        client = pytumblr.TumblrRestClient('consumer_key', json_loads=loads)
+        assert client.avatar('staff') == pytumblr.types.Avatar('a.png')
+        loads.assert_called_once()
+
+    def test_default_backend(self):
+        loads = pytumblr.request.default_json_loads()
+        assert loads(b'{"a": [1]}') == {"a": [1]}
+        with self.assertRaises(ValueError):
+            loads(b'<html>')
+
+    @mock.patch('requests.Session.get')
+    def test_raw(self, mock_get):
+        body = '{"meta": {"status": 404, "msg": "Not Found"}, "response": []}'
+        mock_get.side_effect = wrap_response(body)
+
+        client = pytumblr.TumblrRestClient('consumer_key', json_loads=mock.Mock())
+        response = client.send_api_request('get', '/blog/staff/info', raw=True)
+        assert (response.status, response.msg, response.content) == (404, 'Not Found', body.encode())
+        assert not response.ok
+        client.request.json_loads.assert_not_called()
+
+    @mock.patch('requests.Session.post')
+    def test_raw_without_meta(self, mock_post):
+        mp = mock.MagicMock(status_code=502, reason='Bad Gateway', content=b'<html></html>')
+        mock_post.return_value = mp
+
+        client = pytumblr.TumblrRestClient('consumer_key')
+        response = client.send_api_request('post', '/user/like', {'id': 1}, ['id'], raw=True)
+        assert (response.status, response.msg) == (502, 'Bad Gateway')
+
 
 if __name__ == "__main__":
     unittest.main()
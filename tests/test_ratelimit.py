@@ -0,0 +1,117 @@
+import unittest
+
+import mock
+
+import pytumblr
+from pytumblr.ratelimit import RateLimiter, Rate, TokenBucket, endpoint_class, READ, POST, WRITE, FAIL, SLEEP
+
+from fakes import FakeClock, response
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def limiter(self, **kwargs):
+        return RateLimiter(clock=self.clock, sleep=self.clock.sleep, **kwargs)
+
+    def test_endpoint_class(self):
+        assert endpoint_class('get', 'https://api.tumblr.com/v2/blog/a/posts') == READ
+        assert endpoint_class('post', 'https://api.tumblr.com/v2/blog/a/post') == POST
+        assert endpoint_class('post', 'https://api.tumblr.com/v2/blog/a/post/reblog') == POST
+        assert endpoint_class('post', 'https://api.tumblr.com/v2/user/like') == WRITE
+
+    def test_token_bucket_refills(self):
+        bucket = TokenBucket(Rate(2, 10), self.clock)
+        assert bucket.take() == 0
+        assert bucket.take() == 0
+        assert bucket.take() == 5
+        self.clock.now = 5
+        assert bucket.take() == 0
+
+    def test_fail_fast(self):
+        limiter = self.limiter(limits={READ: [Rate(1, 60)]}, mode=FAIL)
+        assert limiter.acquire('key', READ) == 0
+        assert limiter.acquire('key', READ) == 60
+        # other keys have their own buckets
+        assert limiter.acquire('other', READ) == 0
+
+    def test_sleep_until_allowed(self):
+        limiter = self.limiter(limits={READ: [Rate(1, 60)]}, mode=SLEEP)
+        limiter.acquire('key', READ)
+        assert limiter.acquire('key', READ) == 0
+        assert self.clock.now == 60
+
+    def test_key_limits(self):
+        limiter = self.limiter(limits={READ: [Rate(1, 60)]}, key_limits={'big': {READ: [Rate(100, 60)]}}, mode=FAIL)
+        assert all(limiter.acquire('big', READ) == 0 for _ in range(100))
+
+    def test_retry_after_pauses_key(self):
+        limiter = self.limiter(mode=FAIL)
+        assert limiter.update('key', 429, {'Retry-After': '30'}) == 30
+        assert limiter.acquire('key', WRITE) == 30
+
+    def test_exhausted_quota_headers(self):
+        limiter = self.limiter(mode=FAIL)
+        limiter.update('key', 200, {'X-Ratelimit-Perhour-Remaining': '0', 'X-Ratelimit-Perhour-Reset': '120',
+                                    'X-Ratelimit-Perday-Remaining': '10'})
+        assert limiter.quota_remaining('key') == 0
+        assert limiter.acquire('key', READ) == 120
+
+    def test_quota_headers_drain_their_endpoint_class(self):
+        limiter = self.limiter(mode=FAIL)
+        limiter.acquire('key', READ)
+        limiter.acquire('key', POST)
+        limiter.update('key', 200, {'X-Ratelimit-Perday-Remaining': '0'}, READ)
+        assert limiter.acquire('key', READ) > 0
+        assert limiter.acquire('key', POST) == 0
+
+    def test_backoff_doubles(self):
+        limiter = self.limiter(mode=FAIL, backoff=2)
+        assert limiter.update('key', 503, {}) == 2
+        assert limiter.update('key', 503, {}) == 4
+        limiter.update('key', 200, {})
+        assert limiter.update('key', 503, {}) == 2
+
+
+class RateLimitedRequestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    @mock.patch('requests.Session.get')
+    def test_fail_mode_skips_network(self, mock_get):
+        limiter = RateLimiter({READ: [Rate(1, 60)]}, mode=FAIL, clock=self.clock)
+        client = pytumblr.TumblrRestClient('key', rate_limiter=limiter)
+        mock_get.return_value = response(200)
+
+        client.send_api_request('get', '/user/info')
+        error = client.send_api_request('get', '/user/info')
+        assert error.status == 429
+        assert mock_get.call_count == 1
+
+    @mock.patch('requests.Session.get')
+    def test_sleep_mode_resends_throttled(self, mock_get):
+        limiter = RateLimiter(mode=SLEEP, clock=self.clock, sleep=self.clock.sleep)
+        client = pytumblr.TumblrRestClient('key', rate_limiter=limiter)
+        mock_get.side_effect = [response(429, headers={'Retry-After': '10'}), response(200)]
+
+        assert client.send_api_request('get', '/user/info') == []
+        assert self.clock.now == 10
+        assert mock_get.call_count == 2
+
+    @mock.patch('requests.Session.get')
+    def test_throttled_statuses_are_retried_once(self, mock_get):
+        limiter = RateLimiter(mode=SLEEP, max_throttled_retries=2, clock=self.clock, sleep=self.clock.sleep)
+        policy = pytumblr.RetryPolicy(max_attempts=3, backoff=0, sleep=self.clock.sleep)
+        client = pytumblr.TumblrRestClient('key', rate_limiter=limiter, retry_policy=policy)
+        mock_get.return_value = response(503, headers={'Retry-After': '1'})
+
+        assert client.send_api_request('get', '/user/info').status == 503
+        assert mock_get.call_count == 3
+        assert policy.statuses == pytumblr.retry.RETRY_STATUSES
+
+
+if __name__ == "__main__":
+    unittest.main()
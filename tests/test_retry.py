@@ -0,0 +1,107 @@
+import unittest
+
+import mock
+from requests.exceptions import ConnectionError
+
+import pytumblr
+from pytumblr.retry import RetryPolicy, endpoint_key
+
+from fakes import response
+
+
+def malformed():
+    mp = mock.MagicMock()
+    mp.status_code = 200
+    mp.content = b'<html></html>'
+    return mp
+
+
+class RetryPolicyTest(unittest.TestCase):
+
+    def policy(self, **kwargs):
+        self.sleeps = []
+        kwargs.setdefault('jitter', 0)
+        return RetryPolicy(sleep=self.sleeps.append, **kwargs)
+
+    def test_endpoint_key(self):
+        assert endpoint_key('/blog/staff.tumblr.com/posts/photo') == '/blog/{blogname}/posts/photo'
+        assert endpoint_key('/user/like') == '/user/like'
+
+    def test_exponential_backoff(self):
+        policy = self.policy(max_attempts=4, backoff=1)
+        send = mock.Mock(return_value=pytumblr.TumblrError(503, 'Unavailable'))
+
+        assert policy.call(send).status == 503
+        assert send.call_count == 4
+        assert self.sleeps == [1, 2, 4]
+
+    def test_jitter_stays_below_backoff(self):
+        policy = RetryPolicy(backoff=1, jitter=1.0)
+        assert all(0 <= policy.delay(3) <= 4 for _ in range(100))
+
+    def test_hooks_report_attempts(self):
+        retries, completed = [], []
+        policy = self.policy(on_retry=lambda *args: retries.append(args),
+                             on_complete=lambda *args: completed.append(args))
+        send = mock.Mock(side_effect=[pytumblr.TumblrError(500, 'Error'), {'ok': True}])
+
+        assert policy.call(send) == {'ok': True}
+        assert [attempt for attempt, _, _ in retries] == [1]
+        assert completed == [(2, {'ok': True})]
+
+    def test_exceptions_are_reraised(self):
+        policy = self.policy(max_attempts=2)
+        send = mock.Mock(side_effect=ConnectionError('reset'))
+
+        with self.assertRaises(ConnectionError):
+            policy.call(send)
+        assert send.call_count == 2
+
+    def test_deadline(self):
+        now = [0.0]
+
+        def sleep(seconds):
+            now[0] += seconds
+
+        policy = RetryPolicy(max_attempts=10, backoff=4, jitter=0, deadline=10,
+                             clock=lambda: now[0], sleep=sleep)
+        send = mock.Mock(return_value=pytumblr.TumblrError(500, 'Error'))
+
+        policy.call(send)
+        # after waiting 4 seconds, another 8 would overshoot the deadline
+        assert send.call_count == 2
+        assert now[0] == 4
+
+
+class RetriedRequestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = RetryPolicy(jitter=0, sleep=lambda seconds: None)
+
+    @mock.patch('requests.Session.get')
+    def test_reads_are_retried(self, mock_get):
+        client = pytumblr.TumblrRestClient('key', retry_policy=self.policy)
+        mock_get.side_effect = [malformed(), response(502), response(200, {'status': 200})]
+
+        assert client.send_api_request('get', '/user/info') == {'status': 200}
+        assert mock_get.call_count == 3
+
+    @mock.patch('requests.Session.post')
+    def test_writes_are_not_retried_by_default(self, mock_post):
+        client = pytumblr.TumblrRestClient('key', retry_policy=self.policy)
+        mock_post.side_effect = [response(500), response(200)]
+
+        assert client.like(1, 'key')[0] is False
+        assert mock_post.call_count == 1
+
+    @mock.patch('requests.Session.post')
+    def test_per_endpoint_opt_in(self, mock_post):
+        client = pytumblr.TumblrRestClient('key', retry_policies={'/user/like': self.policy})
+        mock_post.side_effect = [response(500), response(200)]
+
+        assert client.like(1, 'key')[0] is True
+        assert mock_post.call_count == 2
+
+
+if __name__ == "__main__":
+    unittest.main()
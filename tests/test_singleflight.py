@@ -0,0 +1,110 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+
+import mock
+
+import pytumblr
+from pytumblr.singleflight import SingleFlight, AsyncSingleFlight
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def test_concurrent_calls_share_one(self):
+        flight = SingleFlight()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            wait_for(lambda: flight.shared == 4)
+            return 'result'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do('key', fn))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ['result'] * 5
+        assert len(calls) == 1
+        assert (flight.calls, flight.shared) == (5, 4)
+
+    def test_sequential_calls_are_not_shared(self):
+        flight = SingleFlight()
+        assert flight.do('key', lambda: 1) == 1
+        assert flight.do('key', lambda: 2) == 2
+        assert flight.shared == 0
+
+    def test_errors_are_shared(self):
+        flight = SingleFlight()
+        errors = []
+
+        def fn():
+            wait_for(lambda: flight.shared == 1)
+            raise ValueError('boom')
+
+        def call():
+            try:
+                flight.do('key', fn)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(errors) == 2
+
+    def test_async(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'result'
+
+        async def main():
+            return await asyncio.gather(*[flight.do('key', fn) for _ in range(5)])
+
+        assert asyncio.run(main()) == ['result'] * 5
+        assert len(calls) == 1
+        assert flight.shared == 4
+
+
+class CoalescedRequestTest(unittest.TestCase):
+
+    @mock.patch('requests.Session.get')
+    def test_identical_gets(self, mock_get):
+        client = pytumblr.TumblrRestClient('key')
+
+        def get(*args, **kwargs):
+            wait_for(lambda: client.request.single_flight.shared == 2)
+            mp = mock.MagicMock()
+            mp.content = json.dumps({"meta": {"status": 200, "msg": "OK"}, "response": {"avatar_url": "a.png"}}).encode()
+            return mp
+        mock_get.side_effect = get
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(client.avatar('staff'))) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert mock_get.call_count == 1
+        assert [result.avatar_url for result in results] == ['a.png'] * 3
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import unittest
+
+import mock
+
+import pytumblr
+from pytumblr import types
+from pytumblr.streaming import JsonStream, stream_items
+
+from test_decode import text_post
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+PAGE = {"meta": {"status": 200, "msg": "OK"},
+        "response": {"blog": {"name": "staff"},
+                     "posts": [text_post(1, body='a "quoted" } ] {[ \\ body'), text_post(2)],
+                     "total_posts": 2}}
+
+
+class JsonStreamTest(unittest.TestCase):
+
+    def test_any_chunking(self):
+        body = json.dumps(PAGE, indent=1).encode()
+        for size in (1, 3, 17, len(body)):
+            assert list(stream_items(chunked(body, size))) == PAGE['response']['posts'], size
+
+    def test_values_as_they_complete(self):
+        stream = JsonStream({('response', 'posts', '*'), ('response', 'total_posts')})
+        body = json.dumps(PAGE).encode()
+        first_end = body.index(b', {"id": 2')
+        found = stream.feed(body[:first_end])
+        assert found == [(('response', 'posts', '*'), PAGE['response']['posts'][0])]
+        found = stream.feed(body[first_end:]) + stream.close()
+        assert [path for path, _ in found] == [('response', 'posts', '*'), ('response', 'total_posts')]
+
+    def test_buffer_is_bounded(self):
+        stream = JsonStream({('response', 'posts', '*')})
+        body = json.dumps({"response": {"posts": [text_post(i) for i in range(200)]}}).encode()
+        longest = 0
+        for chunk in chunked(body, 100):
+            stream.feed(chunk)
+            longest = max(longest, len(stream._buffer))
+        assert longest < 2 * len(json.dumps(text_post(1)))
+
+    def test_truncated(self):
+        stream = JsonStream({('response', 'posts', '*')})
+        stream.feed(b'{"response": {"posts": [{"id": 1}, {"id"')
+        with self.assertRaises(ValueError):
+            stream.close()
+
+    def test_error_meta(self):
+        body = b'{"meta": {"status": 404, "msg": "Not Found"}, "response": []}'
+        with self.assertRaises(pytumblr.TumblrRequestError) as raised:
+            list(stream_items([body]))
+        assert raised.exception.error.status == 404
+
+
+class StreamPostsTest(unittest.TestCase):
+
+    @mock.patch('requests.Session.get')
+    def test_stream_posts(self, mock_get):
+        mp = mock.MagicMock(status_code=200)
+        mp.iter_content.return_value = chunked(json.dumps(PAGE).encode(), 10)
+        mock_get.return_value = mp
+
+        client = pytumblr.TumblrRestClient('consumer_key')
+        posts = list(client.stream_posts('staff', limit=2))
+        assert [type(post) for post in posts] == [types.LegacyTextPost] * 2
+        assert mock_get.call_args[1]['stream'] is True
+        assert 'api_key=consumer_key' in mock_get.call_args[0][0]
+        mp.close.assert_called_once()
+
+        mp.iter_content.return_value = chunked(json.dumps(PAGE).encode(), 10)
+        assert list(client.stream_dashboard(raw=True)) == PAGE['response']['posts']
+
+    @mock.patch('requests.Session.get')
+    def test_failed_request(self, mock_get):
+        mock_get.return_value = mock.MagicMock(status_code=401, content=b'{"meta": {"status": 401, "msg": "Unauthorized"}, "response": []}')
+
+        client = pytumblr.TumblrRestClient('consumer_key')
+        with self.assertRaises(pytumblr.TumblrRequestError):
+            list(client.stream_dashboard())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from datetime import datetime
+
+from pytumblr import decode, lazy, npf, types
+from pytumblr.fakeserver import neue_post
+
+from test_lazy import photo_post
+
+
+class DateTest(unittest.TestCase):
+
+    def test_parse_date_matches_strptime(self):
+        for date in ('2020-01-01 00:00:00 GMT', '2007-04-27 14:37:41 GMT', '2024-02-29 23:59:59 GMT'):
+            assert types.parse_date(date) == datetime.strptime(date, types.DATE_FORMAT)
+
+    def test_parse_date_falls_back_to_strptime(self):
+        assert types.parse_date('2020-01-01 00:00:00 UTC') == datetime(2020, 1, 1)
+        with self.assertRaises(ValueError):
+            types.parse_date('yesterday GMT')
+
+    def test_date_from_timestamp(self):
+        assert types.date_from_timestamp(1177684661) == types.parse_date('2007-04-27 14:37:41 GMT')
+
+    def test_post_dates(self):
+        data = dict(photo_post(1))
+        del data['note_count']
+        post = types.Post(**data)
+        # subclasses with their own __post_init__ build the date and blog too
+        assert isinstance(post, types.LegacyPhotoPost)
+        assert post.date == datetime(2020, 1, 1)
+        assert isinstance(post.blog, types.BlogInfo)
+
+    def test_post_without_date_uses_timestamp(self):
+        post = npf.PostInfo(id=1, timestamp=1577836800)
+        assert post.date == datetime(2020, 1, 1)
+        assert npf.PostInfo(id=1).date is None
+
+    def test_date_string_before_timestamp(self):
+        data = dict(photo_post(1), date='2019-06-01 12:00:00 GMT')
+        del data['note_count']
+        posts = (types.Post(**data), decode.decode(types.Post, data), lazy.view(types.Post, data))
+        assert [post.date for post in posts] == [datetime(2019, 6, 1, 12)] * 3
+        # without a date string, every way of building a post uses the timestamp
+        data = {'id': 1, 'timestamp': 1577836800}
+        posts = (npf.PostInfo(**data), decode.decode(npf.PostInfo, data), lazy.view(npf.PostInfo, data))
+        assert [post.date for post in posts] == [datetime(2020, 1, 1)] * 3
+
+
+class NeuePostTest(unittest.TestCase):
+
+    def test_built_like_the_decoder(self):
+        data = neue_post(100, depth=3)
+        data['content'].append({'type': 'image', 'media': [{'type': 'image/png', 'url': 'a.png'}]})
+        data['layout'].append({'type': 'condensed', 'blocks': [0]})
+        post = npf.NeuePost(**data)
+
+        assert isinstance(post.content[-1], npf.ImageBlock) and post.content[-1].poster is None
+        assert [layout.type for layout in post.layout] == ['rows', 'condensed']
+        assert len(post.trail) == 3 and isinstance(post.trail[0].post, npf.PostInfo)
+        assert post == decode.decode(npf.NeuePost, data)
+
+
+if __name__ == "__main__":
+    unittest.main()